@@ -1,36 +1,27 @@
 import os
 import sys
-import subprocess
+import time
+import queue
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import json
 
-# Add REDCINE-X PRO and SONY RAWexporter paths to the PATH environment variable.
-os.environ['PATH'] = (
-    "/Applications/REDCINE-X PRO/REDCINE-X PRO.app/Contents/MacOS:"
-    "/Applications/RAW Viewer.app/Contents/MacOS/rawexporter:" +
-    os.environ.get('PATH', '')
-)
+# Camera file discovery and the vendor export tools live in ocf_export (no GUI
+# import there, so it can run headless).
+from ocf_export import allowed_extensions, find_camera_files, ExportBatch
+from instrumentation import get_stats, is_enabled
+
+# Export status updates are posted by the worker threads to this queue and
+# applied to the widgets on the Tk thread, every POLL_MS milliseconds.
+POLL_MS = 100
+status_queue = queue.Queue()
+batch = None
+file_lines = {}
 
 # trying to fix automator not running the processing files action
 # Add the conda environment's bin directory to PATH ==> doesn't work
 # conda_bin = "/opt/miniconda3/envs/ocf_metadata_wep_app/bin"
 # os.environ["PATH"] = conda_bin + os.pathsep + os.environ.get("PATH", "")
 
-# Allowed file extensions mapping.
-allowed_extensions = {
-    'ARRI': ['.mxf', '.mov'],
-    'RED': ['.r3d'],
-    'SONY': ['.mxf']
-}
-
-# Tool paths for the different camera types.
-tool_paths = {
-    'ARRI': "/Users/stefan/WORK/DEV/metadata/art-cmd_0.3.0_macos_universal/bin/art-cmd",
-    'RED': "REDline",     # Resolved via PATH.
-    'SONY': "rawexporter" # Resolved via PATH.
-}
-
 # trying to fix automator not running the processing files action ==> doesn't work this way
 # tool_paths = {
 #     'ARRI': "/Users/stefan/WORK/DEV/metadata/art-cmd_0.3.0_macos_universal/bin/art-cmd",
@@ -194,6 +185,31 @@ class CustomScrollbar(tk.Canvas):
         fraction = new_top / height
         self.target.yview_moveto(fraction)
 
+# ---------------- Custom Canvas-Based Progress Bar ----------------
+class CustomProgressBar(tk.Canvas):
+    def __init__(self, master, height=30, bg="#2D2F32", fill="#32599C", fg="#dddddd",
+                 font=("Arial", 12), **kwargs):
+        super().__init__(master, height=height, highlightthickness=0, bd=0, bg=bg, **kwargs)
+        self.fill = fill
+        self.fg = fg
+        self.font = font
+        self.fraction = 0.0
+        self.text = ""
+        self.bind("<Configure>", lambda e: self.redraw())
+
+    def set(self, fraction, text=""):
+        self.fraction = max(0.0, min(1.0, fraction))
+        self.text = text
+        self.redraw()
+
+    def redraw(self):
+        self.delete("all")
+        width = self.winfo_width()
+        height = self.winfo_height()
+        if self.fraction > 0:
+            self.create_rectangle(0, 0, width * self.fraction, height, fill=self.fill, outline=self.fill)
+        self.create_text(width / 2, height / 2, text=self.text, fill=self.fg, font=self.font)
+
 # ---------------- UI Functions ----------------
 def browse_folder(entry):
     folder = filedialog.askdirectory()
@@ -209,17 +225,14 @@ def update_extensions_display(new_value=None):
     update_found_files()
 
 def update_found_files():
+    if batch is not None:
+        return  # The list shows the status of the running export.
     source_folder = source_entry.get().strip()
     camera = custom_dropdown.get()
     files_found = []
     if os.path.isdir(source_folder) and camera in allowed_extensions:
-        allowed = [ext.lower() for ext in allowed_extensions[camera]]
-        for dirpath, _, filenames in os.walk(source_folder):
-            for filename in filenames:
-                ext = os.path.splitext(filename)[1].lower()
-                if ext in allowed:
-                    rel_path = os.path.relpath(os.path.join(dirpath, filename), source_folder)
-                    files_found.append(rel_path)
+        files_found = [os.path.relpath(file_path, source_folder)
+                       for file_path in find_camera_files(source_folder, camera)]
     found_files_text.config(state=tk.NORMAL)
     found_files_text.delete("1.0", tk.END)
     if files_found:
@@ -230,7 +243,83 @@ def update_found_files():
     # Force update of scrollbar visibility.
     found_files_text.yview_moveto(found_files_text.yview()[0])
 
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def set_file_status(file_path, status):
+    # One line per file in the files list: "<status>  <path relative to the source folder>".
+    if file_path not in file_lines:
+        return
+    line, relative_path = file_lines[file_path]
+    found_files_text.config(state=tk.NORMAL)
+    found_files_text.delete(f"{line}.0", f"{line}.end")
+    found_files_text.insert(f"{line}.0", f"{status:<10}{relative_path}")
+    found_files_text.config(state=tk.DISABLED)
+
+def update_progress():
+    done = batch.completed
+    elapsed = time.monotonic() - batch.started
+    text = f"{done}/{len(batch)} files"
+    if done and elapsed > 0:
+        rate = done / elapsed
+        text += f"  ·  {rate:.1f} files/s"
+        if done < len(batch) and not batch.cancelled:
+            text += f"  ·  ETA {format_duration((len(batch) - done) / rate)}"
+    if batch.cancelled and done < len(batch):
+        text += "  ·  cancelling..."
+    progress_bar.set(done / len(batch) if len(batch) else 1.0, text)
+
+def poll_status():
+    finished = False
+    while True:
+        try:
+            kind, *values = status_queue.get_nowait()
+        except queue.Empty:
+            break
+        if kind == "file":
+            file_path, status, _ = values
+            set_file_status(file_path, status)
+        else:
+            finished = True
+    update_progress()
+    if finished:
+        finish_processing()
+    else:
+        root.after(POLL_MS, poll_status)
+
+def finish_processing():
+    global batch
+    counts = batch.counts
+    elapsed = time.monotonic() - batch.started
+    title = "Cancelled" if batch.cancelled else "Completed"
+    if batch.cancelled:
+        message = f"Metadata extraction cancelled: {counts['done']} of {len(batch)} file(s) processed."
+    else:
+        message = "Metadata extraction completed."
+    message += f"\n\n{counts['done']} done, {counts['failed']} failed in {format_duration(elapsed)}."
+    if is_enabled():
+        # OCF_METADATA_INSTRUMENT=1: show where the time went (art-cmd, REDline, writes...).
+        message += "\n\n" + get_stats().describe()
+    batch = None
+    messagebox.showinfo(title, message)
+
+def cancel_processing():
+    if batch is not None and not batch.cancelled:
+        batch.cancel()
+        update_progress()
+
+def read_workers():
+    try:
+        return max(1, int(workers_spinbox.get()))
+    except ValueError:
+        return 1
+
 def process_files():
+    global batch
+    if batch is not None:
+        return  # A run is in progress.
     source_folder = source_entry.get().strip()
     dest_folder = dest_entry.get().strip()
     camera_type = custom_dropdown.get()
@@ -245,72 +334,31 @@ def process_files():
         messagebox.showerror("Error", "Please select a valid camera type.")
         return
 
-    allowed = [ext.lower() for ext in allowed_extensions[camera_type]]
-    for dirpath, _, filenames in os.walk(source_folder):
-        for filename in filenames:
-            ext = os.path.splitext(filename)[1].lower()
-            if ext not in allowed:
-                continue
-            file_path = os.path.join(dirpath, filename)
-            base, _ = os.path.splitext(filename)
-            raw_output_file = os.path.join(dest_folder, base + "_metadata_export.txt")
-            json_output_file = os.path.join(dest_folder, base + "_metadata_export.json")
-            if camera_type == 'ARRI':
-                command = [tool_paths['ARRI'], "export", file_path, "--output", json_output_file]
-                try:
-                    subprocess.run(command, capture_output=True, text=True, check=True)
-                    print(f"Processed {file_path} -> {json_output_file}")
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
-            elif camera_type == 'RED':
-                command = [tool_paths['RED'], "--i", file_path, "--printMeta", "1"]
-                result = subprocess.run(command, capture_output=True, text=True)
-                if result.returncode != 0:
-                    print(f"REDline error for {file_path}: {result.stderr}")
-                raw_output = result.stdout
-                try:
-                    with open(raw_output_file, "w") as f:
-                        f.write(raw_output)
-                    print(f"Wrote raw output for {file_path} -> {raw_output_file}")
-                except Exception as e:
-                    print(f"Error writing raw output for {file_path}: {e}")
-                metadata = {}
-                for line in raw_output.strip().splitlines():
-                    if ":" in line:
-                        key, value = line.split(":", 1)
-                        metadata[key.strip()] = value.strip()
-                try:
-                    with open(json_output_file, "w") as f:
-                        json.dump(metadata, f, indent=4)
-                    print(f"Wrote JSON output for {file_path} -> {json_output_file}")
-                except Exception as e:
-                    print(f"Error writing JSON output for {file_path}: {e}")
-            elif camera_type == 'SONY':
-                command = [tool_paths['SONY'], "--metalist", "--input", file_path]
-                try:
-                    result = subprocess.run(command, capture_output=True, text=True, check=True)
-                    raw_output = result.stdout
-                    try:
-                        with open(raw_output_file, "w") as f:
-                            f.write(raw_output)
-                        print(f"Wrote raw output for {file_path} -> {raw_output_file}")
-                    except Exception as e:
-                        print(f"Error writing raw output for {file_path}: {e}")
-                    metadata = {}
-                    for line in raw_output.strip().splitlines():
-                        if ":" in line:
-                            key, value = line.split(":", 1)
-                            metadata[key.strip()] = value.strip()
-                    try:
-                        with open(json_output_file, "w") as f:
-                            json.dump(metadata, f, indent=4)
-                        print(f"Wrote JSON output for {file_path} -> {json_output_file}")
-                    except Exception as e:
-                        print(f"Error writing JSON output for {file_path}: {e}")
-                except subprocess.CalledProcessError as e:
-                    print(f"SONY rawexporter error for {file_path}: {e}")
-    messagebox.showinfo("Completed", "Metadata extraction completed.")
-    update_found_files()
+    file_paths = list(find_camera_files(source_folder, camera_type))
+    if not file_paths:
+        messagebox.showinfo("Completed", "No matching files found.")
+        return
+
+    # The tools run on worker threads; they only talk to the UI through status_queue.
+    batch = ExportBatch(file_paths, camera_type, dest_folder, workers=read_workers(),
+                        on_file=lambda *values: status_queue.put(("file", *values)),
+                        on_finish=lambda finished: status_queue.put(("finish",)))
+    file_lines.clear()
+    found_files_text.config(state=tk.NORMAL)
+    found_files_text.delete("1.0", tk.END)
+    for line, file_path in enumerate(file_paths, start=1):
+        file_lines[file_path] = (line, os.path.relpath(file_path, source_folder))
+        found_files_text.insert(tk.END, ("\n" if line > 1 else "") + f"{'queued':<10}{file_lines[file_path][1]}")
+    found_files_text.config(state=tk.DISABLED)
+    batch.start()
+    update_progress()
+    root.after(POLL_MS, poll_status)
+
+def on_close():
+    # Closing the window stops the running tools instead of leaving them behind.
+    if batch is not None:
+        batch.cancel()
+    root.destroy()
 
 # ---------------- Helper Function for Copying Text ---------------- => not needed
 def copy_selection(event):
@@ -328,72 +376,98 @@ def copy_selection(event):
     return "break"
 
 # ---------------- Build the UI ----------------
-root = tk.Tk()
-root.title("OCF Metadata JSON Generator")
-window_width = 1200
-window_height = 550
-root.geometry(f"{window_width}x{window_height}")
-root.update_idletasks()
-screen_width = root.winfo_screenwidth()
-screen_height = root.winfo_screenheight()
-x = (screen_width // 2) - (window_width // 2)
-y = (screen_height // 2) - (window_height // 2)
-root.geometry(f"{window_width}x{window_height}+{x}+{y}")
-root.configure(bg="#3A4450")
-root.option_add("*Font", "Arial 14")
-
-container = tk.Frame(root, padx=30, pady=30, bg="#3A4450")
-container.pack(fill="both", expand=True)
-
-tk.Label(container, text="Source Folder (camera files):", bg="#3A4450", fg="#dddddd").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-source_entry = tk.Entry(container, width=100, fg="#bbbbbb",  bg="#2D2F32", highlightbackground="#2D2F32", relief="flat", borderwidth=2, highlightthickness=2)
-source_entry.grid(row=0, column=1, padx=5, pady=5)
-browse_source_btn = CustomButton(container, text="Browse", command=lambda: browse_folder(source_entry), width=80, height=30, bg="#334A73")
-browse_source_btn.grid(row=0, column=2, sticky="e", padx=5, pady=5)
-
-tk.Label(container, text="Destination Folder (JSON files):", bg="#3A4450", fg="#dddddd").grid(row=1, column=0, padx=5, pady=5, sticky="w")
-dest_entry = tk.Entry(container, width=100, fg="#bbbbbb",  bg="#2D2F32", highlightbackground="#2D2F32", relief="flat", borderwidth=2, highlightthickness=2)
-dest_entry.grid(row=1, column=1, padx=5, pady=5)
-browse_dest_btn = CustomButton(container, text="Browse", command=lambda: browse_folder(dest_entry), width=80, height=30, bg="#334A73")
-browse_dest_btn.grid(row=1, column=2, sticky="e", padx=5, pady=5)
-
-tk.Label(container, text="Choose Camera Brand:", bg="#3A4450", fg="#dddddd").grid(row=2, column=0, padx=5, pady=5, sticky="w")
-custom_dropdown = CustomDropdown(container, options=list(allowed_extensions.keys()), width=80, height=30,
-                                 bg="#334A73", fg="#bbbbbb", activebg="#0b5ed7", font=("Arial", 14))
-custom_dropdown.grid(row=2, column=1, padx=5, pady=5, sticky="w")
-
-def dropdown_callback(selected):
-    update_extensions_display()
-custom_dropdown.command = dropdown_callback
-
-allowed_text_label = tk.Label(container, text="Allowed Extensions:", bg="#3A4450", fg="#dddddd")
-allowed_text_label.grid(row=3, column=0, padx=5, pady=5, sticky="w")
-
-extensions_value_label = tk.Label(container, text=", ".join(allowed_extensions[custom_dropdown.get()]),
-                                  bg="#3A4450", fg="#bbbbbb", font=("Arial", 14))
-extensions_value_label.grid(row=3, column=1, padx=5, pady=5, sticky="w")
-
-files_frame = tk.Frame(container)
-files_frame.grid(row=4, column=0, columnspan=3, padx=5, pady=35, sticky="nsew")
-found_files_text = tk.Text(files_frame, height=10, bg="#282828", fg="#999999",
-                           highlightbackground="#282828", relief="flat", borderwidth=2, highlightthickness=2)
-found_files_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-# Bind Ctrl+C to allow copying selected text even though the widget is write-only. => not needed
-#found_files_text.bind("<Control-c>", copy_selection)
-custom_scrollbar = CustomScrollbar(files_frame, found_files_text, width=15, bg="#282828")
-custom_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-process_btn = CustomButton(container, text="Process Files", command=process_files, width=100, height=30, bg="#32599C")
-process_btn.grid(row=5, column=2, sticky="e", padx=5, pady=20)
-
-container.grid_rowconfigure(5, weight=1)
-container.grid_columnconfigure(1, weight=1)
-
-if len(sys.argv) > 1:
-    arg_path = sys.argv[1].strip()
-    if os.path.isdir(arg_path):
+def build_ui(initial_folder=None):
+    """Create the main window (nothing is built at import time). Returns the Tk root."""
+    global root, source_entry, dest_entry, custom_dropdown, extensions_value_label, found_files_text
+    global workers_spinbox, progress_bar
+    root = tk.Tk()
+    root.title("OCF Metadata JSON Generator")
+    window_width = 1200
+    window_height = 640
+    root.geometry(f"{window_width}x{window_height}")
+    root.update_idletasks()
+    screen_width = root.winfo_screenwidth()
+    screen_height = root.winfo_screenheight()
+    x = (screen_width // 2) - (window_width // 2)
+    y = (screen_height // 2) - (window_height // 2)
+    root.geometry(f"{window_width}x{window_height}+{x}+{y}")
+    root.configure(bg="#3A4450")
+    root.option_add("*Font", "Arial 14")
+
+    container = tk.Frame(root, padx=30, pady=30, bg="#3A4450")
+    container.pack(fill="both", expand=True)
+
+    tk.Label(container, text="Source Folder (camera files):", bg="#3A4450", fg="#dddddd").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+    source_entry = tk.Entry(container, width=100, fg="#bbbbbb",  bg="#2D2F32", highlightbackground="#2D2F32", relief="flat", borderwidth=2, highlightthickness=2)
+    source_entry.grid(row=0, column=1, padx=5, pady=5)
+    browse_source_btn = CustomButton(container, text="Browse", command=lambda: browse_folder(source_entry), width=80, height=30, bg="#334A73")
+    browse_source_btn.grid(row=0, column=2, sticky="e", padx=5, pady=5)
+
+    tk.Label(container, text="Destination Folder (JSON files):", bg="#3A4450", fg="#dddddd").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+    dest_entry = tk.Entry(container, width=100, fg="#bbbbbb",  bg="#2D2F32", highlightbackground="#2D2F32", relief="flat", borderwidth=2, highlightthickness=2)
+    dest_entry.grid(row=1, column=1, padx=5, pady=5)
+    browse_dest_btn = CustomButton(container, text="Browse", command=lambda: browse_folder(dest_entry), width=80, height=30, bg="#334A73")
+    browse_dest_btn.grid(row=1, column=2, sticky="e", padx=5, pady=5)
+
+    tk.Label(container, text="Choose Camera Brand:", bg="#3A4450", fg="#dddddd").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+    custom_dropdown = CustomDropdown(container, options=list(allowed_extensions.keys()), width=80, height=30,
+                                     bg="#334A73", fg="#bbbbbb", activebg="#0b5ed7", font=("Arial", 14))
+    custom_dropdown.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+    def dropdown_callback(selected):
+        update_extensions_display()
+    custom_dropdown.command = dropdown_callback
+
+    allowed_text_label = tk.Label(container, text="Allowed Extensions:", bg="#3A4450", fg="#dddddd")
+    allowed_text_label.grid(row=3, column=0, padx=5, pady=5, sticky="w")
+
+    extensions_value_label = tk.Label(container, text=", ".join(allowed_extensions[custom_dropdown.get()]),
+                                      bg="#3A4450", fg="#bbbbbb", font=("Arial", 14))
+    extensions_value_label.grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
+    files_frame = tk.Frame(container)
+    files_frame.grid(row=4, column=0, columnspan=3, padx=5, pady=35, sticky="nsew")
+    found_files_text = tk.Text(files_frame, height=10, bg="#282828", fg="#999999",
+                               highlightbackground="#282828", relief="flat", borderwidth=2, highlightthickness=2)
+    found_files_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    # Bind Ctrl+C to allow copying selected text even though the widget is write-only. => not needed
+    #found_files_text.bind("<Control-c>", copy_selection)
+    custom_scrollbar = CustomScrollbar(files_frame, found_files_text, width=15, bg="#282828")
+    custom_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    tk.Label(container, text="Parallel Tool Processes:", bg="#3A4450", fg="#dddddd").grid(row=5, column=0, padx=5, pady=5, sticky="w")
+    workers_spinbox = tk.Spinbox(container, from_=1, to=max(64, os.cpu_count() or 1), width=4, fg="#bbbbbb", bg="#2D2F32",
+                                 buttonbackground="#334A73", relief="flat", highlightthickness=0)
+    workers_spinbox.delete(0, tk.END)
+    workers_spinbox.insert(0, str(os.cpu_count() or 1))
+    workers_spinbox.grid(row=5, column=1, padx=5, pady=5, sticky="w")
+
+    progress_bar = CustomProgressBar(container, height=30)
+    progress_bar.grid(row=6, column=0, columnspan=2, padx=5, pady=20, sticky="ew")
+
+    buttons_frame = tk.Frame(container, bg="#3A4450")
+    buttons_frame.grid(row=6, column=2, sticky="e", padx=5, pady=20)
+    cancel_btn = CustomButton(buttons_frame, text="Cancel", command=cancel_processing, width=80, height=30, bg="#334A73")
+    cancel_btn.pack(side=tk.LEFT, padx=(0, 10))
+    process_btn = CustomButton(buttons_frame, text="Process Files", command=process_files, width=100, height=30, bg="#32599C")
+    process_btn.pack(side=tk.LEFT)
+
+    container.grid_rowconfigure(6, weight=1)
+    container.grid_columnconfigure(1, weight=1)
+
+    if initial_folder and os.path.isdir(initial_folder):
         source_entry.delete(0, tk.END)
-        source_entry.insert(0, arg_path)
+        source_entry.insert(0, initial_folder)
+
+    update_found_files()
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    return root
+
+
+def main():
+    initial_folder = sys.argv[1].strip() if len(sys.argv) > 1 else None
+    build_ui(initial_folder).mainloop()
+
 
-update_found_files()
-root.mainloop()
+if __name__ == "__main__":
+    main()
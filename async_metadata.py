@@ -0,0 +1,373 @@
+"""
+asyncio counterpart of MetadataExtractor: ffprobe runs through
+asyncio.create_subprocess_exec and ExifTool through stay-open sessions driven
+by the event loop, so one process can keep hundreds of probes in flight
+without a thread per file. OIIO and the native readers are in-process calls;
+they run on the shared backend thread pool.
+"""
+
+import os
+import json
+import asyncio
+
+from get_metadata import (DEFAULT_TIER, TIER_BACKENDS, TIERS, MetadataExtractor, get_backend_executor,
+                          native_first_message, native_parsed)
+from metadata_cache import get_metadata_cache
+from key_selectors import compile_selector
+from deadlines import Deadline, is_timed_out, salvage_json, timed_out_result
+from instrumentation import span
+
+BACKENDS = ('OIIO', 'ExifTool', 'FFmpeg', 'Native', 'Vendor')
+# Largest ExifTool JSON answer read from a stay-open session.
+EXIFTOOL_STREAM_LIMIT = 64 * 1024 * 1024
+
+
+def default_limits():
+    """Maximum number of concurrent calls of each backend."""
+    cpus = os.cpu_count() or 1
+    return {'OIIO': cpus, 'ExifTool': cpus, 'FFmpeg': 4 * cpus, 'Native': 8 * cpus, 'Vendor': cpus}
+
+
+class AsyncExifToolSession:
+    """One `exiftool -stay_open` process driven with asyncio pipes."""
+    def __init__(self, common_args=("-G", "-n")):
+        self.common_args = list(common_args)
+        self.process = None
+        self._counter = 0
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            "exiftool", "-stay_open", "True", "-@", "-", "-common_args", *self.common_args,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            limit=EXIFTOOL_STREAM_LIMIT,
+        )
+        return self
+
+    async def execute_json(self, *params):
+        self._counter += 1
+        ready = f"{{ready{self._counter}}}".encode()
+        arguments = ["-j", *params, f"-execute{self._counter}"]
+        self.process.stdin.write(("\n".join(arguments) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        output = await self.process.stdout.readuntil(ready)
+        # Consume the rest of the "{readyN}" line.
+        await self.process.stdout.readline()
+        output = output[:-len(ready)].strip()
+        return json.loads(output) if output else []
+
+    def kill(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+
+    async def close(self):
+        if self.process is None or self.process.returncode is not None:
+            return
+        try:
+            self.process.stdin.write(b"-stay_open\nFalse\n")
+            await self.process.stdin.drain()
+            await asyncio.wait_for(self.process.wait(), timeout=5)
+        except (asyncio.TimeoutError, ConnectionError):
+            self.kill()
+            await self.process.wait()
+
+
+class AsyncExifToolPool:
+    """Up to `size` AsyncExifToolSession, each used by one coroutine at a time."""
+    def __init__(self, size):
+        self.size = size
+        self._idle = []
+        self._count = 0
+        self._condition = None
+
+    @property
+    def _available(self):
+        # Created on first use inside the running loop: on Python 3.9 asyncio
+        # primitives bind to the loop current when they are created.
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _acquire(self):
+        async with self._available:
+            while not self._idle and self._count >= self.size:
+                await self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._count += 1
+        try:
+            return await AsyncExifToolSession().start()
+        except BaseException:
+            async with self._available:
+                self._count -= 1
+                self._available.notify()
+            raise
+
+    async def _release(self, session, broken=False):
+        async with self._available:
+            if broken:
+                self._count -= 1
+            else:
+                self._idle.append(session)
+            self._available.notify()
+
+    async def execute_json(self, *params):
+        session = await self._acquire()
+        try:
+            result = await session.execute_json(*params)
+        except BaseException:
+            # Cancelled or failed mid-command: the session's output is out of sync.
+            session.kill()
+            await asyncio.shield(self._release(session, broken=True))
+            raise
+        await self._release(session)
+        return result
+
+    async def close(self):
+        async with self._available:
+            sessions, self._idle = self._idle, []
+            self._count -= len(sessions)
+        for session in sessions:
+            await session.close()
+
+
+class AsyncMetadataExtractor:
+    """
+    Awaitable metadata extraction with one semaphore per backend.
+
+    One instance is meant to be shared by every request of an event loop (web
+    app, watch-folder daemon): `limits` caps the number of concurrent calls of
+    each backend across all the files in flight. Results have the same shape
+    as MetadataExtractor.extract_metadata(). Cancelling a call kills the child
+    processes it started. `tier` is the default extraction tier (see TIERS).
+    """
+    def __init__(self, limits=None, cache=None, sniff=True, timeout=None, backend_timeouts=None,
+                 tier=DEFAULT_TIER):
+        if tier not in TIERS:
+            raise ValueError(f"Unknown extraction tier {tier!r}, expected one of {', '.join(TIERS)}.")
+        self.tier = tier
+        self.limits = dict(default_limits(), **(limits or {}))
+        self.cache = get_metadata_cache() if cache is True else cache
+        self.sniff = sniff
+        self.timeout = timeout
+        self.backend_timeouts = backend_timeouts
+        # Created on first use inside the running loop, as the ExifTool pool's condition.
+        self._semaphores = {}
+        self._exiftool = AsyncExifToolPool(self.limits['ExifTool'])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self._exiftool.close()
+
+    # ----------------- Backends -----------------
+    async def _in_executor(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(get_backend_executor(), function, *args)
+
+    async def extract_oiio_metadata(self, extractor):
+        return await self._in_executor(extractor.extract_oiio_metadata)
+
+    async def extract_native_metadata(self, extractor):
+        return await self._in_executor(extractor.extract_native_metadata)
+
+    async def extract_exiftool_metadata(self, extractor, tags=None):
+        if not extractor.supports('ExifTool'):
+            return "ExifTool does not support this file format."
+        metadata_list = await self._exiftool.execute_json(*extractor.exiftool_params(tags))
+        return metadata_list[0] if metadata_list else "ExifTool could not extract metadata."
+
+    async def extract_vendor_metadata(self, extractor):
+        from ocf_export import ToolRunner
+        runner = ToolRunner()
+        try:
+            return await self._in_executor(extractor.extract_vendor_metadata, runner)
+        finally:
+            # Timed out or cancelled: the vendor tool is terminated instead of running on in its thread.
+            runner.cancel()
+
+    async def extract_ffmpeg_metadata(self, extractor, entries=None, timeout=None):
+        """ffprobe output; past `timeout` the process is killed and the output read so far is kept."""
+        if not extractor.supports('FFmpeg'):
+            return "FFmpeg does not support this file format."
+        with span("subprocess", "ffprobe", file=extractor.file_path, mode="async"):
+            return await self._run_ffprobe(extractor, entries, timeout)
+
+    async def _run_ffprobe(self, extractor, entries, timeout):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *extractor.ffprobe_command(entries),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+        except Exception as e:
+            return {"Error": str(e)}
+        chunks = []
+
+        async def read_output():
+            while True:
+                chunk = await process.stdout.read(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            await process.wait()
+
+        try:
+            await asyncio.wait_for(read_output(), timeout)
+        except asyncio.TimeoutError:
+            return timed_out_result(salvage_json(b"".join(chunks)))
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await asyncio.shield(process.wait())
+        stdout = b"".join(chunks)
+        try:
+            return json.loads(stdout) if stdout else {}
+        except Exception as e:
+            return {"Error": str(e)}
+
+    async def _run_backend(self, tool, extractor, projection, deadline):
+        if tool not in self._semaphores:
+            self._semaphores[tool] = asyncio.Semaphore(self.limits[tool])
+        async with self._semaphores[tool]:
+            with span("backend", tool, file=extractor.file_path, mode="async"):
+                return await self._call_backend(tool, extractor, projection, deadline)
+
+    async def _call_backend(self, tool, extractor, projection, deadline):
+        timeout = deadline.remaining(tool)
+        if timeout is not None and timeout <= 0:
+            return timed_out_result()
+        if tool == 'FFmpeg':
+            return await self.extract_ffmpeg_metadata(
+                extractor, projection.ffprobe_entries() if projection is not None else None, timeout)
+        if tool == 'OIIO':
+            call = self.extract_oiio_metadata(extractor)
+        elif tool == 'ExifTool':
+            call = self.extract_exiftool_metadata(
+                extractor, projection.exiftool_tags() if projection is not None else None)
+        elif tool == 'Vendor':
+            call = self.extract_vendor_metadata(extractor)
+        else:
+            call = self.extract_native_metadata(extractor)
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            # ExifTool sessions and vendor tools are killed on cancellation; in-process calls finish in the background.
+            return timed_out_result()
+
+    # ----------------- Extraction -----------------
+    async def extract_metadata(self, file_path, tools=None, projection=None, timeout=None, backend_timeouts=None,
+                               tier=None, native_first=True):
+        """
+        Metadata of every backend of the `tier` (or of `tools` among them) for one
+        file, with its "Tier", the backends running concurrently within their
+        limits. `projection` is a KeySelector pushed down into the ExifTool and
+        ffprobe command lines. `timeout` and `backend_timeouts` (defaulting to the
+        extractor's) bound the file and each backend call, as in MetadataExtractor.
+        With `native_first`, the native reader runs first and the tools it stands
+        in for (see MetadataExtractor.native_first_tools) only run when it cannot
+        parse the file; a KeySelector as `native_first` also requires that it
+        answers every key.
+        """
+        deadline = Deadline(self.timeout if timeout is None else timeout,
+                            self.backend_timeouts if backend_timeouts is None else backend_timeouts)
+        tier = tier or self.tier
+        if tier not in TIERS:
+            raise ValueError(f"Unknown extraction tier {tier!r}, expected one of {', '.join(TIERS)}.")
+        extractor = await self._in_executor(self._make_extractor, file_path, tier)
+        tools = [tool for tool in TIER_BACKENDS[tier] if tools is None or tool in tools]
+        replaced = [tool for tool in extractor.native_first_tools(tier) if tool in tools] \
+            if native_first is not False and 'Native' in tools else []
+        cache_key = None
+        # Results where a selector decided which tools ran are not cached.
+        if self.cache and tools == list(TIER_BACKENDS[tier]) and not (replaced and native_first is not True):
+            variant = ""
+            if projection is not None:
+                variant = json.dumps(["projection", projection.exiftool_tags(), projection.ffprobe_entries()])
+            if replaced:
+                variant = json.dumps(["native_first", variant])
+            if tier != DEFAULT_TIER:
+                variant = json.dumps(["tier", tier, variant])
+            cache_key = self.cache.make_key(file_path, extractor.tool_versions, variant)
+            cached = self.cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                return dict(cached, Tier=tier)
+
+        metadata = {}
+        if replaced:
+            metadata['Native'] = native = await self._run_backend('Native', extractor, projection, deadline)
+            if native_parsed(native) and (native_first is True or native_first.answered_by(native)):
+                for tool in replaced:
+                    metadata[tool] = native_first_message(extractor.container)
+        pending = [tool for tool in tools if tool not in metadata]
+        tasks = [asyncio.ensure_future(self._run_backend(tool, extractor, projection, deadline)) for tool in pending]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        metadata.update(zip(pending, results))
+        metadata = {tool: metadata[tool] for tool in tools}
+        if cache_key and not any(is_timed_out(section) for section in metadata.values()):
+            self.cache.put(cache_key, metadata)
+        return dict(metadata, Tier=tier)
+
+    def _make_extractor(self, file_path, tier=DEFAULT_TIER):
+        # Sniffing reads the file head: done off the event loop with the extractor creation.
+        extractor = MetadataExtractor(file_path, sniff=self.sniff, tier=tier)
+        extractor.container
+        return extractor
+
+    async def extract_selected_metadata(self, file_path, keys, projection=False, tier=None):
+        """Metadata matching `keys`, only running the backends of the `tier` that can provide them."""
+        tier = tier or self.tier
+        selector = compile_selector(keys)
+        metadata = await self.extract_metadata(file_path, tools=selector.backends,
+                                               projection=selector if projection else None, tier=tier,
+                                               native_first=selector)
+        return selector.select({tool: metadata.get(tool) for tool in TIER_BACKENDS[tier]})
+
+    async def extract_many(self, file_paths, max_in_flight=256, ordered=False, **kwargs):
+        """
+        Async generator of (file_path, metadata) for many files, with at most
+        `max_in_flight` files started at once (the backend semaphores still
+        apply). Failed files yield {"Error": ...}. Closing the generator early
+        cancels the files still in flight.
+        """
+        async def extract(file_path):
+            try:
+                return file_path, await self.extract_metadata(file_path, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return file_path, {"Error": str(e)}
+
+        paths = iter(file_paths)
+        pending = []
+        try:
+            for file_path in paths:
+                pending.append(asyncio.ensure_future(extract(file_path)))
+                if len(pending) >= max_in_flight:
+                    if ordered:
+                        yield await pending.pop(0)
+                    else:
+                        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            pending.remove(task)
+                            yield task.result()
+            while pending:
+                if ordered:
+                    yield await pending.pop(0)
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.remove(task)
+                        yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
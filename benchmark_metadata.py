@@ -0,0 +1,245 @@
+"""
+Benchmark harness for MetadataExtractor over the bundled samples
+(source_images/image_formats_samples by default).
+
+Measures, per format and per backend, the latency of the first (cold) call in
+the process and of repeated (warm) calls; format discovery with a cold disk
+cache, a warm disk cache and the in-process registry; extraction with and
+without the result cache; and sequential versus parallel throughput.
+Results are written as JSON so runs can be compared between releases:
+
+    python benchmark_metadata.py --repeat 5 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SAMPLES = os.path.join(HERE, "source_images", "image_formats_samples")
+BACKENDS = ('OIIO', 'ExifTool', 'FFmpeg', 'Native')
+
+
+def summarize(durations):
+    """Latency statistics (milliseconds) of a list of durations in seconds."""
+    if not durations:
+        return None
+    ordered = sorted(durations)
+    return {
+        "runs": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def evict_page_cache(file_path):
+    """
+    Ask the OS to drop the cached pages of `file_path` (Linux posix_fadvise) so
+    the next read hits the disk. Returns False where this is not available.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+        return True
+    except OSError:
+        return False
+
+
+def collect_samples(samples_dir):
+    """{format: [file paths]}, the format being the sniffed container (or the extension)."""
+    from format_sniffer import sniff_container
+    samples = {}
+    for dirpath, dirnames, filenames in os.walk(samples_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            file_path = os.path.join(dirpath, filename)
+            file_format = sniff_container(file_path) or os.path.splitext(filename)[1][1:].lower() or "unknown"
+            samples.setdefault(file_format, []).append(file_path)
+    return samples
+
+
+def bench_discovery(repeat):
+    """Format discovery: no disk cache, warm disk cache (new process), in-process registry."""
+    from format_registry import get_format_registry, clear_format_registry
+    cold, warm_disk, in_process = [], [], []
+    for _ in range(repeat):
+        clear_format_registry(remove_cache_file=True)
+        cold.append(timed(get_format_registry)[0])
+        clear_format_registry()
+        warm_disk.append(timed(get_format_registry)[0])
+        in_process.append(timed(get_format_registry)[0])
+    return {"cold": summarize(cold), "warm_disk_cache": summarize(warm_disk), "in_process": summarize(in_process)}
+
+
+def bench_backends(samples, repeat):
+    """
+    Per format and backend: the first call on each file after its pages were
+    evicted from the OS cache (cold) and repeated calls (warm). The very first
+    call of each backend in the process, which also pays for loading OIIO
+    plugins or starting the ExifTool session, is reported under "startup".
+    """
+    from get_metadata import MetadataExtractor
+    results = {"startup": {}, "formats": {}}
+    for file_format, file_paths in sorted(samples.items()):
+        results["formats"][file_format] = {}
+        for tool in BACKENDS:
+            cold, warm = [], []
+            supported = False
+            for file_path in file_paths:
+                backend = MetadataExtractor(file_path).backends(native_first=False)[tool]
+                evict_page_cache(file_path)
+                duration, result = timed(backend)
+                supported = supported or isinstance(result, dict)
+                if tool not in results["startup"]:
+                    results["startup"][tool] = {"format": file_format, "ms": duration * 1000}
+                else:
+                    cold.append(duration)
+                for _ in range(repeat):
+                    warm.append(timed(backend)[0])
+            results["formats"][file_format][tool] = {"supported": supported, "cold": summarize(cold),
+                                                     "warm": summarize(warm)}
+    return results
+
+
+def bench_extraction(samples, repeat, cache_dir):
+    """
+    Whole-file extraction: sequential vs concurrent backends (warm OS cache),
+    then a result cache miss on an evicted file vs result cache hits.
+    """
+    from get_metadata import MetadataExtractor
+    from metadata_cache import MetadataCache
+    cache = MetadataCache(path=os.path.join(cache_dir, "bench_metadata_cache.sqlite"))
+    results = {}
+    for file_format, file_paths in sorted(samples.items()):
+        sequential, concurrent, cache_cold, cache_warm = [], [], [], []
+        for file_path in file_paths:
+            for _ in range(repeat):
+                sequential.append(timed(lambda: MetadataExtractor(file_path).extract_metadata().resolve())[0])
+                concurrent.append(timed(lambda: MetadataExtractor(file_path, concurrent=True).extract_metadata())[0])
+            cache.clear()
+            evict_page_cache(file_path)
+            cache_cold.append(timed(lambda: MetadataExtractor(file_path, cache=cache).extract_metadata().resolve())[0])
+            for _ in range(repeat):
+                cache_warm.append(timed(lambda: MetadataExtractor(file_path, cache=cache).extract_metadata().resolve())[0])
+        results[file_format] = {
+            "sequential_backends": summarize(sequential),
+            "concurrent_backends": summarize(concurrent),
+            "result_cache_miss": summarize(cache_cold),
+            "result_cache_hit": summarize(cache_warm),
+        }
+    stats = cache.stats()
+    cache.close()
+    return results, stats
+
+
+def bench_throughput(samples, repeat, workers):
+    """Files per second over every sample (repeated), one worker vs `workers` workers."""
+    from get_metadata import MetadataExtractor
+    file_paths = [file_path for paths in samples.values() for file_path in paths] * repeat
+    results = {}
+    for label, count in (("sequential", 1), ("parallel", workers)):
+        duration, _ = timed(lambda: list(MetadataExtractor.extract_many(file_paths, workers=count, ordered=False)))
+        results[label] = {
+            "workers": count,
+            "files": len(file_paths),
+            "seconds": duration,
+            "files_per_second": len(file_paths) / duration if duration else None,
+        }
+    return results
+
+
+def environment():
+    from format_registry import get_format_registry
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit or None,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "page_cache_eviction": hasattr(os, "posix_fadvise"),
+        "tool_versions": get_format_registry().tool_versions,
+    }
+
+
+def run(samples_dir=DEFAULT_SAMPLES, repeat=3, workers=None, sections=None):
+    """Run the benchmark sections and return the results as a dict."""
+    workers = workers or os.cpu_count() or 1
+    sections = sections or ("discovery", "backends", "extraction", "throughput")
+    cache_dir = tempfile.mkdtemp(prefix="ocf_metadata_bench_")
+    previous_cache_dir = os.environ.get("OCF_METADATA_CACHE_DIR")
+    # Every cache lives in a scratch directory: runs do not depend on (or touch) the user's caches.
+    os.environ["OCF_METADATA_CACHE_DIR"] = cache_dir
+    try:
+        samples = collect_samples(samples_dir)
+        report = {"samples": {file_format: [os.path.relpath(p, samples_dir) for p in paths]
+                              for file_format, paths in sorted(samples.items())},
+                  "settings": {"samples_dir": samples_dir, "repeat": repeat, "workers": workers}}
+        if "discovery" in sections:
+            report["discovery"] = bench_discovery(repeat)
+        report["environment"] = environment()
+        if "backends" in sections:
+            report["backends"] = bench_backends(samples, repeat)
+        if "extraction" in sections:
+            report["extraction"], report["result_cache"] = bench_extraction(samples, repeat, cache_dir)
+        if "throughput" in sections:
+            report["throughput"] = bench_throughput(samples, repeat, workers)
+        return report
+    finally:
+        if previous_cache_dir is None:
+            os.environ.pop("OCF_METADATA_CACHE_DIR", None)
+        else:
+            os.environ["OCF_METADATA_CACHE_DIR"] = previous_cache_dir
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MetadataExtractor on sample files.")
+    parser.add_argument("--samples", default=DEFAULT_SAMPLES, help="Directory of sample files.")
+    parser.add_argument("--repeat", type=int, default=3, help="Warm runs per measurement.")
+    parser.add_argument("--workers", type=int, help="Workers of the parallel throughput run.")
+    parser.add_argument("--section", action="append", choices=("discovery", "backends", "extraction", "throughput"),
+                        help="Only run this section (repeatable).")
+    parser.add_argument("-o", "--output", help="JSON file to write (default: stdout).")
+    args = parser.parse_args(argv)
+
+    report = run(args.samples, args.repeat, args.workers, args.section)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4, default=str)
+        print(f"Benchmark results written to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=4, default=str)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Deadline budgets for metadata extraction: a budget per file, split into
+per-backend timeouts. A backend that runs out of time returns what it had
+read so far, marked with "timed_out": True.
+"""
+
+import os
+import time
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+TIMED_OUT_KEY = "timed_out"
+
+
+class Deadline:
+    """
+    Time budget of one file. `timeout` bounds the whole file (every backend
+    included), `backend_timeouts` ({'FFmpeg': 10, ...}) bounds each backend call.
+    """
+    def __init__(self, timeout=None, backend_timeouts=None):
+        self.expires = time.monotonic() + timeout if timeout is not None else None
+        self.backend_timeouts = backend_timeouts or {}
+
+    def remaining(self, tool=None):
+        """Seconds left for a call of `tool` (None when it is not bounded)."""
+        limits = []
+        if self.expires is not None:
+            limits.append(max(0.0, self.expires - time.monotonic()))
+        if self.backend_timeouts.get(tool) is not None:
+            limits.append(self.backend_timeouts[tool])
+        return min(limits) if limits else None
+
+
+def timed_out_result(partial=None):
+    """Backend result of a call that ran out of time, keeping the data that did arrive."""
+    result = dict(partial) if isinstance(partial, dict) else {}
+    result[TIMED_OUT_KEY] = True
+    return result
+
+
+def is_timed_out(result):
+    return isinstance(result, dict) and result.get(TIMED_OUT_KEY) is True
+
+
+def salvage_json(text):
+    """
+    Largest parsable prefix of a truncated JSON document (e.g. the output of a
+    killed ffprobe), with its open objects and arrays closed. {} when nothing
+    complete arrived.
+    """
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", errors="replace")
+    stack = []
+    in_string = escaped = False
+    candidates = []
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+            candidates.append((position + 1, "".join(reversed(stack))))
+    for end, closers in reversed(candidates):
+        try:
+            value = json.loads(text[:end] + closers)
+        except ValueError:
+            continue
+        return value if isinstance(value, dict) else {}
+    return {}
+
+
+_deadline_executor = None
+_deadline_executor_lock = threading.Lock()
+
+
+def call_with_timeout(function, timeout):
+    """
+    Run an in-process call (OIIO, native readers) with a timeout. Python cannot
+    interrupt a thread: on timeout the call is abandoned and finishes in the
+    background. Raises concurrent.futures.TimeoutError.
+    """
+    global _deadline_executor
+    if timeout is None:
+        return function()
+    if _deadline_executor is None:
+        with _deadline_executor_lock:
+            if _deadline_executor is None:
+                _deadline_executor = ThreadPoolExecutor(max_workers=4 * (os.cpu_count() or 1),
+                                                        thread_name_prefix="metadata-deadline")
+    return _deadline_executor.submit(function).result(timeout=timeout)
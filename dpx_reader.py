@@ -0,0 +1,352 @@
+"""
+Native DPX (SMPTE 268M) and Cineon header reader. Both formats have fixed-size
+headers, so a frame is described by one read of its first 2048 bytes; whole
+sequences can be decoded at once into NumPy structured arrays for per-frame
+timecode and keycode checks.
+"""
+
+import math
+import struct
+
+from timecode import decode_bcd_timecode
+from instrumentation import open_binary
+
+DPX_MAGIC = {b"SDPX": ">", b"XPDS": "<"}
+CINEON_MAGIC = {b"\x80\x2a\x5f\xd7": ">", b"\xd7\x5f\x2a\x80": "<"}
+HEADER_SIZE = 2048
+UNDEFINED_U32 = 0xFFFFFFFF
+NUMPY_TYPES = {"I": "u4", "i": "i4", "H": "u2", "B": "u1", "f": "f4"}
+DROP_FRAME_FLAG = 0x40
+
+# (name, offset, struct format) of the generic and industry header fields.
+DPX_FIELDS = [
+    # File information
+    ("ImageDataOffset", 4, "I"),
+    ("DPXVersion", 8, "8s"),
+    ("FileSize", 16, "I"),
+    ("DittoKey", 20, "I"),
+    ("GenericHeaderSize", 24, "I"),
+    ("IndustryHeaderSize", 28, "I"),
+    ("UserDataSize", 32, "I"),
+    ("FileName", 36, "100s"),
+    ("CreationDate", 136, "24s"),
+    ("Creator", 160, "100s"),
+    ("Project", 260, "200s"),
+    ("Copyright", 460, "200s"),
+    # Image information (first image element)
+    ("Orientation", 768, "H"),
+    ("NumberOfElements", 770, "H"),
+    ("ImageWidth", 772, "I"),
+    ("ImageHeight", 776, "I"),
+    ("DataSign", 780, "I"),
+    ("ReferenceLowDataCode", 784, "I"),
+    ("ReferenceLowQuantity", 788, "f"),
+    ("ReferenceHighDataCode", 792, "I"),
+    ("ReferenceHighQuantity", 796, "f"),
+    ("Descriptor", 800, "B"),
+    ("Transfer", 801, "B"),
+    ("Colorimetric", 802, "B"),
+    ("BitDepth", 803, "B"),
+    ("Packing", 804, "H"),
+    ("Encoding", 806, "H"),
+    ("DataOffset", 808, "I"),
+    ("ElementDescription", 820, "32s"),
+    # Orientation information
+    ("XOffset", 1408, "I"),
+    ("YOffset", 1412, "I"),
+    ("XCenter", 1416, "f"),
+    ("YCenter", 1420, "f"),
+    ("XOriginalSize", 1424, "I"),
+    ("YOriginalSize", 1428, "I"),
+    ("SourceFileName", 1432, "100s"),
+    ("SourceCreationDate", 1532, "24s"),
+    ("InputDevice", 1556, "32s"),
+    ("InputDeviceSerial", 1588, "32s"),
+    ("PixelAspectHorizontal", 1628, "I"),
+    ("PixelAspectVertical", 1632, "I"),
+    # Motion-picture film information
+    ("FilmMfgID", 1664, "2s"),
+    ("FilmType", 1666, "2s"),
+    ("PerfsOffset", 1668, "2s"),
+    ("KeycodePrefix", 1670, "6s"),
+    ("KeycodeCount", 1676, "4s"),
+    ("FilmFormat", 1680, "32s"),
+    ("FramePosition", 1712, "I"),
+    ("SequenceLength", 1716, "I"),
+    ("HeldCount", 1720, "I"),
+    ("FilmFrameRate", 1724, "f"),
+    ("ShutterAngle", 1728, "f"),
+    ("FrameID", 1732, "32s"),
+    ("Slate", 1764, "100s"),
+    # Television information
+    ("TimeCode", 1920, "I"),
+    ("UserBits", 1924, "I"),
+    ("Interlace", 1928, "B"),
+    ("FieldNumber", 1929, "B"),
+    ("VideoSignal", 1930, "B"),
+    ("HorizontalSampleRate", 1932, "f"),
+    ("VerticalSampleRate", 1936, "f"),
+    ("TVFrameRate", 1940, "f"),
+    ("TimeOffset", 1944, "f"),
+    ("Gamma", 1948, "f"),
+    ("BlackLevel", 1952, "f"),
+    ("BlackGain", 1956, "f"),
+    ("BreakPoint", 1960, "f"),
+    ("WhiteLevel", 1964, "f"),
+    ("IntegrationTimes", 1968, "f"),
+]
+
+CINEON_FIELDS = [
+    # File information
+    ("ImageDataOffset", 4, "I"),
+    ("GenericHeaderSize", 8, "I"),
+    ("IndustryHeaderSize", 12, "I"),
+    ("UserDataSize", 16, "I"),
+    ("FileSize", 20, "I"),
+    ("CineonVersion", 24, "8s"),
+    ("FileName", 32, "100s"),
+    ("CreationDate", 132, "12s"),
+    ("CreationTime", 144, "12s"),
+    # Image information (first channel)
+    ("Orientation", 192, "B"),
+    ("NumberOfElements", 193, "B"),
+    ("Designator", 197, "B"),
+    ("BitDepth", 198, "B"),
+    ("ImageWidth", 200, "I"),
+    ("ImageHeight", 204, "I"),
+    ("MinimumDataValue", 208, "f"),
+    ("MinimumQuantity", 212, "f"),
+    ("MaximumDataValue", 216, "f"),
+    ("MaximumQuantity", 220, "f"),
+    ("WhitePointX", 420, "f"),
+    ("WhitePointY", 424, "f"),
+    ("Label", 452, "200s"),
+    ("Interleave", 680, "B"),
+    ("Packing", 681, "B"),
+    ("DataSign", 682, "B"),
+    ("ImageSense", 683, "B"),
+    # Image origination
+    ("XOffset", 712, "i"),
+    ("YOffset", 716, "i"),
+    ("SourceFileName", 720, "100s"),
+    ("SourceCreationDate", 820, "12s"),
+    ("SourceCreationTime", 832, "12s"),
+    ("InputDevice", 844, "64s"),
+    ("InputDeviceModel", 908, "32s"),
+    ("InputDeviceSerial", 940, "32s"),
+    ("Gamma", 980, "f"),
+    # Motion-picture film information
+    ("FilmMfgID", 1024, "B"),
+    ("FilmType", 1025, "B"),
+    ("PerfsOffset", 1026, "B"),
+    ("KeycodePrefix", 1028, "I"),
+    ("KeycodeCount", 1032, "I"),
+    ("FilmFormat", 1036, "32s"),
+    ("FramePosition", 1068, "I"),
+    ("FilmFrameRate", 1072, "f"),
+    ("FrameID", 1076, "32s"),
+    ("Slate", 1108, "200s"),
+]
+
+DESCRIPTORS = {
+    0: "User-defined", 1: "Red", 2: "Green", 3: "Blue", 4: "Alpha", 6: "Luma", 7: "Chroma",
+    8: "Depth", 9: "Composite video", 50: "RGB", 51: "RGBA", 52: "ABGR", 100: "CbYCrY",
+    101: "CbYaCrYa", 102: "CbYCr", 103: "CbYCrA",
+}
+TRANSFERS = {
+    0: "User-defined", 1: "Printing density", 2: "Linear", 3: "Logarithmic", 4: "Unspecified video",
+    5: "SMPTE 274M", 6: "ITU-R 709-4", 7: "ITU-R 601-5 B or G", 8: "ITU-R 601-5 M",
+    9: "Composite video (NTSC)", 10: "Composite video (PAL)", 11: "Z (linear depth)",
+    12: "Z (homogeneous depth)", 13: "SMPTE ADX",
+}
+
+
+def detect_format(head):
+    """('dpx' | 'cineon', struct byte order) of a header, or None."""
+    magic = bytes(head[:4])
+    if magic in DPX_MAGIC:
+        return "dpx", DPX_MAGIC[magic]
+    if magic in CINEON_MAGIC:
+        return "cineon", CINEON_MAGIC[magic]
+    return None
+
+
+def _clean(fmt, value):
+    """Header value with the "undefined" fills (all bits set, NaN, empty text) mapped to None."""
+    if fmt.endswith("s"):
+        text = value.split(b"\x00", 1)[0]
+        if not text or text.strip(b"\xff") == b"":
+            return None
+        return text.decode("latin-1").strip()
+    if fmt == "I" and value == UNDEFINED_U32:
+        return None
+    if fmt == "H" and value == 0xFFFF:
+        return None
+    if fmt == "B" and value == 0xFF:
+        return None
+    if fmt == "f" and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def decode_header(head):
+    """Flat dict of a DPX or Cineon header (the first 2048 bytes of the file), or None."""
+    detected = detect_format(head)
+    if detected is None or len(head) < HEADER_SIZE:
+        return None
+    kind, byte_order = detected
+    fields = DPX_FIELDS if kind == "dpx" else CINEON_FIELDS
+    metadata = {"Format": kind.upper() if kind == "dpx" else "Cineon",
+                "ByteOrder": "big-endian" if byte_order == ">" else "little-endian"}
+    for name, offset, fmt in fields:
+        value = _clean(fmt, struct.unpack_from(byte_order + fmt, head, offset)[0])
+        if value is not None:
+            metadata[name] = value
+    if kind == "dpx":
+        if "Descriptor" in metadata:
+            metadata["DescriptorName"] = DESCRIPTORS.get(metadata["Descriptor"], metadata["Descriptor"])
+        if "Transfer" in metadata:
+            metadata["TransferName"] = TRANSFERS.get(metadata["Transfer"], metadata["Transfer"])
+        if "Colorimetric" in metadata:
+            metadata["ColorimetricName"] = TRANSFERS.get(metadata["Colorimetric"], metadata["Colorimetric"])
+        if "TimeCode" in metadata:
+            metadata["TimeCode"] = decode_bcd_timecode(metadata["TimeCode"])
+        if "KeycodePrefix" in metadata and "KeycodeCount" in metadata:
+            metadata["Keycode"] = " ".join(
+                [metadata.get("FilmMfgID", ""), metadata.get("FilmType", ""), metadata["KeycodePrefix"],
+                 metadata["KeycodeCount"] + "+" + metadata.get("PerfsOffset", "")]
+            ).strip()
+    return metadata
+
+
+def read_dpx_metadata(file_path):
+    """
+    Header of a DPX or Cineon file as a flat dict for MetadataExtractor's
+    'Native' backend. Returns None for other files.
+    """
+    with open_binary(file_path) as f:
+        head = f.read(HEADER_SIZE)
+    return decode_header(head)
+
+
+# ----------------- Sequences -----------------
+def header_dtype(kind="dpx", byte_order=">"):
+    """NumPy structured dtype overlaying the 2048-byte header of one frame."""
+    import numpy as np
+    fields = DPX_FIELDS if kind == "dpx" else CINEON_FIELDS
+    return np.dtype({
+        "names": [name for name, _, _ in fields],
+        "formats": [("S" + fmt[:-1]) if fmt.endswith("s") else byte_order + NUMPY_TYPES[fmt] for _, _, fmt in fields],
+        "offsets": [offset for _, offset, _ in fields],
+        "itemsize": HEADER_SIZE,
+    })
+
+
+def read_sequence_headers(file_paths):
+    """
+    Headers of every frame of a sequence as one NumPy structured array (native
+    byte order), one row per file. All frames must share one format; a frame
+    that is not DPX/Cineon raises ValueError.
+    """
+    import numpy as np
+    file_paths = list(file_paths)
+    if not file_paths:
+        return np.zeros(0, dtype=header_dtype("dpx", "="))
+    raw = np.zeros((len(file_paths), HEADER_SIZE), dtype=np.uint8)
+    for row, file_path in enumerate(file_paths):
+        with open_binary(file_path) as f:
+            count = f.readinto(memoryview(raw[row]))
+        if count < HEADER_SIZE:
+            raise ValueError(f"Truncated DPX/Cineon header: {file_path}")
+
+    detected = [detect_format(raw[row, :4].tobytes()) for row in range(len(file_paths))]
+    for file_path, frame_format in zip(file_paths, detected):
+        if frame_format is None:
+            raise ValueError(f"Not a DPX/Cineon file: {file_path}")
+    kinds = {kind for kind, _ in detected}
+    if len(kinds) > 1:
+        raise ValueError("Sequence mixes DPX and Cineon frames.")
+    kind = kinds.pop()
+
+    big = np.array([byte_order == ">" for _, byte_order in detected])
+    native_dtype = header_dtype(kind, "=")
+    headers = np.zeros(len(file_paths), dtype=native_dtype)
+    for byte_order, mask in ((">", big), ("<", ~big)):
+        if mask.any():
+            decoded = raw[mask].reshape(-1).view(header_dtype(kind, byte_order))
+            headers[mask] = decoded.astype(native_dtype)
+    return headers
+
+
+def timecode_to_frames(timecodes, rate):
+    """Frame numbers of an array of BCD DPX timecodes (undefined ones become -1)."""
+    import numpy as np
+    timecodes = np.asarray(timecodes, dtype=np.uint32)
+
+    def bcd(shift, mask):
+        byte = (timecodes >> shift) & mask
+        return (byte >> 4).astype(np.int64) * 10 + (byte & 0x0F)
+
+    nominal_rate = int(round(rate))
+    minutes = bcd(24, 0x3F) * 60 + bcd(16, 0x7F)
+    frames = (minutes * 60 + bcd(8, 0x7F)) * nominal_rate + bcd(0, 0x3F)
+    if nominal_rate in (30, 60):
+        # Drop-frame timecode skips 2 (4 at 60 fps) frame numbers every minute but each tenth.
+        drop = (timecodes & DROP_FRAME_FLAG) != 0
+        frames = frames - np.where(drop, nominal_rate // 15 * (minutes - minutes // 10), 0)
+    return np.where(timecodes == UNDEFINED_U32, -1, frames)
+
+
+def keycode_to_perfs(headers, perfs_per_count=64):
+    """Absolute perforation position of each frame's keycode (-1 when absent)."""
+    import numpy as np
+    if headers.dtype["KeycodeCount"].kind == "S":
+        def to_int(values):
+            return np.array([int(value) if value.strip().isdigit() else -1 for value in values.tolist()],
+                            dtype=np.int64)
+        counts = to_int(headers["KeycodeCount"])
+        offsets = to_int(headers["PerfsOffset"])
+    else:
+        counts = headers["KeycodeCount"].astype(np.int64)
+        offsets = headers["PerfsOffset"].astype(np.int64)
+        counts[headers["KeycodeCount"] == UNDEFINED_U32] = -1
+    return np.where((counts < 0) | (offsets < 0), -1, counts * perfs_per_count + offsets)
+
+
+def check_sequence(headers, rate=None, perfs_per_frame=4, perfs_per_count=64):
+    """
+    Per-frame continuity checks of a sequence read by read_sequence_headers.
+    Returns the indices of the frames whose timecode, keycode or film frame
+    position does not follow the previous frame.
+    """
+    import numpy as np
+    report = {"frames": len(headers)}
+    if not len(headers):
+        return report
+
+    if "TimeCode" in headers.dtype.names:
+        if rate is None:
+            rates = headers["TVFrameRate"]
+            rates = rates[np.isfinite(rates) & (rates > 0)]
+            if not len(rates):
+                rates = headers["FilmFrameRate"][np.isfinite(headers["FilmFrameRate"]) & (headers["FilmFrameRate"] > 0)]
+            rate = float(rates[0]) if len(rates) else 24.0
+        frames = timecode_to_frames(headers["TimeCode"], rate)
+        defined = frames >= 0
+        breaks = np.flatnonzero((np.diff(frames) != 1) & defined[1:] & defined[:-1]) + 1
+        report["timecode_rate"] = rate
+        report["timecode_missing"] = np.flatnonzero(~defined).tolist()
+        report["timecode_breaks"] = breaks.tolist()
+
+    perfs = keycode_to_perfs(headers, perfs_per_count)
+    defined = perfs >= 0
+    if defined.any():
+        breaks = np.flatnonzero((np.diff(perfs) != perfs_per_frame) & defined[1:] & defined[:-1]) + 1
+        report["keycode_breaks"] = breaks.tolist()
+
+    positions = headers["FramePosition"].astype(np.int64)
+    defined = headers["FramePosition"] != UNDEFINED_U32
+    if defined.any():
+        breaks = np.flatnonzero((np.diff(positions) != 1) & defined[1:] & defined[:-1]) + 1
+        report["frame_position_breaks"] = breaks.tolist()
+    return report
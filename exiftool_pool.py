@@ -0,0 +1,180 @@
+import os
+import sys
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+
+from instrumentation import span
+
+
+def _normalize_source_path(path):
+    # ExifTool reports SourceFile with forward slashes, whatever the platform.
+    return os.path.normpath(path).replace("\\", "/")
+
+
+class ExifToolPool:
+    """
+    Thread-safe pool of long-lived `exiftool -stay_open` sessions.
+
+    Sessions are started lazily (up to `size`) and handed out one thread at a
+    time, so the Perl interpreter start-up is paid once per session instead of
+    once per file.
+    """
+    def __init__(self, size=None, **exiftool_kwargs):
+        self.size = size or os.cpu_count() or 1
+        self.exiftool_kwargs = exiftool_kwargs
+        self._idle = queue.LifoQueue()
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start_session(self):
+        import exiftool
+        et = exiftool.ExifTool(**self.exiftool_kwargs)
+        # pyexiftool >= 0.5 uses run(), older releases start().
+        start = getattr(et, "run", None) or et.start
+        with span("subprocess", "exiftool-start"):
+            start()
+        return et
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("ExifToolPool is closed.")
+                if len(self._sessions) < self.size:
+                    et = self._start_session()
+                    self._sessions.append(et)
+                    return et
+            # Wake up regularly: a discarded session frees a slot without being put back.
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _release(self, et):
+        if self._closed:
+            self._terminate(et)
+        else:
+            self._idle.put(et)
+
+    def discard(self, et):
+        """Terminate a session and drop it from the pool (e.g. after a broken pipe)."""
+        with self._lock:
+            if et in self._sessions:
+                self._sessions.remove(et)
+        self._terminate(et)
+
+    @staticmethod
+    def _terminate(et):
+        try:
+            et.terminate()
+        except Exception:
+            pass
+
+    @contextmanager
+    def session(self):
+        """Borrow a running ExifTool session for the duration of the with block."""
+        et = self._acquire()
+        try:
+            yield et
+        except Exception:
+            # The session state is unknown after a failure: never hand it out again.
+            self.discard(et)
+            raise
+        else:
+            self._release(et)
+
+    def execute_json(self, *params, timeout=None):
+        """
+        execute_json on a pooled session. With `timeout` (seconds), a session that
+        has not answered in time is killed and discarded, and TimeoutError is raised.
+        """
+        with span("subprocess", "exiftool", files=sum(1 for param in params if not str(param).startswith("-"))):
+            return self._execute_json(params, timeout)
+
+    def _execute_json(self, params, timeout):
+        if timeout is None:
+            with self.session() as et:
+                return et.execute_json(*params)
+        et = self._acquire()
+        expired = threading.Event()
+
+        def kill():
+            expired.set()
+            process = getattr(et, "_process", None)
+            if process is not None:
+                try:
+                    process.kill()
+                except Exception:
+                    pass
+
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            result = et.execute_json(*params)
+        except Exception:
+            timer.cancel()
+            self.discard(et)
+            if expired.is_set():
+                raise TimeoutError(f"ExifTool did not answer within {timeout:g}s.")
+            raise
+        timer.cancel()
+        if expired.is_set():
+            # Answered just as it was being killed: keep the answer, not the session.
+            self.discard(et)
+        else:
+            self._release(et)
+        return result
+
+    def execute_json_batch(self, file_paths, *params, chunk_size=64):
+        """
+        Run ExifTool on many files with one execute_json call per chunk.
+        Returns a dict mapping each input path to its metadata dict (or None).
+        """
+        file_paths = list(file_paths)
+        results = {}
+        for start in range(0, len(file_paths), chunk_size):
+            chunk = file_paths[start:start + chunk_size]
+            try:
+                metadata_list = self.execute_json(*params, *chunk)
+            except Exception:
+                # One unreadable file fails the whole call: fall back to one file at a time.
+                metadata_list = []
+                for file_path in chunk:
+                    try:
+                        metadata_list.extend(self.execute_json(*params, file_path) or [])
+                    except Exception as e:
+                        print(f"ExifTool error for {file_path}: {e}", file=sys.stderr)
+            by_source = {_normalize_source_path(m.get("SourceFile", "")): m for m in metadata_list or []}
+            for file_path in chunk:
+                results[file_path] = by_source.get(_normalize_source_path(file_path))
+        return results
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            sessions, self._sessions = self._sessions, []
+        for et in sessions:
+            self._terminate(et)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_exiftool_pool():
+    """Return the process-wide ExifToolPool, closed automatically at exit."""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = ExifToolPool()
+                atexit.register(_shared_pool.close)
+    return _shared_pool
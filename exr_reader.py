@@ -0,0 +1,195 @@
+"""
+Native OpenEXR header reader: parses the magic number, version flags and the
+attribute list of every part without touching pixel data or loading OpenEXR/OIIO.
+"""
+
+import struct
+
+from timecode import decode_bcd_timecode
+from instrumentation import open_binary
+
+EXR_MAGIC = b"v/1\x01"
+PREFIX_SIZE = 65536
+
+TILED_FLAG = 0x200
+LONG_NAMES_FLAG = 0x400
+NON_IMAGE_FLAG = 0x800
+MULTI_PART_FLAG = 0x1000
+
+COMPRESSION = ["NONE", "RLE", "ZIPS", "ZIP", "PIZ", "PXR24", "B44", "B44A", "DWAA", "DWAB", "HTJ2K"]
+LINE_ORDER = ["INCREASING_Y", "DECREASING_Y", "RANDOM_Y"]
+LEVEL_MODE = ["ONE_LEVEL", "MIPMAP_LEVELS", "RIPMAP_LEVELS"]
+ENVMAP = ["LATLONG", "CUBE"]
+PIXEL_TYPE = ["UINT", "HALF", "FLOAT"]
+DEEP_IMAGE_STATE = ["MESSY", "SORTED", "NON_OVERLAPPING", "TIDY"]
+
+# Fixed-size attribute types: type name -> struct format (little-endian).
+STRUCT_TYPES = {
+    "int": "<i",
+    "float": "<f",
+    "double": "<d",
+    "box2i": "<4i",
+    "box2f": "<4f",
+    "v2i": "<2i",
+    "v2f": "<2f",
+    "v2d": "<2d",
+    "v3i": "<3i",
+    "v3f": "<3f",
+    "v3d": "<3d",
+    "m33f": "<9f",
+    "m33d": "<9d",
+    "m44f": "<16f",
+    "m44d": "<16d",
+}
+
+
+class _HeaderBuffer:
+    """File prefix that grows on demand when a header is larger than PREFIX_SIZE."""
+    def __init__(self, f):
+        self.f = f
+        self.data = f.read(PREFIX_SIZE)
+        self.eof = len(self.data) < PREFIX_SIZE
+
+    def ensure(self, end):
+        while end > len(self.data) and not self.eof:
+            chunk = self.f.read(max(PREFIX_SIZE, end - len(self.data)))
+            self.eof = len(chunk) == 0
+            self.data += chunk
+        if end > len(self.data):
+            raise ValueError("Truncated EXR header.")
+
+    def read_cstring(self, offset):
+        while True:
+            end = self.data.find(b"\x00", offset)
+            if end >= 0:
+                return self.data[offset:end].decode("utf-8", errors="replace"), end + 1
+            self.ensure(len(self.data) + 1)
+
+
+def decode_attribute(type_name, value):
+    """Typed Python value of an EXR attribute."""
+    if type_name in STRUCT_TYPES:
+        decoded = struct.unpack(STRUCT_TYPES[type_name], value[:struct.calcsize(STRUCT_TYPES[type_name])])
+        return decoded[0] if len(decoded) == 1 else decoded
+    if type_name == "string":
+        return value.decode("utf-8", errors="replace")
+    if type_name == "stringvector":
+        strings = []
+        offset = 0
+        while offset + 4 <= len(value):
+            size = struct.unpack_from("<i", value, offset)[0]
+            strings.append(value[offset + 4:offset + 4 + size].decode("utf-8", errors="replace"))
+            offset += 4 + size
+        return strings
+    if type_name == "floatvector":
+        return list(struct.unpack(f"<{len(value) // 4}f", value[:len(value) // 4 * 4]))
+    if type_name == "chlist":
+        channels = {}
+        offset = 0
+        while offset < len(value) and value[offset] != 0:
+            end = value.index(b"\x00", offset)
+            name = value[offset:end].decode("utf-8", errors="replace")
+            pixel_type, p_linear, x_sampling, y_sampling = struct.unpack_from("<iB3xii", value, end + 1)
+            channels[name] = {
+                "type": PIXEL_TYPE[pixel_type] if 0 <= pixel_type < len(PIXEL_TYPE) else pixel_type,
+                "pLinear": bool(p_linear),
+                "xSampling": x_sampling,
+                "ySampling": y_sampling,
+            }
+            offset = end + 17
+        return channels
+    if type_name == "chromaticities":
+        rx, ry, gx, gy, bx, by, wx, wy = struct.unpack("<8f", value[:32])
+        return {"red": (rx, ry), "green": (gx, gy), "blue": (bx, by), "white": (wx, wy)}
+    if type_name in ("compression", "lineOrder", "envmap", "deepImageState"):
+        names = {"compression": COMPRESSION, "lineOrder": LINE_ORDER, "envmap": ENVMAP,
+                 "deepImageState": DEEP_IMAGE_STATE}[type_name]
+        return names[value[0]] if value[0] < len(names) else value[0]
+    if type_name == "rational":
+        numerator, denominator = struct.unpack("<iI", value[:8])
+        return (numerator, denominator)
+    if type_name == "timecode":
+        time_and_flags, user_data = struct.unpack("<II", value[:8])
+        return {"timecode": decode_bcd_timecode(time_and_flags), "timeAndFlags": time_and_flags, "userData": user_data}
+    if type_name == "keycode":
+        fields = ("filmMfcCode", "filmType", "prefix", "count", "perfOffset", "perfsPerFrame", "perfsPerCount")
+        return dict(zip(fields, struct.unpack("<7i", value[:28])))
+    if type_name == "tiledesc":
+        x_size, y_size, mode = struct.unpack("<IIB", value[:9])
+        return {"xSize": x_size, "ySize": y_size, "levelMode": LEVEL_MODE[mode & 0x0F] if (mode & 0x0F) < 3 else mode,
+                "roundingMode": "ROUND_UP" if mode >> 4 else "ROUND_DOWN"}
+    if type_name == "preview":
+        width, height = struct.unpack("<II", value[:8])
+        return {"width": width, "height": height}
+    return value.hex() if len(value) <= 64 else f"<{type_name}: {len(value)} bytes>"
+
+
+def _read_header(buffer, offset):
+    """Attributes of one part header, and the offset right after it."""
+    attributes = {}
+    types = {}
+    while True:
+        buffer.ensure(offset + 1)
+        if buffer.data[offset] == 0:
+            return attributes, types, offset + 1
+        name, offset = buffer.read_cstring(offset)
+        type_name, offset = buffer.read_cstring(offset)
+        buffer.ensure(offset + 4)
+        size = struct.unpack_from("<i", buffer.data, offset)[0]
+        offset += 4
+        if type_name == "preview":
+            buffer.ensure(offset + 8)
+            value = buffer.data[offset:offset + 8]  # Skip the preview pixels.
+        else:
+            buffer.ensure(offset + size)
+            value = buffer.data[offset:offset + size]
+        attributes[name] = decode_attribute(type_name, value)
+        types[name] = type_name
+        offset += size
+
+
+def read_exr_header(file_path, with_types=False):
+    """
+    Parse the headers of an EXR file.
+    Returns {"version": int, "flags": [...], "parts": [attributes, ...]} (plus
+    "types" per part when `with_types`), or None when the file is not an EXR.
+    """
+    with open_binary(file_path) as f:
+        buffer = _HeaderBuffer(f)
+        if buffer.data[:4] != EXR_MAGIC or len(buffer.data) < 8:
+            return None
+        version_field = struct.unpack_from("<I", buffer.data, 4)[0]
+        flags = [name for flag, name in ((TILED_FLAG, "tiled"), (LONG_NAMES_FLAG, "long_names"),
+                                         (NON_IMAGE_FLAG, "deep"), (MULTI_PART_FLAG, "multipart"))
+                 if version_field & flag]
+        parts = []
+        part_types = []
+        offset = 8
+        while True:
+            attributes, types, offset = _read_header(buffer, offset)
+            if not attributes:
+                break
+            parts.append(attributes)
+            part_types.append(types)
+            if not version_field & MULTI_PART_FLAG:
+                break
+    header = {"version": version_field & 0xFF, "flags": flags, "parts": parts}
+    if with_types:
+        header["types"] = part_types
+    return header
+
+
+def read_exr_metadata(file_path):
+    """
+    EXR header as a flat dict for MetadataExtractor's 'Native' backend: the
+    attributes of the first part, plus every part when the file is multi-part.
+    """
+    header = read_exr_header(file_path)
+    if header is None:
+        return None
+    metadata = {"EXRVersion": header["version"], "EXRFlags": header["flags"], "PartCount": len(header["parts"])}
+    if header["parts"]:
+        metadata.update(header["parts"][0])
+    if len(header["parts"]) > 1:
+        metadata["Parts"] = header["parts"]
+    return metadata
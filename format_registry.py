@@ -0,0 +1,260 @@
+import os
+import re
+import sys
+import json
+import shutil
+import subprocess
+import threading
+import tempfile
+import importlib.util
+
+from instrumentation import span, record_cache
+
+# OpenImageIO and pyexiftool are imported on first use only: a warm registry
+# (and any run that does not need those backends) never loads them.
+
+CACHE_FORMAT_VERSION = 1
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_cache_dir():
+    """Directory used for the on-disk caches (override with OCF_METADATA_CACHE_DIR)."""
+    cache_dir = os.environ.get("OCF_METADATA_CACHE_DIR")
+    if not cache_dir:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        cache_dir = os.path.join(base, "ocf_metadata")
+    return cache_dir
+
+
+# ----------------- Format Discovery -----------------
+def discover_oiio_formats():
+    try:
+        import OpenImageIO as oiio
+    except ImportError as e:
+        print("Error retrieving OIIO formats:", str(e), file=sys.stderr)
+        return []
+    oiio_formats = oiio.get_string_attribute("format_list")
+    return [fmt.strip().lower() for fmt in oiio_formats.split(",")] if oiio_formats else []
+
+
+def discover_exiftool_formats():
+    try:
+        import exiftool
+    except ImportError as e:
+        print("Error retrieving ExifTool formats:", str(e), file=sys.stderr)
+        return []
+    try:
+        with exiftool.ExifTool() as et:
+            supported_formats = et.execute("-listf")
+    except OSError as e:
+        # pyexiftool is installed but the exiftool binary is missing or cannot start.
+        print("Error retrieving ExifTool formats:", str(e), file=sys.stderr)
+        return []
+    if isinstance(supported_formats, bytes):
+        supported_formats = supported_formats.decode("utf-8")
+
+    exiftool_formats_list = []
+    capture = False
+    for line in supported_formats.split("\n"):
+        line = line.strip()
+        if line.startswith("Supported file extensions:"):
+            capture = True
+            continue
+        if capture and line:
+            exiftool_formats_list.extend(line.split())
+
+    return sorted(set(fmt.strip().lower() for fmt in exiftool_formats_list))
+
+
+def discover_ffmpeg_formats():
+    try:
+        ffmpeg_output = subprocess.run(["ffmpeg", "-formats"], capture_output=True, text=True)
+        ffmpeg_formats_list = []
+        for line in ffmpeg_output.stdout.split("\n"):
+            line = line.strip()
+            match = re.match(r"^\s*[DE]\s+([\w,]+)", line)
+            if match:
+                formats = match.group(1).split(",")
+                ffmpeg_formats_list.extend([fmt.lower().strip() for fmt in formats])
+        return sorted(set(ffmpeg_formats_list))
+    except Exception as e:
+        print("Error retrieving FFmpeg formats:", str(e), file=sys.stderr)
+        return []
+
+
+# ----------------- Tool Identification -----------------
+def _run_version_command(command):
+    try:
+        output = subprocess.run(command, capture_output=True, text=True)
+        lines = output.stdout.strip().splitlines()
+        return lines[0].strip() if lines else ""
+    except Exception:
+        return ""
+
+
+def _oiio_version():
+    try:
+        import OpenImageIO as oiio
+    except ImportError:
+        return ""
+    return getattr(oiio, "__version__", None) or str(getattr(oiio, "VERSION", ""))
+
+
+def _binary_signature(path):
+    """Cheap identity of a binary (path, mtime, size) used to skip version probes."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return f"{path}|{st.st_mtime_ns}|{st.st_size}"
+
+
+def _search_path_signature(directories):
+    """
+    Identity of a search path (PATH or sys.path) and the mtime of each of its
+    directories: installing a tool into one of them changes it.
+    """
+    parts = []
+    for directory in directories:
+        try:
+            parts.append(f"{directory}:{os.stat(directory or '.').st_mtime_ns}")
+        except OSError:
+            parts.append(directory)
+    return os.pathsep.join(parts)
+
+
+class FormatRegistry:
+    """
+    Supported format sets of OIIO, ExifTool and FFmpeg.
+
+    Discovery runs at most once per process (see get_format_registry) and the
+    results are persisted to a JSON file keyed by each tool's binary path and
+    version, so new processes only pay for a few os.stat calls. Missing or
+    failing tools are persisted as unavailable, keyed by their binary or by the
+    search path they were not found in, and only probed again when it changes.
+    """
+    TOOLS = {
+        "oiio": discover_oiio_formats,
+        "exiftool": discover_exiftool_formats,
+        "ffmpeg": discover_ffmpeg_formats,
+    }
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), "format_registry.json")
+        self._cache = self._load_cache()
+        self._dirty = False
+        self.tool_versions = {}
+        self.formats = {}
+        self.formats_list = {}
+        unavailable = self._cache.setdefault("unavailable", {})
+        for tool, discover in self.TOOLS.items():
+            path, signature = self._locate(tool)
+            if unavailable.get(tool) == signature:
+                # Missing (or failed) with this same binary or search path: no probe, no discovery.
+                record_cache("format_registry", True)
+                version, formats = "", []
+            else:
+                version = self._identify(tool, path)
+                formats = self._lookup(tool, path, version, discover)
+                if not formats:
+                    unavailable[tool] = signature
+                    self._dirty = True
+                elif unavailable.pop(tool, None) is not None:
+                    self._dirty = True
+            self.tool_versions[tool] = {"path": path, "version": version}
+            self.formats_list[tool] = sorted(set(formats))
+            self.formats[tool] = frozenset(self.formats_list[tool])
+        if self._dirty:
+            self._save_cache()
+
+    def _locate(self, tool):
+        """
+        Path of the tool, and the signature of its binary or, when it is not
+        found, of the search path (sys.path for OIIO, PATH otherwise).
+        """
+        if tool == "oiio":
+            # Located without importing it; the version is cached against the module file.
+            spec = importlib.util.find_spec("OpenImageIO")
+            path = spec.origin if spec is not None and spec.origin else "OpenImageIO"
+            search_path = sys.path
+        else:
+            path = shutil.which(tool) or tool
+            search_path = os.environ.get("PATH", "").split(os.pathsep)
+        return path, _binary_signature(path) or _search_path_signature(search_path)
+
+    def _identify(self, tool, path):
+        signature = _binary_signature(path)
+        versions = self._cache.setdefault("versions", {})
+        if signature and signature in versions:
+            return versions[signature]
+        if tool == "oiio":
+            version = _oiio_version()
+        elif tool == "exiftool":
+            version = _run_version_command([path, "-ver"])
+        else:
+            version = _run_version_command([path, "-version"])
+        if signature and version:
+            versions[signature] = version
+            self._dirty = True
+        return version
+
+    def _lookup(self, tool, path, version, discover):
+        entries = self._cache.setdefault("formats", {})
+        key = f"{tool}|{path}|{version}"
+        if version and key in entries:
+            record_cache("format_registry", True)
+            return entries[key]
+        record_cache("format_registry", False)
+        with span("discovery", tool, path=path):
+            formats = discover()
+        # An empty list means the tool is missing or failed: it is recorded as unavailable instead.
+        if version and formats:
+            entries[key] = formats
+            self._dirty = True
+        return formats
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+            if cache.get("cache_format_version") == CACHE_FORMAT_VERSION:
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {"cache_format_version": CACHE_FORMAT_VERSION}
+
+    def _save_cache(self):
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._cache, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write format registry cache {self.cache_path}: {e}", file=sys.stderr)
+
+    def supports(self, tool, extension):
+        return extension.lower() in self.formats[tool]
+
+
+def get_format_registry():
+    """Return the process-wide FormatRegistry, building it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FormatRegistry()
+    return _registry
+
+
+def clear_format_registry(remove_cache_file=False):
+    """Forget the in-process registry (and optionally the on-disk cache)."""
+    global _registry
+    with _registry_lock:
+        if remove_cache_file:
+            cache_path = _registry.cache_path if _registry is not None else os.path.join(get_cache_dir(), "format_registry.json")
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+        _registry = None
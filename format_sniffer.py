@@ -0,0 +1,115 @@
+from instrumentation import open_binary
+
+SNIFF_BYTES = 4096
+
+# Backends able to read each container (the file extension is ignored once sniffed).
+CONTAINER_BACKENDS = {
+    "mxf": frozenset(["ExifTool", "FFmpeg"]),
+    "quicktime": frozenset(["ExifTool", "FFmpeg"]),
+    "mp4": frozenset(["ExifTool", "FFmpeg"]),
+    "heif": frozenset(["OIIO", "ExifTool"]),
+    "r3d": frozenset(["ExifTool"]),
+    "arriraw": frozenset(["ExifTool"]),
+    "exr": frozenset(["OIIO", "ExifTool"]),
+    "dpx": frozenset(["OIIO", "ExifTool"]),
+    "cineon": frozenset(["OIIO", "ExifTool"]),
+    "tiff": frozenset(["OIIO", "ExifTool"]),
+    "jpeg": frozenset(["OIIO", "ExifTool"]),
+    "png": frozenset(["OIIO", "ExifTool"]),
+    "psd": frozenset(["OIIO", "ExifTool"]),
+    "hdr": frozenset(["OIIO", "ExifTool"]),
+    "gif": frozenset(["OIIO", "ExifTool"]),
+    "webp": frozenset(["OIIO", "ExifTool", "FFmpeg"]),
+    "wav": frozenset(["ExifTool", "FFmpeg"]),
+    "hevc": frozenset(["FFmpeg"]),
+    "h264": frozenset(["FFmpeg"]),
+}
+
+MXF_PARTITION_PACK_PREFIX = bytes.fromhex("060e2b34020501010d01020101")
+QUICKTIME_TOP_LEVEL_ATOMS = {b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot", b"uuid"}
+HEIF_BRANDS = {b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"mif1", b"msf1", b"avif", b"avis"}
+QUICKTIME_BRANDS = {b"qt  "}
+
+
+def _sniff_ftyp(head):
+    brands = [head[8:12]]
+    size = int.from_bytes(head[0:4], "big")
+    for offset in range(16, min(size, len(head)), 4):
+        brands.append(head[offset:offset + 4])
+    if brands[0] in QUICKTIME_BRANDS:
+        return "quicktime"
+    if brands[0] in HEIF_BRANDS or (brands[0] not in (b"isom", b"mp41", b"mp42") and HEIF_BRANDS & set(brands)):
+        return "heif"
+    return "mp4"
+
+
+def _sniff_annexb(head):
+    if head.startswith(b"\x00\x00\x00\x01"):
+        nal = head[4:6]
+    elif head.startswith(b"\x00\x00\x01"):
+        nal = head[3:5]
+    else:
+        return None
+    if len(nal) < 2:
+        return None
+    if (nal[0] >> 1) & 0x3F in (32, 33, 34, 35) and nal[1] & 0x07:
+        return "hevc"
+    if nal[0] & 0x1F in (7, 9) and not nal[0] & 0x80:
+        return "h264"
+    return None
+
+
+def sniff_bytes(head):
+    """Container name identified from the first bytes of a file, or None."""
+    if len(head) < 4:
+        return None
+    magic = head[:4]
+    if magic == b"v/1\x01":
+        return "exr"
+    if magic in (b"SDPX", b"XPDS"):
+        return "dpx"
+    if magic in (b"\x80\x2a\x5f\xd7", b"\xd7\x5f\x2a\x80"):
+        return "cineon"
+    if magic in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"):
+        return "tiff"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if magic == b"8BPS":
+        return "psd"
+    if head.startswith(b"#?RADIANCE") or head.startswith(b"#?RGBE"):
+        return "hdr"
+    if head.startswith(b"GIF87a") or head.startswith(b"GIF89a"):
+        return "gif"
+    if magic == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if magic == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if magic == b"ARRI":
+        return "arriraw"
+    if head[4:8] in (b"RED1", b"RED2"):
+        return "r3d"
+    if head[4:8] == b"ftyp":
+        return _sniff_ftyp(head)
+    if head[4:8] in QUICKTIME_TOP_LEVEL_ATOMS:
+        return "quicktime"
+    # MXF files may start with a run-in before the header partition pack.
+    if MXF_PARTITION_PACK_PREFIX in head:
+        return "mxf"
+    return _sniff_annexb(head)
+
+
+def sniff_container(file_path, size=SNIFF_BYTES):
+    """Read the first `size` bytes of a file once and identify its container."""
+    try:
+        with open_binary(file_path) as f:
+            head = f.read(size)
+    except OSError:
+        return None
+    return sniff_bytes(head)
+
+
+def backends_for_container(container):
+    """Backends able to read a sniffed container (None when it was not identified)."""
+    return CONTAINER_BACKENDS.get(container)
@@ -1,59 +1,229 @@
 import os
-import OpenImageIO as oiio
-import exiftool
 import subprocess
 import json
-import re
+import threading
+from functools import partial
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from format_registry import (
+    get_format_registry,
+    discover_oiio_formats,
+    discover_exiftool_formats,
+    discover_ffmpeg_formats,
+)
+from exiftool_pool import get_exiftool_pool
+from metadata_cache import get_metadata_cache
+from key_selectors import compile_selector
+from format_sniffer import sniff_container, backends_for_container
+from deadlines import Deadline, call_with_timeout, is_timed_out, salvage_json, timed_out_result
+from instrumentation import span, traced
+from metadata_record import MetadataRecord
+
+from mxf_reader import read_mxf_header
+from exr_reader import read_exr_metadata
+from mov_reader import read_mov_metadata
+from dpx_reader import read_dpx_metadata
+
+TOOL_FORMAT_KEYS = {'OIIO': "oiio", 'ExifTool': "exiftool", 'FFmpeg': "ffmpeg"}
+# Bounds of ffprobe's stream analysis in projection mode (bytes, microseconds):
+# the projected fields come from the container and codec headers.
+FFPROBE_PROBESIZE = 1000000
+FFPROBE_ANALYZEDURATION = 1000000
+# Containers whose metadata is all in a fixed header (no maker notes, nothing
+# after the image data), where ExifTool's -fast2 cannot lose anything.
+EXIFTOOL_FAST2_CONTAINERS = frozenset(["exr", "dpx", "cineon", "hdr"])
+# Extraction tiers: "quick" for ingest triage (sniffing, native header readers,
+# ExifTool -fast2, no ffprobe), "standard" (every backend, full output) and
+# "deep" (plus maker notes and embedded data, a full ffprobe analysis and the
+# vendor tools). Each tier's backends, in the order results are reported.
+TIERS = ("quick", "standard", "deep")
+DEFAULT_TIER = "standard"
+TIER_BACKENDS = {
+    "quick": ('ExifTool', 'Native'),
+    "standard": ('OIIO', 'ExifTool', 'FFmpeg', 'Native'),
+    "deep": ('OIIO', 'ExifTool', 'FFmpeg', 'Native', 'Vendor'),
+}
+# Deep tier: unknown and embedded tags (per-frame camera data of video files),
+# and an ffprobe reading far enough to count every packet.
+EXIFTOOL_DEEP_ARGS = ("-u", "-ee")
+FFPROBE_DEEP_PROBESIZE = 5000000000
+FFPROBE_DEEP_ANALYZEDURATION = 2147000000
+# Sniffed container -> pure-Python header reader used by the 'Native' backend.
+NATIVE_READERS = {
+    "mxf": read_mxf_header,
+    "exr": read_exr_metadata,
+    "quicktime": read_mov_metadata,
+    "mp4": read_mov_metadata,
+    "dpx": read_dpx_metadata,
+    "cineon": read_dpx_metadata,
+}
+
+# Containers whose native reader stands in for the tools at the quick tier:
+# ExifTool only runs when the header cannot be parsed. The standard and deep
+# tiers always run every tool.
+NATIVE_FIRST_CONTAINERS = {"mxf": ('ExifTool', 'FFmpeg')}
+NATIVE_FIRST_TIERS = ("quick",)
+
+_backend_executor = None
+_backend_executor_lock = threading.Lock()
+
+
+def get_backend_executor():
+    """Thread pool shared by the concurrent backend calls of every extractor."""
+    global _backend_executor
+    if _backend_executor is None:
+        with _backend_executor_lock:
+            if _backend_executor is None:
+                _backend_executor = ThreadPoolExecutor(max_workers=3 * (os.cpu_count() or 1),
+                                                       thread_name_prefix="metadata-backend")
+    return _backend_executor
+
+def native_parsed(section):
+    """Whether a 'Native' section holds a parsed header (not a message, an error or a timeout)."""
+    return isinstance(section, dict) and "Error" not in section and not is_timed_out(section)
+
+
+def native_first_message(container):
+    return f"Read by the native {container.upper()} reader (see Native)."
+
+
+class _CallOnce:
+    """Calls `function` on first use and returns its result to every caller."""
+    def __init__(self, function):
+        self._function = function
+        self._lock = threading.Lock()
+        self._called = False
+        self._result = None
+
+    def __call__(self):
+        with self._lock:
+            if not self._called:
+                self._result = self._function()
+                self._called = True
+        return self._result
+
+
+class LazyMetadata(Mapping):
+    """
+    Read-only mapping of backend name -> metadata where each backend runs on
+    first access of its section. `on_complete` is called with the plain dict
+    of the sections once every section has been computed. `tier` is the
+    extraction tier the backends were set up for.
+    """
+    def __init__(self, backends, values=None, on_complete=None, tier=None):
+        self._backends = backends
+        self._values = {tool: value for tool, value in (values or {}).items() if tool in backends}
+        self._locks = {tool: threading.Lock() for tool in backends}
+        self._on_complete = on_complete
+        self.tier = tier
+
+    def __getitem__(self, tool):
+        if tool not in self._values:
+            if tool not in self._backends:
+                raise KeyError(tool)
+            with self._locks[tool]:
+                if tool not in self._values:
+                    self._values[tool] = self._backends[tool]()
+                    self._check_complete()
+        return self._values[tool]
+
+    def __iter__(self):
+        return iter(self._backends)
+
+    def __len__(self):
+        return len(self._backends)
+
+    def __repr__(self):
+        sections = ", ".join(f"{tool!r}: {self._values[tool]!r}" if tool in self._values else f"{tool!r}: <pending>"
+                             for tool in self._backends)
+        return f"LazyMetadata({{{sections}}})"
+
+    def is_resolved(self, tool):
+        return tool in self._values
+
+    def _check_complete(self):
+        if self._on_complete and len(self._values) == len(self._backends):
+            on_complete, self._on_complete = self._on_complete, None
+            on_complete({tool: self._values[tool] for tool in self._backends})
+
+    def resolve(self, tools=None, concurrent=False):
+        """Compute the given sections (default: all), optionally in parallel. Returns self."""
+        pending = [tool for tool in (tools if tools is not None else self._backends)
+                   if tool in self._backends and tool not in self._values]
+        if concurrent and len(pending) > 1:
+            executor = get_backend_executor()
+            for future in [executor.submit(self.__getitem__, tool) for tool in pending]:
+                future.result()
+        else:
+            for tool in pending:
+                self[tool]
+        return self
+
+    def to_dict(self):
+        """Plain (JSON-serializable) dict of every section, with the "Tier" when known."""
+        result = {tool: self[tool] for tool in self._backends}
+        if self.tier is not None:
+            result["Tier"] = self.tier
+        return result
+
 
 class MetadataExtractor:
-    def __init__(self, file_path):
-        """Initialize MetadataExtractor with a specific file patpwd."""
+    def __init__(self, file_path, concurrent=False, cache=None, sniff=True, timeout=None, backend_timeouts=None,
+                 tier=DEFAULT_TIER):
+        """
+        Initialize MetadataExtractor with a specific file path.
+        `cache` is an optional MetadataCache (or True for the shared default cache).
+        With `sniff`, backends are chosen from the file's magic bytes rather than its extension.
+        `timeout` is the time budget (seconds) of one extraction of the file and
+        `backend_timeouts` ({'FFmpeg': 10, ...}) the budget of each backend call: a
+        backend that runs out of time is stopped and returns the data it had read
+        so far with "timed_out": True.
+        `tier` ("quick", "standard" or "deep", see TIERS) is the default depth of
+        the extractions; each extraction method can override it.
+        """
+        if tier not in TIERS:
+            raise ValueError(f"Unknown extraction tier {tier!r}, expected one of {', '.join(TIERS)}.")
         self.file_path = file_path
-        self.oiio_formats_list = self.get_oiio_formats()
-        self.exiftool_formats_list = self.get_exiftool_formats()
-        self.ffmpeg_formats_list = self.get_ffmpeg_formats()
-        self.common_formats_oiio_exiftool = sorted(set(self.oiio_formats_list) & set(self.exiftool_formats_list))
-        self.common_formats_exiftool_ffmpeg = sorted(set(self.exiftool_formats_list) & set(self.ffmpeg_formats_list))
+        self.tier = tier
+        self.concurrent = concurrent
+        self.cache = get_metadata_cache() if cache is True else cache
+        self.sniff = sniff
+        self.timeout = timeout
+        self.backend_timeouts = backend_timeouts
+        self._deadline = None
+        self._container = None
+        self._sniffed = False
+        # Format discovery is shared by every extractor of the process (and cached on disk).
+        registry = get_format_registry()
+        self.registry = registry
+        self.tool_versions = registry.tool_versions
+        self.oiio_formats = registry.formats["oiio"]
+        self.exiftool_formats = registry.formats["exiftool"]
+        self.ffmpeg_formats = registry.formats["ffmpeg"]
+        self.oiio_formats_list = registry.formats_list["oiio"]
+        self.exiftool_formats_list = registry.formats_list["exiftool"]
+        self.ffmpeg_formats_list = registry.formats_list["ffmpeg"]
+
+    @property
+    def common_formats_oiio_exiftool(self):
+        return sorted(self.oiio_formats & self.exiftool_formats)
+
+    @property
+    def common_formats_exiftool_ffmpeg(self):
+        return sorted(self.exiftool_formats & self.ffmpeg_formats)
 
     @staticmethod
     def get_oiio_formats():
-        oiio_formats = oiio.get_string_attribute("format_list")
-        return [fmt.strip().lower() for fmt in oiio_formats.split(",")] if oiio_formats else []
+        return discover_oiio_formats()
 
     @staticmethod
     def get_exiftool_formats():
-        with exiftool.ExifTool() as et:
-            supported_formats = et.execute("-listf")
-            if isinstance(supported_formats, bytes):
-                supported_formats = supported_formats.decode("utf-8")
-
-            exiftool_formats_list = []
-            capture = False
-            for line in supported_formats.split("\n"):
-                line = line.strip()
-                if line.startswith("Supported file extensions:"):
-                    capture = True
-                    continue
-                if capture and line:
-                    exiftool_formats_list.extend(line.split())
-
-            return sorted(set(fmt.strip().lower() for fmt in exiftool_formats_list))
+        return discover_exiftool_formats()
 
     @staticmethod
     def get_ffmpeg_formats():
-        try:
-            ffmpeg_output = subprocess.run(["ffmpeg", "-formats"], capture_output=True, text=True)
-            ffmpeg_formats_list = []
-            for line in ffmpeg_output.stdout.split("\n"):
-                line = line.strip()
-                match = re.match(r"^\s*[DE]\s+([\w,]+)", line)
-                if match:
-                    formats = match.group(1).split(",")
-                    ffmpeg_formats_list.extend([fmt.lower().strip() for fmt in formats])
-            return sorted(set(ffmpeg_formats_list))
-        except Exception as e:
-            print("\nError retrieving FFmpeg formats:", str(e))
-            return []
+        return discover_ffmpeg_formats()
 
     # ----------------- Display Supported Formats -----------------
     def display_supported_formats(self):
@@ -79,39 +249,355 @@ class MetadataExtractor:
         print(f"Formats supported by BOTH ExifTool and FFmpeg: \n{self.common_formats_exiftool_ffmpeg}\n")
 
 
-    def extract_metadata(self):
-        file_extension = os.path.splitext(self.file_path)[1][1:].lower()
-        metadata_results = {}
+    def file_extension(self):
+        return os.path.splitext(self.file_path)[1][1:].lower()
 
-        if file_extension in self.oiio_formats_list:
-            image = oiio.ImageInput.open(self.file_path)
-            if image:
-                spec = image.spec()
-                metadata_results['OIIO'] = {str(a.name): str(a.value) for a in spec.extra_attribs}
-                image.close()
-            else:
-                metadata_results['OIIO'] = "OIIO does not support this file format."
-        else:
-            metadata_results['OIIO'] = "OIIO does not support this file format."
+    @property
+    def container(self):
+        """Container identified from the first bytes of the file (None when unknown)."""
+        if self.sniff and not self._sniffed:
+            self._container = sniff_container(self.file_path)
+            self._sniffed = True
+        return self._container
 
-        if file_extension in self.exiftool_formats_list:
-            with exiftool.ExifTool() as et:
-                metadata_list = et.execute_json(self.file_path)
-                metadata_results['ExifTool'] = metadata_list[0] if metadata_list else "ExifTool could not extract metadata."
-        else:
-            metadata_results['ExifTool'] = "ExifTool does not support this file format."
+    def supports(self, tool):
+        """
+        Whether a backend can read the file: decided by the sniffed container when
+        there is one (renamed files, shared extensions such as .mxf), otherwise by
+        the file extension.
+        """
+        formats = self.registry.formats[TOOL_FORMAT_KEYS[tool]]
+        container_backends = backends_for_container(self.container)
+        if container_backends is not None:
+            return tool in container_backends and bool(formats)
+        return self.file_extension() in formats
+
+    # ----------------- Backends -----------------
+    def backend_timeout(self, tool):
+        """Seconds left for a call of `tool` under the current deadline (None when unbounded)."""
+        if self._deadline is None:
+            self._deadline = Deadline(self.timeout, self.backend_timeouts)
+        return self._deadline.remaining(tool)
+
+    def extract_oiio_metadata(self):
+        if not self.supports('OIIO'):
+            return "OIIO does not support this file format."
+        timeout = self.backend_timeout('OIIO')
+        if timeout is not None and timeout <= 0:
+            return timed_out_result()
+        try:
+            return call_with_timeout(self._read_oiio_metadata, timeout)
+        except FutureTimeoutError:
+            return timed_out_result()
+
+    def _read_oiio_metadata(self):
+        import OpenImageIO as oiio
+        image = oiio.ImageInput.open(self.file_path)
+        if not image:
+            return "OIIO does not support this file format."
+        spec = image.spec()
+        metadata = {str(a.name): str(a.value) for a in spec.extra_attribs}
+        image.close()
+        return metadata
+
+    def extract_exiftool_metadata(self, tags=None, tier=None):
+        """
+        ExifTool metadata; with `tags` (e.g. ["-*ImageWidth*", "-File:FileName"]) only
+        those tags are extracted, with -fast/-fast2 (the pool's sessions already use -n).
+        `tier` (default: the extractor's) sets the depth of a full extraction.
+        """
+        if not self.supports('ExifTool'):
+            return "ExifTool does not support this file format."
+        timeout = self.backend_timeout('ExifTool')
+        if timeout is not None and timeout <= 0:
+            return timed_out_result()
+        try:
+            metadata_list = get_exiftool_pool().execute_json(*self.exiftool_params(tags, tier), timeout=timeout)
+        except TimeoutError:
+            # ExifTool answers in one block: nothing arrived.
+            return timed_out_result()
+        return metadata_list[0] if metadata_list else "ExifTool could not extract metadata."
+
+    def exiftool_params(self, tags=None, tier=None):
+        """Arguments of the ExifTool call for this file (see extract_exiftool_metadata)."""
+        if not tags:
+            tier = tier or self.tier
+            if tier == "quick":
+                return ["-fast2", self.file_path]
+            if tier == "deep":
+                return [*EXIFTOOL_DEEP_ARGS, self.file_path]
+            return [self.file_path]
+        return ["-fast2" if self.container in EXIFTOOL_FAST2_CONTAINERS else "-fast", *tags, self.file_path]
 
-        if file_extension in self.ffmpeg_formats_list:
+    def extract_ffmpeg_metadata(self, entries=None, tier=None):
+        """
+        ffprobe streams and format; with `entries` (a -show_entries argument such as
+        "stream=codec_name,width:format=duration") only those fields are probed,
+        with a bounded probe size and analysis duration. At the deep `tier`
+        (default: the extractor's) the whole file is analyzed, with packet counts,
+        chapters and programs.
+        """
+        if not self.supports('FFmpeg'):
+            return "FFmpeg does not support this file format."
+        timeout = self.backend_timeout('FFmpeg')
+        if timeout is not None and timeout <= 0:
+            return timed_out_result()
+        with span("subprocess", "ffprobe", file=self.file_path):
             try:
-                ffmpeg_output = subprocess.run(["ffprobe", "-show_format", "-show_streams", "-print_format", "json", self.file_path],
-                                               capture_output=True, text=True)
-                metadata_results['FFmpeg'] = json.loads(ffmpeg_output.stdout) if ffmpeg_output.stdout else {}
+                process = subprocess.Popen(self.ffprobe_command(entries, tier), stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE, text=True)
             except Exception as e:
-                metadata_results['FFmpeg'] = {"Error": str(e)}
+                return {"Error": str(e)}
+            try:
+                stdout, _ = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                stdout, _ = process.communicate()
+                return timed_out_result(salvage_json(stdout or ""))
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+        try:
+            return json.loads(stdout) if stdout else {}
+        except Exception as e:
+            return {"Error": str(e)}
+
+    def ffprobe_command(self, entries=None, tier=None):
+        """Command line of the ffprobe call for this file (see extract_ffmpeg_metadata)."""
+        if entries:
+            command = ["ffprobe", "-v", "error", "-probesize", str(FFPROBE_PROBESIZE),
+                       "-analyzeduration", str(FFPROBE_ANALYZEDURATION), "-show_entries", entries]
+        elif (tier or self.tier) == "deep":
+            command = ["ffprobe", "-probesize", str(FFPROBE_DEEP_PROBESIZE),
+                       "-analyzeduration", str(FFPROBE_DEEP_ANALYZEDURATION), "-count_packets",
+                       "-show_format", "-show_streams", "-show_chapters", "-show_programs"]
         else:
-            metadata_results['FFmpeg'] = "FFmpeg does not support this file format."
+            command = ["ffprobe", "-show_format", "-show_streams"]
+        return command + ["-print_format", "json", self.file_path]
+
+    def extract_native_metadata(self):
+        """Header metadata read directly in Python (no subprocess) for containers that have a native reader."""
+        container = self.container if self.sniff else sniff_container(self.file_path)
+        reader = NATIVE_READERS.get(container)
+        if reader is None:
+            return "No native reader for this file format."
+        timeout = self.backend_timeout('Native')
+        if timeout is not None and timeout <= 0:
+            return timed_out_result()
+        try:
+            metadata = call_with_timeout(lambda: reader(self.file_path), timeout)
+        except FutureTimeoutError:
+            return timed_out_result()
+        except Exception as e:
+            return {"Error": str(e)}
+        return metadata if metadata is not None else "No native reader for this file format."
+
+    def extract_vendor_metadata(self, runner=None):
+        """
+        Metadata read by the camera vendor's tool (art-cmd, REDline, rawexporter,
+        see ocf_export.py). `runner` is an optional ocf_export.ToolRunner able to
+        terminate the tool from another thread.
+        """
+        from ocf_export import detect_camera_type, read_vendor_metadata
+        camera_type = detect_camera_type(self.file_path)
+        if camera_type is None:
+            return "No vendor tool for this file format."
+        timeout = self.backend_timeout('Vendor')
+        if timeout is not None and timeout <= 0:
+            return timed_out_result()
+        try:
+            return read_vendor_metadata(self.file_path, camera_type, timeout=timeout, runner=runner)
+        except subprocess.TimeoutExpired:
+            return timed_out_result()
+        except Exception as e:
+            return {"Error": str(e)}
+
+    def backends(self, projection=None, tier=None, native_first=True):
+        """
+        Backend name -> extraction method of the `tier` (default: the extractor's),
+        in the order results are reported. `projection` is a KeySelector whose keys
+        are pushed down into the ExifTool and ffprobe command lines. With
+        `native_first`, the tools the native reader stands in for (see
+        native_first_tools) only run when it cannot parse the file.
+        """
+        tier = tier or self.tier
+        methods = {
+            'OIIO': self.extract_oiio_metadata,
+            'ExifTool': partial(self.extract_exiftool_metadata, tier=tier),
+            'FFmpeg': partial(self.extract_ffmpeg_metadata, tier=tier),
+            'Native': self.extract_native_metadata,
+            'Vendor': self.extract_vendor_metadata,
+        }
+        backends = {tool: methods[tool] for tool in TIER_BACKENDS[tier]}
+        if projection is not None:
+            tags = projection.exiftool_tags()
+            entries = projection.ffprobe_entries()
+            if tags and 'ExifTool' in backends:
+                backends['ExifTool'] = partial(self.extract_exiftool_metadata, tags)
+            if entries and 'FFmpeg' in backends:
+                backends['FFmpeg'] = partial(self.extract_ffmpeg_metadata, entries)
+        backends = {tool: traced(backend, "backend", tool, file=self.file_path) for tool, backend in backends.items()}
+        replaced = self.native_first_tools(tier) if native_first else ()
+        if replaced:
+            # The native reader runs once, first; the tools are only called when it cannot parse the file.
+            backends['Native'] = _CallOnce(backends['Native'])
+            for tool in replaced:
+                if tool in backends:
+                    backends[tool] = partial(self._unless_native, backends['Native'], backends[tool])
+        return backends
+
+    def native_first_tools(self, tier=None):
+        """
+        Backends the native reader stands in for at the `tier` (default: the
+        extractor's), see NATIVE_FIRST_CONTAINERS; empty for other containers.
+        """
+        if (tier or self.tier) not in NATIVE_FIRST_TIERS:
+            return ()
+        return NATIVE_FIRST_CONTAINERS.get(self.container, ())
 
-        return metadata_results
+    def _unless_native(self, native, backend):
+        if native_parsed(native()):
+            return native_first_message(self.container)
+        return backend()
+
+    def lazy_metadata(self, projection=None, tier=None, native_first=True):
+        """
+        Unresolved LazyMetadata of the file at the `tier` (default: the
+        extractor's), or the cached result when there is one. `native_first`
+        is passed to backends().
+        """
+        tier = tier or self.tier
+        if tier not in TIERS:
+            raise ValueError(f"Unknown extraction tier {tier!r}, expected one of {', '.join(TIERS)}.")
+        # The deadline budget starts with each extraction.
+        self._deadline = Deadline(self.timeout, self.backend_timeouts)
+        backends = self.backends(projection, tier, native_first)
+        variant = ""
+        if projection is not None:
+            # Projected results are partial: cached apart from the full ones.
+            variant = json.dumps(["projection", projection.exiftool_tags(), projection.ffprobe_entries()])
+        if native_first and self.native_first_tools(tier):
+            # Sections the native reader stood in for are messages: cached apart from the tools' output.
+            variant = json.dumps(["native_first", variant])
+        if tier != DEFAULT_TIER:
+            # Keys of standard results are unchanged, so existing cache entries stay valid.
+            variant = json.dumps(["tier", tier, variant])
+        cache_key = self.cache.make_key(self.file_path, self.tool_versions, variant) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return LazyMetadata(backends, values=cached, tier=tier)
+            return LazyMetadata(backends, on_complete=lambda results: self._cache_results(cache_key, results),
+                                tier=tier)
+        return LazyMetadata(backends, tier=tier)
+
+    def _cache_results(self, cache_key, results):
+        # Results cut short by a deadline are not worth keeping.
+        if not any(is_timed_out(section) for section in results.values()):
+            self.cache.put(cache_key, results)
+
+    def extract_metadata(self, concurrent=None, tier=None):
+        """
+        Metadata of every backend of the `tier` (default: the extractor's), as a
+        LazyMetadata mapping: a backend only runs when its section is first
+        accessed. In concurrent mode all backends run right away at the same
+        time on a shared thread pool (OIIO and subprocess waits release the GIL),
+        so the call takes as long as the slowest backend. With a cache, unchanged
+        files are answered without running any backend.
+        """
+        metadata = self.lazy_metadata(tier=tier)
+        concurrent = self.concurrent if concurrent is None else concurrent
+        if concurrent:
+            metadata.resolve(concurrent=True)
+        return metadata
+
+    @classmethod
+    def extract_many(cls, file_paths, workers=None, ordered=True, keys=None, projection=False, records=False,
+                     **extractor_kwargs):
+        """
+        Extract metadata from many files on a pool of worker threads.
+        Yields (file_path, metadata) pairs, in input order when `ordered` is True,
+        otherwise as soon as each file is done. At most 2 * workers files are in
+        flight, so `file_paths` can be a lazy iterable of any length.
+        With `keys`, each file yields extract_selected_metadata(keys, projection);
+        with `records`, a MetadataRecord (True, or a dict of extract_record arguments).
+        The extraction tier of the batch is passed like the other extractor
+        arguments (tier="quick").
+        """
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = 2 * workers
+        selector = compile_selector(keys) if keys else None
+
+        def extract(file_path):
+            try:
+                extractor = cls(file_path, **extractor_kwargs)
+                if selector is not None:
+                    return extractor.extract_selected_metadata(selector, projection=projection)
+                if records:
+                    return extractor.extract_record(**(records if isinstance(records, dict) else {}))
+                return extractor.extract_metadata().resolve()
+            except Exception as e:
+                return {"Error": str(e)}
+
+        paths = iter(file_paths)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metadata-file")
+        try:
+            if ordered:
+                pending = deque()
+                for file_path in paths:
+                    pending.append((file_path, executor.submit(extract, file_path)))
+                    if len(pending) >= max_in_flight:
+                        done_path, future = pending.popleft()
+                        yield done_path, future.result()
+                while pending:
+                    done_path, future = pending.popleft()
+                    yield done_path, future.result()
+            else:
+                pending = {}
+                for file_path in paths:
+                    pending[executor.submit(extract, file_path)] = file_path
+                    if len(pending) >= max_in_flight:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield pending.pop(future), future.result()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+        finally:
+            # Also reached when the caller stops iterating early.
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def extract_sequences(cls, folder, sample=0, min_frames=2, workers=None, **extractor_kwargs):
+        """
+        Sequence mode for a folder of frames (see sequences.py): each image
+        sequence yields (pattern, report) where only the first frame and `sample`
+        more are probed and every other frame is just stat'ed; other files yield
+        (file_path, metadata) as in extract_many.
+        """
+        from sequences import extract_folder
+        return extract_folder(folder, sample=sample, min_frames=min_frames, workers=workers, **extractor_kwargs)
+
+    @classmethod
+    def extract_exiftool_batch(cls, file_paths, chunk_size=64):
+        """
+        ExifTool metadata for many files, sharing one execute_json call per chunk.
+        Returns {file_path: metadata} with the same values as extract_metadata()['ExifTool'].
+        """
+        file_paths = list(file_paths)
+        results = {}
+        supported = []
+        for file_path in file_paths:
+            if cls(file_path).supports('ExifTool'):
+                supported.append(file_path)
+            else:
+                results[file_path] = "ExifTool does not support this file format."
+        batch = get_exiftool_pool().execute_json_batch(supported, chunk_size=chunk_size)
+        for file_path, metadata in batch.items():
+            results[file_path] = metadata if metadata else "ExifTool could not extract metadata."
+        return {file_path: results[file_path] for file_path in file_paths}
 
     def print_metadata(self):
         metadata = self.extract_metadata()
@@ -141,31 +627,33 @@ class MetadataExtractor:
                     for key, value in data.items():
                         print(f"{key}: {value}")
 
-    def extract_selected_metadata(self, keys):
-        metadata = self.extract_metadata()
-        selected_data = {}
+    def extract_record(self, keep_raw=False, precedence=None, tier=None):
+        """
+        Normalized MetadataRecord of the file (see metadata_record.py), the
+        backends of the `tier` running as configured (concurrently when `concurrent`).
+        """
+        metadata = self.lazy_metadata(tier=tier).resolve(concurrent=self.concurrent)
+        return MetadataRecord.from_metadata(self.file_path, metadata, container=self.container,
+                                            keep_raw=keep_raw, precedence=precedence, tier=metadata.tier)
 
-        for tool, data in metadata.items():
-            selected_data[tool] = {}
-            if isinstance(data, dict):
-                for key in keys:
-                    key_lower = key.replace(" ", "").lower()
-                    for existing_key, value in data.items():
-                        formatted_key = existing_key.replace(" ", "").lower()
-                        if key_lower in formatted_key:
-                            selected_data[tool][existing_key] = value
-
-                if tool == 'FFmpeg':
-                    if 'streams' in data:
-                        for stream in data['streams']:
-                            for key in keys:
-                                if key in stream:
-                                    selected_data[tool][key] = stream[key]
-                    if 'format' in data:
-                        for key in keys:
-                            if key in data['format']:
-                                selected_data[tool][key] = data['format'][key]
-        return selected_data
+    def extract_selected_metadata(self, keys, projection=False, tier=None):
+        """
+        Metadata matching `keys` (a list of key selectors or a compiled KeySelector,
+        see key_selectors.py), only running the backends of the `tier` that can
+        provide them. With `projection`, ExifTool and ffprobe are asked for the
+        matching tags and fields only, instead of their full output. The tools
+        the native reader stands in for are skipped when it answers every key.
+        """
+        selector = compile_selector(keys)
+        metadata = self.lazy_metadata(selector if projection else None, tier=tier, native_first=False)
+        tools = set(selector.backends)
+        replaced = set(self.native_first_tools(tier)) & tools
+        if replaced and 'Native' in tools and native_parsed(metadata['Native']) \
+                and selector.answered_by(metadata['Native']):
+            # Every key is answered by the native reader: the tools it stands in for are not run.
+            tools -= replaced
+        metadata.resolve(tools, concurrent=self.concurrent)
+        return selector.select({tool: metadata[tool] if tool in tools else None for tool in metadata})
 
 
 # # Example Usage
@@ -200,4 +688,8 @@ class MetadataExtractor:
 #     print(f"🔹 **Requested {tool}**")
 #     for key, value in data.items():
 #         print(f"{key}: {value}")
-    
+
+# # Batch Usage
+# paths = [path01, path02, path03, path04, path05, path06]
+# for file_path, metadata in MetadataExtractor.extract_many(paths, workers=8, ordered=False):
+#     print(file_path, list(metadata))
@@ -35,7 +35,7 @@ path23 = "/Volumes/CGI/R_n_D/colorManagement/cameraSamples/Sony/Venice2/VENICE_2
 file_path = path23  # Change this to choose a different file
 os.system('cls' if os.name == 'nt' else 'clear')
 
-extractor = MetadataExtractor(file_path)
+extractor = MetadataExtractor(file_path, concurrent=True)
 
 print(f"\n{'='*60}")
 print("SUPORTED FORMATS")
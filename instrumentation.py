@@ -0,0 +1,295 @@
+"""
+Optional instrumentation of metadata extraction and export: a timing span for
+every backend call and subprocess (ffprobe, ExifTool, art-cmd, REDline,
+rawexporter), file writes, the bytes read per file by this process (sniffing
+and native readers; the external tools' own reads are only covered by their
+spans) and the hit ratio of the caches.
+
+Everything goes to the process-wide Stats object returned by get_stats().
+Instrumentation is off by default, where each hook costs one flag check.
+Turn it on with enable_instrumentation() or OCF_METADATA_INSTRUMENT=1;
+OCF_METADATA_TRACE=/path/trace.json additionally writes a JSON trace at exit.
+Export with Stats.to_prometheus() (text exposition format) or Stats.to_trace()
+(Chrome trace events, viewable in chrome://tracing or Perfetto).
+"""
+
+import io
+import os
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from contextlib import nullcontext
+
+DEFAULT_MAX_SPANS = 100000
+_NULL_SPAN = nullcontext()
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Stats:
+    """
+    Thread-safe collector of spans, bytes read and cache lookups.
+
+    Span aggregates (count, total and max seconds per category and name) cover
+    every span; the individual spans kept for the trace are the last `max_spans`.
+    """
+    def __init__(self, max_spans=DEFAULT_MAX_SPANS):
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter()
+        self._epoch_wall = time.time()
+        self.spans = deque(maxlen=max_spans)
+        self.span_totals = {}
+        self.bytes_read = {}
+        self.cache_lookups = {}
+
+    def record_span(self, category, name, start, duration, attributes=None):
+        """Record a finished span; `start` is a time.perf_counter() value."""
+        with self._lock:
+            self.spans.append((category, name, start, duration, threading.get_ident(), attributes or {}))
+            totals = self.span_totals.setdefault((category, name), [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+
+    def record_bytes(self, file_path, count):
+        with self._lock:
+            self.bytes_read[file_path] = self.bytes_read.get(file_path, 0) + count
+
+    def record_cache(self, cache, hit):
+        with self._lock:
+            lookups = self.cache_lookups.setdefault(cache, [0, 0])
+            lookups[0 if hit else 1] += 1
+
+    def cache_hit_ratio(self, cache):
+        hits, misses = self.cache_lookups.get(cache, (0, 0))
+        return hits / (hits + misses) if hits + misses else None
+
+    def reset(self):
+        with self._lock:
+            self._epoch = time.perf_counter()
+            self._epoch_wall = time.time()
+            self.spans.clear()
+            self.span_totals.clear()
+            self.bytes_read.clear()
+            self.cache_lookups.clear()
+
+    def summary(self):
+        """Plain dict of the aggregates (spans per category/name, bytes, caches)."""
+        with self._lock:
+            spans = {f"{category}:{name}": {"count": count, "total_seconds": total, "max_seconds": longest,
+                                             "mean_seconds": total / count}
+                     for (category, name), (count, total, longest) in sorted(self.span_totals.items())}
+            caches = {cache: {"hits": hits, "misses": misses} for cache, (hits, misses) in self.cache_lookups.items()}
+            files = len(self.bytes_read)
+            total_bytes = sum(self.bytes_read.values())
+        for cache, lookups in caches.items():
+            lookups["hit_ratio"] = self.cache_hit_ratio(cache)
+        return {"spans": spans, "files_read": files, "bytes_read": total_bytes, "caches": caches}
+
+    def describe(self):
+        """Short human-readable report of the aggregates, one line per span kind."""
+        summary = self.summary()
+        lines = [f"{name}: {s['count']} x {s['mean_seconds'] * 1000:.1f} ms "
+                 f"(max {s['max_seconds'] * 1000:.1f} ms, total {s['total_seconds']:.2f} s)"
+                 for name, s in summary["spans"].items()]
+        lines.append(f"{summary['files_read']} file(s) read, {summary['bytes_read']} bytes")
+        for cache, lookups in summary["caches"].items():
+            if lookups["hit_ratio"] is not None:
+                lines.append(f"{cache} cache: {lookups['hits']} hit(s), {lookups['misses']} miss(es), "
+                             f"hit ratio {lookups['hit_ratio']:.0%}")
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        """Aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            span_totals = sorted(self.span_totals.items())
+            cache_lookups = sorted(self.cache_lookups.items())
+            files = len(self.bytes_read)
+            total_bytes = sum(self.bytes_read.values())
+        lines = [
+            "# HELP ocf_metadata_span_seconds Time spent in backend calls, subprocesses and writes.",
+            "# TYPE ocf_metadata_span_seconds summary",
+        ]
+        for (category, name), (count, total, _) in span_totals:
+            labels = f'category="{_escape_label(category)}",name="{_escape_label(name)}"'
+            lines.append(f"ocf_metadata_span_seconds_count{{{labels}}} {count}")
+            lines.append(f"ocf_metadata_span_seconds_sum{{{labels}}} {total:.6f}")
+        lines += ["# HELP ocf_metadata_span_max_seconds Longest span.",
+                  "# TYPE ocf_metadata_span_max_seconds gauge"]
+        for (category, name), (_, _, longest) in span_totals:
+            labels = f'category="{_escape_label(category)}",name="{_escape_label(name)}"'
+            lines.append(f"ocf_metadata_span_max_seconds{{{labels}}} {longest:.6f}")
+        lines += ["# HELP ocf_metadata_bytes_read_total Bytes read from media files by this process.",
+                  "# TYPE ocf_metadata_bytes_read_total counter",
+                  f"ocf_metadata_bytes_read_total {total_bytes}",
+                  "# HELP ocf_metadata_files_read_total Media files read by this process.",
+                  "# TYPE ocf_metadata_files_read_total counter",
+                  f"ocf_metadata_files_read_total {files}",
+                  "# HELP ocf_metadata_cache_lookups_total Cache lookups by result.",
+                  "# TYPE ocf_metadata_cache_lookups_total counter"]
+        for cache, (hits, misses) in cache_lookups:
+            lines.append(f'ocf_metadata_cache_lookups_total{{cache="{_escape_label(cache)}",result="hit"}} {hits}')
+            lines.append(f'ocf_metadata_cache_lookups_total{{cache="{_escape_label(cache)}",result="miss"}} {misses}')
+        lines += ["# HELP ocf_metadata_cache_hit_ratio Cache hits over lookups.",
+                  "# TYPE ocf_metadata_cache_hit_ratio gauge"]
+        for cache, (hits, misses) in cache_lookups:
+            if hits + misses:
+                lines.append(f'ocf_metadata_cache_hit_ratio{{cache="{_escape_label(cache)}"}} {hits / (hits + misses):.6f}')
+        return "\n".join(lines) + "\n"
+
+    def to_trace(self):
+        """Spans as a Chrome trace event dict, with the bytes read per file and the summary as metadata."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            epoch = self._epoch
+            bytes_read = dict(self.bytes_read)
+        events = [{
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - epoch) * 1e6,
+            "dur": duration * 1e6,
+            "pid": pid,
+            "tid": thread,
+            "args": attributes,
+        } for category, name, start, duration, thread, attributes in spans]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"start_time": self._epoch_wall, "bytes_read": bytes_read, "summary": self.summary()},
+        }
+
+    def write_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_trace(), f, default=str)
+
+
+class _Span:
+    __slots__ = ("stats", "category", "name", "attributes", "start")
+
+    def __init__(self, stats, category, name, attributes):
+        self.stats = stats
+        self.category = category
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.stats.record_span(self.category, self.name, self.start, time.perf_counter() - self.start, self.attributes)
+        return False
+
+
+class _CountingFileIO(io.FileIO):
+    """FileIO counting the bytes actually read, reported to the stats on close."""
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if data:
+            self.bytes_read += len(data)
+        return data
+
+    def readall(self):
+        data = super().readall()
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        count = super().readinto(buffer)
+        if count:
+            self.bytes_read += count
+        return count
+
+    def close(self):
+        if not self.closed and _stats is not None:
+            _stats.record_bytes(self.name, self.bytes_read)
+        super().close()
+
+
+_stats = None
+_enabled = False
+_lock = threading.Lock()
+
+
+def get_stats():
+    """The process-wide Stats (created on first use, also when instrumentation is off)."""
+    global _stats
+    if _stats is None:
+        with _lock:
+            if _stats is None:
+                _stats = Stats()
+    return _stats
+
+
+def enable_instrumentation(max_spans=None):
+    """Start recording into get_stats(). Returns the Stats."""
+    global _enabled
+    stats = get_stats()
+    if max_spans is not None:
+        with stats._lock:
+            stats.spans = deque(stats.spans, maxlen=max_spans)
+    _enabled = True
+    return stats
+
+
+def disable_instrumentation():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def span(category, name, **attributes):
+    """
+    Context manager timing a block as a span, e.g.
+    `with span("subprocess", "ffprobe", file=path): ...`. A no-op when disabled.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(get_stats(), category, name, attributes)
+
+
+def traced(function, category, name, **attributes):
+    """`function` wrapped in a span (or `function` itself when instrumentation is off)."""
+    if not _enabled:
+        return function
+
+    def wrapper(*args, **kwargs):
+        with _Span(get_stats(), category, name, dict(attributes)):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def open_binary(file_path):
+    """open(file_path, "rb"), counting the bytes read from the file when instrumentation is on."""
+    if not _enabled:
+        return open(file_path, "rb")
+    return io.BufferedReader(_CountingFileIO(file_path, "rb"))
+
+
+def record_bytes(file_path, count):
+    if _enabled:
+        get_stats().record_bytes(file_path, count)
+
+
+def record_cache(cache, hit):
+    if _enabled:
+        get_stats().record_cache(cache, hit)
+
+
+if os.environ.get("OCF_METADATA_INSTRUMENT", "").lower() in ("1", "true", "yes") or os.environ.get("OCF_METADATA_TRACE"):
+    enable_instrumentation()
+    if os.environ.get("OCF_METADATA_TRACE"):
+        atexit.register(lambda: get_stats().write_trace(os.environ["OCF_METADATA_TRACE"]))
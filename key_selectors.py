@@ -0,0 +1,330 @@
+import re
+import fnmatch
+from functools import lru_cache
+
+BACKENDS = ('OIIO', 'ExifTool', 'FFmpeg', 'Native', 'Vendor')
+# Sections of an ARRI art-cmd export whose metadata set payloads are matched
+# as if their properties were keys of the Vendor section.
+ARRI_METADATA_SETS = ("clipBasedMetadataSets", "descriptiveMetadataSets")
+
+# Known ffprobe stream/format fields, matched exactly against the ffprobe
+# output. The snake_case ones are taken as ffprobe-only and skip OIIO, ExifTool
+# and the native readers. Any other key containing "_" may be an ffprobe field
+# missing from this list (codec_time_base, side_data_list...) as well as an OIIO,
+# ExifTool or native key (EXR attributes and ExifTool tags can contain "_"
+# too), so it is planned on every backend.
+FFPROBE_KEYS = frozenset([
+    "index", "id", "profile", "level", "refs", "width", "height", "channels", "duration",
+    "size", "filename", "tags", "disposition",
+    "codec_name", "codec_long_name", "codec_type", "codec_tag", "codec_tag_string",
+    "coded_width", "coded_height", "closed_captions", "film_grain", "has_b_frames",
+    "sample_aspect_ratio", "display_aspect_ratio", "pix_fmt", "color_range", "color_space",
+    "color_transfer", "color_primaries", "chroma_location", "field_order", "is_avc",
+    "nal_length_size", "r_frame_rate", "avg_frame_rate", "time_base", "start_pts",
+    "start_time", "duration_ts", "bit_rate", "max_bit_rate", "bits_per_raw_sample",
+    "bits_per_sample", "nb_frames", "nb_read_frames", "nb_read_packets", "extradata_size",
+    "sample_fmt", "sample_rate", "channel_layout", "initial_padding", "format_name",
+    "format_long_name", "nb_streams", "nb_programs", "probe_score",
+])
+
+# Fields ffprobe reports in the "format" section (the others are stream fields).
+FFPROBE_FORMAT_KEYS = frozenset([
+    "filename", "nb_streams", "nb_programs", "format_name", "format_long_name", "start_time",
+    "duration", "size", "bit_rate", "probe_score",
+])
+FFPROBE_STREAM_ONLY_EXCLUDED = frozenset(["filename", "nb_streams", "nb_programs", "format_name",
+                                          "format_long_name", "probe_score", "size"])
+# Sections shown as a whole by name in -show_entries rather than as a stream/format field.
+FFPROBE_SUBSECTIONS = {"tags": ("stream_tags", "format_tags"), "disposition": ("stream_disposition",)}
+EXIFTOOL_TAG_NAME = re.compile(r"\w+")
+
+# First segment of a dotted path into the nested ffprobe output.
+NESTED_ROOTS = ("streams", "format", "programs", "chapters")
+GLOB_CHARS = set("*?[")
+
+
+def normalize_key(key):
+    return key.replace(" ", "").lower()
+
+
+def vendor_keys(data):
+    """
+    Flat view of a Vendor section: the REDline and rawexporter listings are
+    already flat, an ARRI export adds the properties of its clip-based and
+    descriptive metadata set payloads (the first set defining one wins).
+    """
+    flat = dict(data)
+    for sets_key in ARRI_METADATA_SETS:
+        for metadata_set in data.get(sets_key) or []:
+            payload = metadata_set.get("metadataSetPayload") if isinstance(metadata_set, dict) else None
+            if isinstance(payload, dict):
+                for key, value in payload.items():
+                    flat.setdefault(key, value)
+    return flat
+
+
+class KeyIndex:
+    """
+    Normalized view of one backend section, built once and shared by every
+    selector applied to it. `nested` holds the ffprobe stream and format
+    fields by exact name (format wins over streams, later streams over earlier).
+    """
+    def __init__(self, data):
+        self.data = data
+        self.entries = [(key, normalize_key(key)) for key in data]
+        self.by_normalized = {}
+        for key, normalized in self.entries:
+            self.by_normalized.setdefault(normalized, []).append(key)
+        self.nested = {}
+        for stream in data.get('streams') or []:
+            if isinstance(stream, dict):
+                self.nested.update(stream)
+        if isinstance(data.get('format'), dict):
+            self.nested.update(data['format'])
+
+
+class _Matcher:
+    """One compiled key selector."""
+    def __init__(self, key):
+        self.key = key
+        if key.startswith("re:"):
+            self.kind = "regex"
+            self.pattern = re.compile(key[3:], re.IGNORECASE)
+        elif key.startswith("="):
+            self.kind = "exact"
+            self.name = key[1:]
+            self.needle = normalize_key(self.name)
+        elif "." in key and key.split(".", 1)[0] in NESTED_ROOTS:
+            self.kind = "path"
+            self.segments = key.split(".")
+        elif GLOB_CHARS & set(key):
+            self.kind = "glob"
+            self.pattern = re.compile(fnmatch.translate(normalize_key(key)))
+        else:
+            self.kind = "substring"
+            self.name = key
+            self.needle = normalize_key(key)
+
+    @property
+    def backends(self):
+        if self.kind == "path":
+            return {'FFmpeg'}
+        if self.kind not in ("exact", "substring"):
+            return set(BACKENDS)
+        backends = set()
+        if not (self.name in FFPROBE_KEYS and "_" in self.name):
+            backends.update(('OIIO', 'ExifTool', 'Native', 'Vendor'))
+        top_level = (self.needle in ("streams", "format") if self.kind == "exact"
+                     else any(self.needle in root for root in ("streams", "format")))
+        if self.name in FFPROBE_KEYS or "_" in self.name or top_level:
+            backends.add('FFmpeg')
+        return backends
+
+    def ffprobe_entries(self, entries):
+        """
+        Add what this key needs from ffprobe to `entries` (section -> set of
+        fields, an empty set meaning the whole section). Returns False when the
+        key cannot be pushed down and the full output is needed.
+        """
+        if 'FFmpeg' not in self.backends:
+            return True
+        if self.kind == "path":
+            root, rest = self.segments[0], self.segments[1:]
+            if root not in ("streams", "format"):
+                return True  # programs/chapters are not part of the ffprobe output.
+            section = "stream" if root == "streams" else "format"
+            field = rest[1] if section == "stream" and len(rest) > 1 else (rest[0] if section == "format" and rest else None)
+            if field is None or field == "*":
+                entries[section] = set()
+            elif field in FFPROBE_SUBSECTIONS:
+                entries.setdefault(f"{section}_{field}", set())
+            elif entries.get(section) != set():
+                entries.setdefault(section, set()).add(field)
+            return True
+        if self.kind not in ("exact", "substring") or self.name not in FFPROBE_KEYS:
+            return False
+        if self.name in FFPROBE_SUBSECTIONS:
+            for section in FFPROBE_SUBSECTIONS[self.name]:
+                entries.setdefault(section, set())
+            return True
+        sections = []
+        if self.name not in FFPROBE_STREAM_ONLY_EXCLUDED:
+            sections.append("stream")
+        if self.name in FFPROBE_FORMAT_KEYS:
+            sections.append("format")
+        for section in sections:
+            if entries.get(section) != set():
+                entries.setdefault(section, set()).add(self.name)
+        return True
+
+    def exiftool_tags(self):
+        """ExifTool tag arguments covering this key, or None when every tag is needed."""
+        if 'ExifTool' not in self.backends:
+            return []
+        if self.kind == "exact":
+            group, _, tag = self.needle.rpartition(":")
+            if EXIFTOOL_TAG_NAME.fullmatch(tag) and (not group or EXIFTOOL_TAG_NAME.fullmatch(group)):
+                return ["-" + self.needle]
+        elif self.kind == "substring":
+            if EXIFTOOL_TAG_NAME.fullmatch(self.needle):
+                return [f"-*{self.needle}*"]
+        elif self.kind == "glob":
+            pattern = normalize_key(self.key)
+            if re.fullmatch(r"[\w*?]+", pattern):
+                return ["-" + pattern]
+        return None
+
+    def apply(self, index, selected):
+        if self.kind == "path":
+            for path, value in _walk(index.data, self.segments, []):
+                selected[".".join(path)] = value
+            return
+        if self.kind == "substring":
+            for key, normalized in index.entries:
+                if self.needle in normalized:
+                    selected[key] = index.data[key]
+        elif self.kind == "exact":
+            for key in index.by_normalized.get(self.needle, ()):
+                selected[key] = index.data[key]
+        elif self.kind == "glob":
+            for key, normalized in index.entries:
+                if self.pattern.match(normalized):
+                    selected[key] = index.data[key]
+        else:
+            for key, _ in index.entries:
+                if self.pattern.search(key):
+                    selected[key] = index.data[key]
+
+    def apply_nested(self, index, selected):
+        if self.kind in ("substring", "exact"):
+            if self.name in index.nested:
+                selected[self.name] = index.nested[self.name]
+        elif self.kind == "glob":
+            for key, value in index.nested.items():
+                if self.pattern.match(normalize_key(key)):
+                    selected[key] = value
+        elif self.kind == "regex":
+            for key, value in index.nested.items():
+                if self.pattern.search(key):
+                    selected[key] = value
+
+
+def _walk(node, segments, path):
+    """Yield (path, value) for a dotted path with optional '*' wildcards."""
+    if not segments:
+        yield path, node
+        return
+    head, rest = segments[0], segments[1:]
+    if isinstance(node, list):
+        if head == "*":
+            candidates = enumerate(node)
+        elif head.lstrip("-").isdigit() and -len(node) <= int(head) < len(node):
+            candidates = [(int(head) % len(node), node[int(head)])]
+        else:
+            candidates = []
+    elif isinstance(node, dict):
+        candidates = node.items() if head == "*" else ([(head, node[head])] if head in node else [])
+    else:
+        candidates = []
+    for key, child in candidates:
+        yield from _walk(child, rest, path + [str(key)])
+
+
+class KeySelector:
+    """
+    Compiled list of keys for extract_selected_metadata, reusable across files.
+
+    Key syntax:
+      "Image Width"            substring of the key, ignoring spaces and case (default)
+      "=ImageWidth"            whole key, ignoring spaces and case
+      "*Width*", "codec_?ame"  glob on the normalized key
+      "re:^QuickTime:.*Date$"  regular expression (case-insensitive) on the raw key
+      "streams.0.codec_name"   dotted path into the ffprobe output ('*' matches any item)
+
+    Vendor sections (deep tier) are matched like the other sections, on the
+    keys of the REDline / rawexporter listing or of the ARRI metadata set
+    payloads (see vendor_keys).
+    """
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self.matchers = [_Matcher(key) for key in self.keys]
+        self.backends = set()
+        for matcher in self.matchers:
+            self.backends |= matcher.backends
+
+    def ffprobe_entries(self):
+        """
+        `-show_entries` argument fetching only what the keys need from ffprobe
+        (e.g. "stream=codec_name,width:format=duration"), or None when the
+        full output is needed.
+        """
+        entries = {}
+        for matcher in self.matchers:
+            if not matcher.ffprobe_entries(entries):
+                return None
+        if not entries:
+            return None
+        parts = []
+        for section in sorted(entries):
+            fields = entries[section]
+            parts.append(f"{section}={','.join(sorted(fields))}" if fields else section)
+        return ":".join(parts)
+
+    def exiftool_tags(self):
+        """ExifTool `-TAG` arguments covering the keys, or None when every tag is needed."""
+        tags = []
+        for matcher in self.matchers:
+            matcher_tags = matcher.exiftool_tags()
+            if matcher_tags is None:
+                return None
+            tags.extend(tag for tag in matcher_tags if tag not in tags)
+        return tags or None
+
+    def answered_by(self, data):
+        """Whether every key matches at least one key of `data` (one backend section)."""
+        index = KeyIndex(data)
+        for matcher in self.matchers:
+            selected = {}
+            matcher.apply(index, selected)
+            if not selected:
+                return False
+        return True
+
+    def select_section(self, data, tool=None):
+        index = KeyIndex(vendor_keys(data) if tool == 'Vendor' else data)
+        selected = {}
+        for matcher in self.matchers:
+            matcher.apply(index, selected)
+        if tool == 'FFmpeg':
+            for matcher in self.matchers:
+                matcher.apply_nested(index, selected)
+        return selected
+
+    def select(self, metadata):
+        """Apply the selector to an extract_metadata() result, skipping unplanned backends."""
+        selected_data = {}
+        for tool in metadata:
+            selected_data[tool] = {}
+            if tool not in self.backends:
+                continue
+            data = metadata[tool]
+            if isinstance(data, dict):
+                selected_data[tool] = self.select_section(data, tool)
+        return selected_data
+
+
+@lru_cache(maxsize=256)
+def _compile(keys):
+    return KeySelector(keys)
+
+
+def compile_selector(keys):
+    """KeySelector for `keys` (already compiled selectors are returned as is)."""
+    if isinstance(keys, KeySelector):
+        return keys
+    return _compile(tuple(keys))
+
+
+def plan_backends(keys):
+    """Smallest set of backends whose output can match the requested keys."""
+    return compile_selector(keys).backends
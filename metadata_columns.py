@@ -0,0 +1,216 @@
+"""
+Columnar form of many MetadataRecords: one NumPy array per normalized field,
+strings dictionary-encoded (int32 codes into a list of distinct values), so a
+show-wide question such as "every clip at EI 1600 on lens X" is a vectorized
+scan over a few arrays instead of a loop over thousands of JSON files.
+
+A table is saved either as a directory of .npy files plus a JSON manifest,
+which np.load memory-maps back without reading the columns, or as a single
+compressed .npz archive (smaller, loaded into memory). NumPy is imported on
+first use (pip install ocf-metadata[columns]).
+"""
+
+import os
+import sys
+import json
+
+from metadata_record import FIELD_NAMES, FIELD_TYPES, MetadataRecord
+
+TABLE_FORMAT_VERSION = 1
+MANIFEST_NAME = "table.json"
+# Missing values: NaN in float columns, these in integer and string-code columns.
+MISSING_INT = -1
+MISSING_CODE = -1
+COLUMNS = ("path", "container", "tier") + FIELD_NAMES
+COLUMN_TYPES = dict({"path": str, "container": str, "tier": str}, **FIELD_TYPES)
+
+
+def _numpy():
+    import numpy
+    return numpy
+
+
+class MetadataTable:
+    """
+    Column name -> NumPy array, plus the distinct values of each string column
+    (`categories`). Build with from_records / from_files / from_vendor_exports,
+    query with where() and mask(), get rows back with records().
+    """
+    def __init__(self, columns, categories):
+        self.columns = columns
+        self.categories = categories
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in categories.items()}
+
+    def __len__(self):
+        return len(self.columns["path"]) if self.columns else 0
+
+    @classmethod
+    def from_records(cls, records):
+        """Table of an iterable of MetadataRecord (or their to_dict())."""
+        np = _numpy()
+        rows = {name: [] for name in COLUMNS}
+        codes = {name: {} for name in COLUMNS if COLUMN_TYPES[name] is str}
+        for record in records:
+            values = record.to_dict() if isinstance(record, MetadataRecord) else record
+            for name in COLUMNS:
+                value = values.get(name)
+                if name in codes:
+                    rows[name].append(MISSING_CODE if value is None else codes[name].setdefault(value, len(codes[name])))
+                elif COLUMN_TYPES[name] is int:
+                    rows[name].append(MISSING_INT if value is None else value)
+                else:
+                    rows[name].append(float("nan") if value is None else value)
+        columns = {}
+        for name in COLUMNS:
+            dtype = "int32" if name in codes else ("int64" if COLUMN_TYPES[name] is int else "float64")
+            columns[name] = np.asarray(rows[name], dtype=dtype)
+        return cls(columns, {name: list(values) for name, values in codes.items()})
+
+    @classmethod
+    def from_files(cls, file_paths, workers=None, **extractor_kwargs):
+        """Extract every file (MetadataExtractor.extract_many) into a table."""
+        from get_metadata import MetadataExtractor
+        results = MetadataExtractor.extract_many(file_paths, workers=workers, records=True, **extractor_kwargs)
+        return cls.from_records(record for _, record in results if isinstance(record, MetadataRecord))
+
+    @classmethod
+    def from_vendor_exports(cls, json_paths, camera_type=None):
+        """Table of ARRI / RED / SONY *_metadata_export.json files (see vendor_metadata)."""
+        from vendor_metadata import load_vendor_record
+        records = []
+        for json_path in json_paths:
+            try:
+                records.append(load_vendor_record(json_path, camera_type))
+            except (OSError, ValueError) as e:
+                print(f"Skipping {json_path}: {e}", file=sys.stderr)
+        return cls.from_records(records)
+
+    @classmethod
+    def concat(cls, tables):
+        """One table of several (string columns are re-encoded)."""
+        return cls.from_records(row for table in tables for row in table.rows())
+
+    # ----------------- Queries -----------------
+    def values(self, name):
+        """Decoded column: strings as an object array (None when missing), numbers as stored."""
+        np = _numpy()
+        column = self.columns[name]
+        if name not in self.categories:
+            return column
+        lookup = np.array(self.categories[name] + [None], dtype=object)
+        # Code -1 (missing) picks the trailing None.
+        return lookup[column]
+
+    def mask(self, **conditions):
+        """
+        Boolean array of the rows matching every condition. A condition is a
+        value (equality), a list/tuple/set of values (membership), or for
+        numeric columns a slice(low, high) (inclusive range, either end optional).
+        """
+        np = _numpy()
+        result = np.ones(len(self), dtype=bool)
+        for name, condition in conditions.items():
+            column = self.columns[name]
+            if name in self.categories:
+                codes = self._codes[name]
+                wanted = condition if isinstance(condition, (list, tuple, set, frozenset)) else [condition]
+                wanted_codes = [codes[value] for value in wanted if value in codes]
+                result &= np.isin(column, wanted_codes)
+            elif isinstance(condition, slice):
+                if condition.start is not None:
+                    result &= column >= condition.start
+                if condition.stop is not None:
+                    result &= column <= condition.stop
+                if COLUMN_TYPES[name] is int:
+                    result &= column != MISSING_INT
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                result &= np.isin(column, list(condition))
+            else:
+                result &= column == condition
+        return result
+
+    def where(self, **conditions):
+        """Row indices matching the conditions (see mask)."""
+        return _numpy().flatnonzero(self.mask(**conditions))
+
+    def count(self, name, mask=None):
+        """{value: rows} of a column, optionally within a boolean mask."""
+        np = _numpy()
+        column = self.columns[name] if mask is None else self.columns[name][mask]
+        if name in self.categories:
+            codes, counts = np.unique(column[column != MISSING_CODE], return_counts=True)
+            return {self.categories[name][code]: int(n) for code, n in zip(codes, counts)}
+        present = column[~np.isnan(column)] if column.dtype.kind == "f" else column[column != MISSING_INT]
+        values, counts = np.unique(present, return_counts=True)
+        return {value.item(): int(n) for value, n in zip(values, counts)}
+
+    def rows(self, indices=None):
+        """Yield the rows (all, or `indices`) as dicts."""
+        np = _numpy()
+        indices = range(len(self)) if indices is None else indices
+        for index in indices:
+            row = {}
+            for name, column in self.columns.items():
+                value = column[index]
+                if name in self.categories:
+                    row[name] = self.categories[name][value] if value != MISSING_CODE else None
+                elif column.dtype.kind == "f":
+                    row[name] = None if np.isnan(value) else float(value)
+                else:
+                    row[name] = None if value == MISSING_INT else int(value)
+            yield row
+
+    def records(self, indices=None):
+        """Yield the rows (all, or `indices`) as MetadataRecord."""
+        for row in self.rows(indices):
+            yield MetadataRecord.from_dict(row)
+
+    # ----------------- Storage -----------------
+    def _manifest(self, files=None):
+        return {
+            "version": TABLE_FORMAT_VERSION,
+            "length": len(self),
+            "columns": {name: {"dtype": str(column.dtype), "file": files[name] if files else None,
+                               "categories": self.categories.get(name)}
+                        for name, column in self.columns.items()},
+        }
+
+    def save(self, path, compress=False):
+        """
+        Write the table to `path`: a directory of .npy columns (memory-mappable),
+        or with `compress` a single .npz archive. Returns the path written.
+        """
+        np = _numpy()
+        if compress:
+            path = path if path.endswith(".npz") else path + ".npz"
+            manifest = json.dumps(self._manifest()).encode("utf-8")
+            np.savez_compressed(path, __manifest__=np.frombuffer(manifest, dtype=np.uint8), **self.columns)
+            return path
+        os.makedirs(path, exist_ok=True)
+        files = {name: f"{name}.npy" for name in self.columns}
+        for name, column in self.columns.items():
+            np.save(os.path.join(path, files[name]), column)
+        # The manifest is written last: a directory without one is incomplete.
+        with open(os.path.join(path, MANIFEST_NAME), "w") as f:
+            json.dump(self._manifest(files), f)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Read a table written by save(); directory columns are memory-mapped unless `mmap` is False."""
+        np = _numpy()
+        if os.path.isdir(path):
+            with open(os.path.join(path, MANIFEST_NAME), "r") as f:
+                manifest = json.load(f)
+            columns = {name: np.load(os.path.join(path, spec["file"]), mmap_mode="r" if mmap else None)
+                       for name, spec in manifest["columns"].items()}
+        else:
+            with np.load(path) as archive:
+                manifest = json.loads(archive["__manifest__"].tobytes().decode("utf-8"))
+                columns = {name: archive[name] for name in manifest["columns"]}
+        if manifest.get("version") != TABLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported table version {manifest.get('version')} in {path}")
+        categories = {name: spec["categories"] for name, spec in manifest["columns"].items()
+                      if spec.get("categories") is not None}
+        return cls(columns, categories)
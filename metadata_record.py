@@ -0,0 +1,311 @@
+"""
+Compact, normalized view of the metadata of one file.
+
+MetadataExtractor returns one nested dict per backend (OIIO values are all
+strings, ExifTool keys carry their group, ffprobe nests streams). A
+MetadataRecord keeps one typed value per field instead, picked from the
+backends in a defined precedence, in a __slots__ object: low-cardinality
+strings (codec, camera, lens, colour names...) are interned, so a catalog of
+hundreds of thousands of clips shares a single copy of each. The raw backend
+dicts are an optional payload, stored compressed and decoded on access.
+"""
+
+import sys
+import json
+import zlib
+from fractions import Fraction
+
+# ITU-T H.273 code points (QuickTime colr atoms) -> the names ffprobe reports.
+CICP_PRIMARIES = {1: "bt709", 4: "bt470m", 5: "bt470bg", 6: "smpte170m", 7: "smpte240m", 8: "film",
+                  9: "bt2020", 10: "smpte428", 11: "smpte431", 12: "smpte432", 22: "jedec-p22"}
+CICP_TRANSFER = {1: "bt709", 4: "gamma22", 5: "gamma28", 6: "smpte170m", 7: "smpte240m", 8: "linear",
+                 11: "iec61966-2-4", 13: "iec61966-2-1", 14: "bt2020-10", 15: "bt2020-12",
+                 16: "smpte2084", 17: "smpte428", 18: "arib-std-b67"}
+CICP_MATRIX = {0: "gbr", 1: "bt709", 4: "fcc", 5: "bt470bg", 6: "smpte170m", 7: "smpte240m", 8: "ycgco",
+               9: "bt2020nc", 10: "bt2020c", 14: "ictcp"}
+
+# Colour labels of the header readers (MXF ULs, DPX codes) and of ExifTool, lower-cased,
+# -> the same ffprobe names (None for "unspecified"), mapped the way FFmpeg's demuxers do.
+PRIMARIES_NAMES = {
+    "itu-r bt.709": "bt709", "itu-r bt.2020": "bt2020", "smpte 170m (itu-r bt.601 525-line)": "smpte170m",
+    "itu-r bt.470 system b/g (itu-r bt.601 625-line)": "bt470bg", "smpte st 428-1 (xyz)": "smpte428",
+    "p3-d65": "smpte432", "itu-r 709-4": "bt709", "smpte 274m": "bt709", "itu-r 601-5 b or g": "bt470bg",
+    "itu-r 601-5 m": "smpte170m", "bt.709": "bt709", "bt.601": "smpte170m", "bt.2020, bt.2100": "bt2020",
+    "smpte rp 431-2": "smpte431", "smpte eg 432-1": "smpte432", "unspecified": None,
+}
+TRANSFER_NAMES = {
+    "itu-r bt.470": "gamma28", "itu-r bt.709": "bt709", "smpte 240m": "smpte240m", "linear": "linear",
+    "smpte st 2084 (pq)": "smpte2084", "itu-r bt.2100 hlg": "arib-std-b67", "itu-r 709-4": "bt709",
+    "smpte 274m": "bt709", "itu-r 601-5 b or g": "smpte170m", "itu-r 601-5 m": "smpte170m",
+    "composite video (pal)": "gamma28", "bt.709": "bt709", "bt.601": "smpte170m", "srgb": "iec61966-2-1",
+    "smpte st 2084, itu bt.2100 pq system": "smpte2084", "unspecified": None,
+}
+MATRIX_NAMES = {
+    "itu-r bt.601": "bt470bg", "itu-r bt.709": "bt709", "itu-r bt.2020": "bt2020nc", "smpte 240m": "smpte240m",
+    "bt.709": "bt709", "bt.601": "smpte170m", "bt.2020 non-constant luminance": "bt2020nc", "unspecified": None,
+}
+# Codec labels (QuickTime sample entry fourccs, MXF essence coding ULs) -> ffprobe codec names.
+CODEC_NAMES = {
+    "avc1": "h264", "avc3": "h264", "h.264/avc": "h264", "avc": "h264", "hvc1": "hevc", "hev1": "hevc",
+    "dvh1": "hevc", "apch": "prores", "apcn": "prores", "apcs": "prores", "apco": "prores", "ap4h": "prores",
+    "ap4x": "prores", "apple prores": "prores", "mp4v": "mpeg4", "mpeg-4 visual": "mpeg4",
+    "mpeg-2 video": "mpeg2video", "d-10": "mpeg2video", "jpeg 2000": "jpeg2000", "mjp2": "jpeg2000",
+    "vc-3": "dnxhd", "avdn": "dnxhd", "avdh": "dnxhd", "jpeg": "mjpeg", "mjpa": "mjpeg", "av01": "av1",
+    "vp09": "vp9",
+}
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_rate(value):
+    """
+    Frame rate of "24000/1001", (24000, 1001), "23.976" or 23.976 as a float
+    (None for 0/0), rounded to 3 decimals so exact and rounded rates compare equal.
+    """
+    try:
+        if isinstance(value, (list, tuple)):
+            rate = Fraction(int(value[0]), int(value[1]))
+        elif isinstance(value, str) and "/" in value:
+            numerator, denominator = value.split("/", 1)
+            rate = Fraction(int(numerator), int(denominator))
+        else:
+            rate = float(value)
+    except (TypeError, ValueError, ZeroDivisionError, IndexError):
+        return None
+    return round(float(rate), 3) if rate > 0 else None
+
+
+def _to_str(value):
+    if isinstance(value, dict):
+        # EXR timecode attributes decode to {"timecode": ..., "timeAndFlags": ...}.
+        value = value.get("timecode")
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _to_name(value):
+    value = _to_str(value)
+    return sys.intern(value) if value is not None else None
+
+
+def _labelled(names, table=None):
+    """Converter to one vocabulary: code points through `table`, labels through `names`."""
+    def convert(value):
+        if table is not None and isinstance(value, int) and not isinstance(value, bool):
+            value = table.get(value)
+        value = _to_str(value)
+        if value is None:
+            return None
+        value = names.get(value.lower(), value)
+        return sys.intern(value) if value is not None else None
+    return convert
+
+
+# Field name -> (converter, sources in precedence order). Header readers come
+# first, then the tools with typed output and OIIO (stringified attributes) last,
+# except for camera and lens data, which live in maker notes (ExifTool first).
+# Each source is a backend and the keys to try in its section: ExifTool keys are matched without
+# their group ("QuickTime:ImageWidth" -> "ImageWidth"), ffprobe keys are looked
+# up in the first video stream, its tags, then the format and its tags, and OIIO
+# attributes also without their namespace ("Exif:LensModel" -> "LensModel").
+FIELDS = {
+    "width": (_to_int, [('Native', ("ImageWidth", "DisplayWidth", "StoredWidth")), ('FFmpeg', ("width",)),
+                        ('ExifTool', ("ImageWidth", "SourceImageWidth")), ('OIIO', ("ImageWidth",))]),
+    "height": (_to_int, [('Native', ("ImageHeight", "DisplayHeight", "StoredHeight")), ('FFmpeg', ("height",)),
+                         ('ExifTool', ("ImageHeight", "SourceImageHeight")), ('OIIO', ("ImageHeight",))]),
+    "fps": (_to_rate, [('Native', ("FrameRate", "SampleRate", "framesPerSecond", "TVFrameRate", "FilmFrameRate")),
+                       ('FFmpeg', ("r_frame_rate", "avg_frame_rate")),
+                       ('ExifTool', ("VideoFrameRate", "FrameRate", "CaptureFrameRate")),
+                       ('OIIO', ("FramesPerSecond", "framesPerSecond"))]),
+    "frame_count": (_to_int, [('Native', ("FrameCount",)), ('FFmpeg', ("nb_frames",)),
+                              ('ExifTool', ("FrameCount",))]),
+    "duration": (_to_float, [('Native', ("Duration",)), ('FFmpeg', ("duration",)),
+                             ('ExifTool', ("Duration", "MediaDuration"))]),
+    "bit_depth": (_to_int, [('FFmpeg', ("bits_per_raw_sample",)), ('Native', ("ComponentDepth", "BitDepth")),
+                            ('ExifTool', ("BitsPerSample", "BitDepth")), ('OIIO', ("BitsPerSample",))]),
+    "pixel_format": (_to_name, [('FFmpeg', ("pix_fmt",)), ('ExifTool', ("PixelFormat",))]),
+    "codec": (_labelled(CODEC_NAMES), [('Native', ("VideoCodec", "PictureEssenceCoding")),
+                                       ('FFmpeg', ("codec_name",)), ('ExifTool', ("CompressorID", "VideoCodec"))]),
+    "color_primaries": (_labelled(PRIMARIES_NAMES, CICP_PRIMARIES),
+                        [('Native', ("ColorPrimaries", "ColorimetricName")), ('FFmpeg', ("color_primaries",)),
+                         ('ExifTool', ("ColorPrimaries",))]),
+    "transfer": (_labelled(TRANSFER_NAMES, CICP_TRANSFER),
+                 [('Native', ("TransferCharacteristics", "TransferCharacteristic", "TransferName")),
+                  ('FFmpeg', ("color_transfer",)), ('ExifTool', ("TransferCharacteristics",))]),
+    "color_space": (_labelled(MATRIX_NAMES, CICP_MATRIX),
+                    [('Native', ("MatrixCoefficients", "CodingEquations")), ('FFmpeg', ("color_space",)),
+                     ('ExifTool', ("MatrixCoefficients", "ColorSpace")), ('OIIO', ("ColorSpace",))]),
+    "timecode": (_to_str, [('Native', ("StartTimecode", "timeCode", "TimeCode")), ('FFmpeg', ("timecode",)),
+                           ('ExifTool', ("StartTimecode", "TimeCode")), ('OIIO', ("TimeCode",))]),
+    "reel": (_to_str, [('Native', ("ReelName", "reelName")), ('FFmpeg', ("reel_name",)),
+                       ('ExifTool', ("ReelName", "TapeName"))]),
+    "camera_make": (_to_name, [('ExifTool', ("Make", "CameraManufacturer")), ('OIIO', ("Make", "cameraMake")),
+                               ('Native', ("cameraMake",))]),
+    "camera_model": (_to_name, [('ExifTool', ("Model", "CameraModelName")), ('OIIO', ("Model", "cameraModel")),
+                                ('Native', ("cameraModel", "InputDevice"))]),
+    "camera_serial": (_to_str, [('ExifTool', ("SerialNumber", "CameraSerialNumber")),
+                                ('OIIO', ("BodySerialNumber", "cameraSerialNumber")),
+                                ('Native', ("cameraSerialNumber", "InputDeviceSerial"))]),
+    "lens": (_to_name, [('ExifTool', ("LensModel", "LensType", "Lens")), ('OIIO', ("LensModel", "lensModel")),
+                        ('Native', ("lensModel",))]),
+    "focal_length": (_to_float, [('ExifTool', ("FocalLength",)), ('OIIO', ("FocalLength",)),
+                                 ('Native', ("nominalFocalLength",))]),
+    "exposure_index": (_to_int, [('ExifTool', ("ExposureIndex", "ISO")),
+                                 ('OIIO', ("ExposureIndex", "ISOSpeedRatings")), ('Native', ("isoSpeed",))]),
+    "white_balance": (_to_int, [('ExifTool', ("WhiteBalanceKelvin", "ColorTemperature")),
+                                ('OIIO', ("WhiteBalanceKelvin",))]),
+    "shutter_angle": (_to_float, [('ExifTool', ("ShutterAngle",)), ('Native', ("ShutterAngle",))]),
+}
+FIELD_NAMES = tuple(FIELDS)
+# Python type of each field's values (str for names and identifiers).
+FIELD_TYPES = {name: {_to_int: int, _to_float: float, _to_rate: float}.get(convert, str)
+               for name, (convert, _) in FIELDS.items()}
+
+
+def _exiftool_index(section):
+    index = {}
+    for key, value in section.items():
+        index.setdefault(key.rsplit(":", 1)[-1], value)
+    return index
+
+
+def _ffprobe_index(section):
+    index = {}
+    streams = section.get("streams") or []
+    video = [stream for stream in streams if stream.get("codec_type") == "video"]
+    layers = []
+    if video:
+        layers += [video[0], video[0].get("tags") or {}]
+    fmt = section.get("format") or {}
+    layers += [fmt, fmt.get("tags") or {}]
+    for layer in layers:
+        for key, value in layer.items():
+            index.setdefault(key, value)
+    return index
+
+
+def _oiio_index(section):
+    index = dict(section)
+    for key, value in section.items():
+        index.setdefault(key.rsplit(":", 1)[-1], value)
+    return index
+
+
+def _native_index(section):
+    index = dict(section)
+    if "Tracks" in section:
+        # QuickTime sample descriptions store bits per pixel (24 for 8-bit RGB and for ProRes alike).
+        index.pop("BitDepth", None)
+    window = section.get("displayWindow") or section.get("dataWindow")
+    if isinstance(window, (list, tuple)) and len(window) == 4:
+        # EXR windows are inclusive [xMin, yMin, xMax, yMax].
+        index.setdefault("ImageWidth", window[2] - window[0] + 1)
+        index.setdefault("ImageHeight", window[3] - window[1] + 1)
+    return index
+
+
+SECTION_INDEXES = {'Native': _native_index, 'FFmpeg': _ffprobe_index, 'ExifTool': _exiftool_index,
+                   'OIIO': _oiio_index}
+
+
+class MetadataRecord:
+    """
+    Typed, normalized metadata of one file (see FIELDS), None where no backend
+    had the value. `raw` gives back the backend dicts: from the compressed copy
+    kept with `keep_raw`, otherwise by extracting the file again.
+    """
+    __slots__ = ("path", "container", "tier") + FIELD_NAMES + ("_raw",)
+
+    def __init__(self, path, container=None, raw=None, tier=None, **fields):
+        self.path = path
+        self.container = sys.intern(container) if container else None
+        self.tier = sys.intern(tier) if tier else None
+        for name in FIELD_NAMES:
+            setattr(self, name, fields.get(name))
+        self._raw = raw
+
+    @classmethod
+    def from_metadata(cls, path, metadata, container=None, keep_raw=False, precedence=None, tier=None):
+        """
+        Record of `metadata` ({backend: section}, e.g. a LazyMetadata or a cached
+        dict); only the backends that hold a dict section are read. `precedence`
+        (a sequence of backend names) replaces the per-field order of FIELDS.
+        `tier` defaults to the extraction tier of the metadata.
+        """
+        if tier is None:
+            tier = getattr(metadata, "tier", None) or (metadata.get("Tier") if isinstance(metadata, dict) else None)
+        indexes = {}
+        for tool, index in SECTION_INDEXES.items():
+            section = metadata.get(tool) if hasattr(metadata, "get") else None
+            if isinstance(section, dict) and "Error" not in section:
+                indexes[tool] = index(section)
+        fields = {}
+        for name, (convert, sources) in FIELDS.items():
+            if precedence is not None:
+                sources = sorted(sources, key=lambda source: precedence.index(source[0])
+                                 if source[0] in precedence else len(precedence))
+            for tool, keys in sources:
+                index = indexes.get(tool)
+                if index is None:
+                    continue
+                value = next((convert(index[key]) for key in keys if key in index and index[key] is not None), None)
+                if value is not None:
+                    fields[name] = value
+                    break
+        raw = None
+        if keep_raw:
+            raw = zlib.compress(json.dumps({tool: metadata[tool] for tool in metadata}, default=str).encode("utf-8"))
+        return cls(path, container=container, raw=raw, tier=tier, **fields)
+
+    @property
+    def raw(self):
+        """Backend dicts of the file (decoded on each access, never kept uncompressed)."""
+        if self._raw is not None:
+            return json.loads(zlib.decompress(self._raw))
+        from get_metadata import DEFAULT_TIER, MetadataExtractor
+        return MetadataExtractor(self.path, tier=self.tier or DEFAULT_TIER).extract_metadata().to_dict()
+
+    @property
+    def has_raw(self):
+        return self._raw is not None
+
+    def to_dict(self):
+        """Plain dict of the fields (without the raw payload)."""
+        record = {"path": self.path, "container": self.container, "tier": self.tier}
+        record.update((name, getattr(self, name)) for name in FIELD_NAMES)
+        return record
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(record["path"], container=record.get("container"), tier=record.get("tier"),
+                   **{name: record.get(name) for name in FIELD_NAMES if name in record})
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name in self.__slots__:
+            setattr(self, name, state.get(name))
+
+    def __eq__(self, other):
+        if not isinstance(other, MetadataRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items() if value is not None)
+        return f"MetadataRecord({fields})"
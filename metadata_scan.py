@@ -0,0 +1,98 @@
+"""
+Directory scan writing one JSON line per file (NDJSON) as soon as each file is
+extracted. The tree is walked lazily and at most 2 * workers files are in
+flight, so memory stays flat whatever the size of the tree.
+"""
+
+import os
+import sys
+import json
+from itertools import groupby
+
+from get_metadata import DEFAULT_TIER, MetadataExtractor
+from sequences import group_sequences, extract_sequence_metadata
+
+
+def iter_files(root, extensions=None, include_hidden=False, follow_symlinks=False):
+    """
+    Yield the files under `root` (depth first, sorted per directory) without
+    listing the whole tree up front. `extensions` is an optional set of
+    lowercase extensions such as {".mxf", ".mov"}. Hidden files (including
+    macOS "._" resource forks) are skipped unless `include_hidden`.
+    """
+    if os.path.isfile(root):
+        yield root
+        return
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Cannot read {directory}: {e}", file=sys.stderr)
+            continue
+        subdirectories = []
+        for entry in entries:
+            if not include_hidden and entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subdirectories.append(entry.path)
+                elif entry.is_file(follow_symlinks=follow_symlinks):
+                    if extensions is None or os.path.splitext(entry.name)[1].lower() in extensions:
+                        yield entry.path
+            except OSError:
+                continue
+        stack.extend(reversed(subdirectories))
+
+
+def _collapse_sequences(files, write, sample=0, **extract_kwargs):
+    """
+    Yield the files that are not part of an image sequence; each sequence of a
+    directory is written as one record instead (iter_files lists a directory's
+    files together). extract_many pulls this generator from the caller's thread,
+    so these writes never interleave with the per-file records.
+    """
+    for directory, paths in groupby(files, key=os.path.dirname):
+        sequences, singles = group_sequences(paths)
+        for sequence in sequences:
+            write({"path": sequence.pattern, "sequence": extract_sequence_metadata(sequence, sample=sample,
+                                                                                   **extract_kwargs)})
+        yield from singles
+
+
+def scan(root, out=None, workers=None, ordered=False, keys=None, projection=False, flush_every=1,
+         extensions=None, include_hidden=False, sequences=False, sample=0, **extractor_kwargs):
+    """
+    Extract every file under `root` and write {"path": ..., "tier": ..., "metadata": ...}
+    lines to `out` (a text file object, stdout by default), flushing every `flush_every`
+    records. With `keys`, only the matching metadata is written. Failed files
+    get {"path": ..., "error": ...}. With `sequences`, each image sequence is one
+    {"path": pattern, "sequence": report} line where only the first frame (and
+    `sample` more) is probed, see sequences.py. The extraction tier is passed with
+    the extractor arguments (tier="quick"). Returns the number of records written.
+    """
+    out = out or sys.stdout
+    count = 0
+    tier = extractor_kwargs.get("tier", DEFAULT_TIER)
+
+    def write(record):
+        nonlocal count
+        out.write(json.dumps(record, default=str) + "\n")
+        count += 1
+        if flush_every and count % flush_every == 0:
+            out.flush()
+
+    files = iter_files(root, extensions=extensions, include_hidden=include_hidden)
+    if sequences:
+        files = _collapse_sequences(files, write, sample=sample, workers=workers, keys=keys, projection=projection,
+                                    **extractor_kwargs)
+    for file_path, metadata in MetadataExtractor.extract_many(files, workers=workers, ordered=ordered, keys=keys,
+                                                              projection=projection, **extractor_kwargs):
+        if isinstance(metadata, dict) and set(metadata) == {"Error"}:
+            write({"path": file_path, "error": metadata["Error"]})
+        else:
+            write({"path": file_path, "tier": tier, "metadata": dict(metadata)})
+    out.flush()
+    return count
@@ -3,6 +3,7 @@ import shutil
 import OpenImageIO as oiio
 import subprocess
 import re
+from exr_reader import read_exr_header
 
 class VFXMetadataProcessor:
     def __init__(self, path, metadata=None, burn_in=False, apply_aces=False):
@@ -32,6 +33,21 @@ class VFXMetadataProcessor:
         img.close()
         return metadata
 
+    def get_exr_header(self, image_path):
+        """Typed header attributes of every part, read natively (no pixel access, no OIIO)."""
+        header = read_exr_header(image_path)
+        return header["parts"] if header else []
+
+    def verify_sequence(self, workers=None, rate=None):
+        """
+        Header homogeneity and timecode continuity of the frame sequences in the
+        folder, as {pattern: report} (see sequence_check.py). Every header is
+        read natively like get_exr_header, on a process pool of `workers`.
+        """
+        from sequence_check import verify_folder
+        self.detect_exr_sequence_pattern()  # Raises when the folder holds no EXR.
+        return verify_folder(self.path, workers=workers, rate=rate)
+
     def copy_exr_file(self, original_path):
         copy_path = original_path.replace(".exr", "_copy.exr")
         shutil.copy2(original_path, copy_path)
@@ -176,19 +192,20 @@ class VFXMetadataProcessor:
             print("Invalid path provided. Please provide a directory containing EXR files.")
 
 # Example usage
-path01 = "source_images/sample_exr_640x426/"
-path02 = "source_images/UFO_0090_lgt_v35_char_BTY/"
-folder_path = path02
-metadata = {
-    "title": "UFO_0090",
-    "artist": "VFX Artist",
-    "comment": "Final composited version",
-    "version": "v035",
-    "saucisse": "frites"
-}
-
-os.system('cls' if os.name == 'nt' else 'clear')
-
-processor = VFXMetadataProcessor(folder_path, metadata, burn_in=True, apply_aces=True)
-processor.process()
-processor.remove_temporary_files()
+if __name__ == "__main__":
+    path01 = "source_images/sample_exr_640x426/"
+    path02 = "source_images/UFO_0090_lgt_v35_char_BTY/"
+    folder_path = path02
+    metadata = {
+        "title": "UFO_0090",
+        "artist": "VFX Artist",
+        "comment": "Final composited version",
+        "version": "v035",
+        "saucisse": "frites"
+    }
+
+    os.system('cls' if os.name == 'nt' else 'clear')
+
+    processor = VFXMetadataProcessor(folder_path, metadata, burn_in=True, apply_aces=True)
+    processor.process()
+    processor.remove_temporary_files()
@@ -0,0 +1,334 @@
+"""
+Native QuickTime / ISO-BMFF (MOV, MP4) reader: seeks from top-level atom to
+top-level atom until it finds 'moov' and parses that box only. 'mdat' (the
+media payload) is skipped, so the cost does not depend on the file size.
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+
+from timecode import format_timecode
+from instrumentation import open_binary
+
+# Atoms whose payload is a plain list of child atoms.
+CONTAINER_ATOMS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"dinf", b"edts", b"udta", b"tref"}
+MAC_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+MAX_MOOV_SIZE = 256 * 1024 * 1024
+
+HANDLER_TYPES = {b"vide": "Video", b"soun": "Audio", b"tmcd": "Timecode", b"text": "Text",
+                 b"sbtl": "Subtitle", b"subt": "Subtitle", b"meta": "Metadata", b"hint": "Hint"}
+TMCD_DROP_FRAME = 0x0001
+
+# 'data' atom well-known types (QuickTime File Format, "Well-known types").
+DATA_TYPES = {
+    1: lambda value: value.decode("utf-8", errors="replace"),
+    2: lambda value: value.decode("utf-16-be", errors="replace"),
+    21: lambda value: int.from_bytes(value, "big", signed=True) if value else None,
+    22: lambda value: int.from_bytes(value, "big", signed=False) if value else None,
+    23: lambda value: struct.unpack(">f", value[:4])[0],
+    24: lambda value: struct.unpack(">d", value[:8])[0],
+}
+
+
+def _iter_atoms(data, start=0, end=None):
+    """Yield (type, payload start, atom end) for the atoms packed in data[start:end]."""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, atom_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            return
+        yield atom_type, offset + header, offset + size
+        offset += size
+
+
+def _find(data, start, end, atom_type):
+    for child_type, child_start, child_end in _iter_atoms(data, start, end):
+        if child_type == atom_type:
+            return child_start, child_end
+    return None
+
+
+def _read_moov(f):
+    """Seek over the top-level atoms and return (major brand, compatible brands, moov payload)."""
+    f.seek(0, 2)
+    file_size = f.tell()
+    offset = 0
+    major_brand = None
+    compatible_brands = []
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        size, atom_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_size:
+            return major_brand, compatible_brands, None
+        if atom_type == b"ftyp":
+            f.seek(offset + header_size)
+            payload = f.read(min(size - header_size, 1024))
+            major_brand = payload[:4].decode("latin-1").strip()
+            compatible_brands = [payload[i:i + 4].decode("latin-1").strip() for i in range(8, len(payload) - 3, 4)]
+        elif atom_type == b"moov":
+            if size - header_size > MAX_MOOV_SIZE:
+                raise ValueError("moov atom too large.")
+            f.seek(offset + header_size)
+            return major_brand, compatible_brands, f.read(size - header_size)
+        offset += size
+    return major_brand, compatible_brands, None
+
+
+def _mac_date(seconds):
+    if not seconds:
+        return None
+    return (MAC_EPOCH + timedelta(seconds=seconds)).strftime("%Y:%m:%d %H:%M:%S")
+
+
+def _full_box_times(data, start):
+    """(creation, modification, timescale, duration) of an mvhd/mdhd box."""
+    if data[start] == 1:
+        return struct.unpack_from(">QQIQ", data, start + 4)
+    return struct.unpack_from(">IIII", data, start + 4)
+
+
+def _parse_visual_entry(data, start, end, track):
+    (track["Width"], track["Height"]) = struct.unpack_from(">HH", data, start + 24)
+    name_length = min(data[start + 42], 31)
+    compressor = data[start + 43:start + 43 + name_length].decode("latin-1").strip("\x00 ")
+    if compressor:
+        track["CompressorName"] = compressor
+    track["BitDepth"] = struct.unpack_from(">H", data, start + 74)[0]
+    for child_type, child_start, child_end in _iter_atoms(data, start + 78, end):
+        if child_type == b"colr" and child_end - child_start >= 10:
+            kind = data[child_start:child_start + 4]
+            if kind in (b"nclc", b"nclx"):
+                primaries, transfer, matrix = struct.unpack_from(">HHH", data, child_start + 4)
+                track["ColorPrimaries"] = primaries
+                track["TransferCharacteristics"] = transfer
+                track["MatrixCoefficients"] = matrix
+                if kind == b"nclx" and child_end - child_start >= 11:
+                    track["FullRange"] = bool(data[child_start + 10] & 0x80)
+        elif child_type == b"fiel" and child_end - child_start >= 2:
+            track["FieldCount"] = data[child_start]
+            track["FieldOrder"] = data[child_start + 1]
+        elif child_type == b"pasp" and child_end - child_start >= 8:
+            h_spacing, v_spacing = struct.unpack_from(">II", data, child_start)
+            if v_spacing:
+                track["PixelAspectRatio"] = f"{h_spacing}:{v_spacing}"
+        elif child_type == b"gama" and child_end - child_start >= 4:
+            track["Gamma"] = struct.unpack_from(">I", data, child_start)[0] / 65536.0
+
+
+def _parse_sound_entry(data, start, track):
+    version = struct.unpack_from(">H", data, start + 8)[0]
+    track["Channels"], track["SampleSize"] = struct.unpack_from(">HH", data, start + 16)
+    track["SampleRate"] = struct.unpack_from(">I", data, start + 24)[0] >> 16
+    if version == 2:
+        track["SampleRate"] = struct.unpack_from(">d", data, start + 32)[0]
+        track["Channels"] = struct.unpack_from(">I", data, start + 40)[0]
+
+
+def _parse_tmcd_entry(data, start, end, track):
+    flags, timescale, frame_duration, number_of_frames = struct.unpack_from(">IIIB", data, start + 12)
+    track["TimecodeFlags"] = flags
+    track["DropFrame"] = bool(flags & TMCD_DROP_FRAME)
+    track["TimecodeTimescale"] = timescale
+    track["TimecodeFrameDuration"] = frame_duration
+    track["TimecodeRate"] = number_of_frames
+    name = _find(data, start + 26, end, b"name")
+    if name and name[1] - name[0] > 4:
+        length = struct.unpack_from(">H", data, name[0])[0]
+        track["ReelName"] = data[name[0] + 4:name[0] + 4 + length].decode("utf-8", errors="replace")
+
+
+def _parse_stbl(data, start, end, track):
+    """Sample description, frame count/rate and the first chunk offset of one track."""
+    handler = track.get("HandlerType")
+    for atom_type, atom_start, atom_end in _iter_atoms(data, start, end):
+        if atom_type == b"stsd":
+            entries = list(_iter_atoms(data, atom_start + 8, atom_end))
+            if not entries:
+                continue
+            entry_type, entry_start, entry_end = entries[0]
+            track["Codec"] = entry_type.decode("latin-1")
+            if handler == "Video":
+                _parse_visual_entry(data, entry_start, entry_end, track)
+            elif handler == "Audio":
+                _parse_sound_entry(data, entry_start, track)
+            elif handler == "Timecode":
+                _parse_tmcd_entry(data, entry_start, entry_end, track)
+        elif atom_type == b"stts":
+            count = struct.unpack_from(">I", data, atom_start + 4)[0]
+            samples = 0
+            durations = []
+            for index in range(count):
+                sample_count, sample_delta = struct.unpack_from(">II", data, atom_start + 8 + index * 8)
+                samples += sample_count
+                durations.append(sample_delta)
+            track["SampleCount"] = samples
+            if durations and durations[0]:
+                track["SampleDuration"] = durations[0]
+        elif atom_type in (b"stco", b"co64") and struct.unpack_from(">I", data, atom_start + 4)[0]:
+            fmt = ">I" if atom_type == b"stco" else ">Q"
+            track["FirstChunkOffset"] = struct.unpack_from(fmt, data, atom_start + 8)[0]
+
+
+def _parse_trak(data, start, end):
+    track = {}
+    tkhd = _find(data, start, end, b"tkhd")
+    if tkhd:
+        version = data[tkhd[0]]
+        track["TrackID"] = struct.unpack_from(">I", data, tkhd[0] + (20 if version == 1 else 12))[0]
+        width, height = struct.unpack_from(">II", data, tkhd[1] - 8)
+        if width or height:
+            track["TrackWidth"], track["TrackHeight"] = width / 65536.0, height / 65536.0
+    mdia = _find(data, start, end, b"mdia")
+    if not mdia:
+        return track
+    mdhd = _find(data, *mdia, b"mdhd")
+    if mdhd:
+        _, _, timescale, duration = _full_box_times(data, mdhd[0])
+        track["MediaTimescale"] = timescale
+        track["MediaDuration"] = duration / timescale if timescale else None
+    hdlr = _find(data, *mdia, b"hdlr")
+    if hdlr:
+        handler = data[hdlr[0] + 8:hdlr[0] + 12]
+        track["HandlerType"] = HANDLER_TYPES.get(handler, handler.decode("latin-1"))
+    minf = _find(data, *mdia, b"minf")
+    stbl = minf and _find(data, *minf, b"stbl")
+    if stbl:
+        _parse_stbl(data, *stbl, track)
+    if track.get("HandlerType") == "Video" and track.get("SampleDuration") and track.get("MediaTimescale"):
+        track["FrameRate"] = round(track["MediaTimescale"] / track["SampleDuration"], 3)
+    return track
+
+
+def _parse_udta(data, start, end, metadata):
+    """Classic QuickTime user data: '\xa9xxx' text atoms (size, language, text)."""
+    for atom_type, atom_start, atom_end in _iter_atoms(data, start, end):
+        if atom_type[:1] == b"\xa9" and atom_end - atom_start >= 4:
+            length = struct.unpack_from(">H", data, atom_start)[0]
+            text = data[atom_start + 4:atom_start + 4 + length].decode("utf-8", errors="replace")
+            metadata["UserData:" + atom_type[1:].decode("latin-1")] = text
+        elif atom_type == b"meta":
+            _parse_meta(data, atom_start, atom_end, metadata)
+
+
+def _parse_meta(data, start, end, metadata):
+    """'meta' with a 'keys' table and an 'ilst' (QuickTime metadata) or iTunes-style ilst."""
+    # ISO 'meta' is a full box (4 bytes of version/flags); the QuickTime one is not.
+    if data[start + 4:start + 8] not in (b"hdlr", b"keys", b"ilst"):
+        start += 4
+    keys = []
+    keys_atom = _find(data, start, end, b"keys")
+    if keys_atom:
+        count = struct.unpack_from(">I", data, keys_atom[0] + 4)[0]
+        offset = keys_atom[0] + 8
+        for _ in range(count):
+            size = struct.unpack_from(">I", data, offset)[0]
+            keys.append(data[offset + 8:offset + size].decode("utf-8", errors="replace"))
+            offset += size
+    ilst = _find(data, start, end, b"ilst")
+    if not ilst:
+        return
+    for item_type, item_start, item_end in _iter_atoms(data, *ilst):
+        index = int.from_bytes(item_type, "big")
+        if keys and 1 <= index <= len(keys):
+            name = "Keys:" + keys[index - 1]
+        else:
+            # iTunes-style item, named by its atom type.
+            name = "ItemList:" + item_type.decode("latin-1").replace("\xa9", "")
+        data_atom = _find(data, item_start, item_end, b"data")
+        if not data_atom or data_atom[1] - data_atom[0] < 8:
+            continue
+        data_type = struct.unpack_from(">I", data, data_atom[0])[0] & 0xFFFFFF
+        value = bytes(data[data_atom[0] + 8:data_atom[1]])
+        decode = DATA_TYPES.get(data_type)
+        metadata[name] = decode(value) if decode else value.hex()
+
+
+def _read_tmcd_sample(f, track):
+    """Start timecode of a tmcd track: the 32-bit frame number of its first sample."""
+    offset = track.get("FirstChunkOffset")
+    if offset is None:
+        return None
+    f.seek(offset)
+    sample = f.read(4)
+    if len(sample) < 4:
+        return None
+    return struct.unpack(">I", sample)[0]
+
+
+def read_mov_metadata(file_path):
+    """
+    Metadata of a QuickTime/MP4 file from its 'moov' atom, as a flat dict (the
+    same shape as the other backends of MetadataExtractor). Returns None when no
+    'moov' atom is found.
+    """
+    with open_binary(file_path) as f:
+        major_brand, compatible_brands, moov = _read_moov(f)
+        if moov is None:
+            return None
+        metadata = {}
+        if major_brand:
+            metadata["MajorBrand"] = major_brand
+            metadata["CompatibleBrands"] = compatible_brands
+
+        tracks = []
+        for atom_type, atom_start, atom_end in _iter_atoms(moov):
+            if atom_type == b"mvhd":
+                creation, modification, timescale, duration = _full_box_times(moov, atom_start)
+                metadata["CreationDate"] = _mac_date(creation)
+                metadata["ModificationDate"] = _mac_date(modification)
+                metadata["TimeScale"] = timescale
+                metadata["Duration"] = duration / timescale if timescale else None
+            elif atom_type == b"trak":
+                tracks.append(_parse_trak(moov, atom_start, atom_end))
+            elif atom_type == b"udta":
+                _parse_udta(moov, atom_start, atom_end, metadata)
+            elif atom_type == b"meta":
+                _parse_meta(moov, atom_start, atom_end, metadata)
+
+        timecode_track = next((track for track in tracks if track.get("HandlerType") == "Timecode"), None)
+        if timecode_track:
+            frame_number = _read_tmcd_sample(f, timecode_track)
+            rate = timecode_track.get("TimecodeRate")
+            if frame_number is not None and rate:
+                metadata["StartTimecode"] = format_timecode(frame_number, rate, timecode_track["DropFrame"])
+                metadata["TimecodeRate"] = rate
+                metadata["DropFrame"] = timecode_track["DropFrame"]
+            if "ReelName" in timecode_track:
+                metadata["ReelName"] = timecode_track["ReelName"]
+
+    video = next((track for track in tracks if track.get("HandlerType") == "Video"), None)
+    if video:
+        metadata["VideoCodec"] = video.get("Codec")
+        for name in ("CompressorName", "BitDepth", "FrameRate", "ColorPrimaries", "TransferCharacteristics",
+                     "MatrixCoefficients", "FullRange", "FieldCount", "PixelAspectRatio", "Gamma"):
+            if name in video:
+                metadata[name] = video[name]
+        metadata["ImageWidth"] = video.get("Width")
+        metadata["ImageHeight"] = video.get("Height")
+        metadata["FrameCount"] = video.get("SampleCount")
+    audio = [track for track in tracks if track.get("HandlerType") == "Audio"]
+    if audio:
+        metadata["AudioTrackCount"] = len(audio)
+        for name in ("Codec", "Channels", "SampleSize", "SampleRate"):
+            if name in audio[0]:
+                metadata["Audio" + name] = audio[0][name]
+    for track in tracks:
+        track.pop("FirstChunkOffset", None)
+    metadata["Tracks"] = tracks
+    return metadata
@@ -0,0 +1,338 @@
+"""
+Native MXF header reader: memory-maps the header partition only and walks its
+KLV packets (SMPTE ST 377-1) without spawning any process.
+"""
+
+import mmap
+import struct
+
+from timecode import format_timecode
+from instrumentation import open_binary, record_bytes
+
+PARTITION_PACK_PREFIX = bytes.fromhex("060e2b34020501010d01020101")
+PRIMER_PACK_KEY = bytes.fromhex("060e2b34020501010d01020101050100")
+LOCAL_SET_PREFIX = bytes.fromhex("060e2b34025301010d01010101")
+RUN_IN_MAX = 65536
+
+# Header metadata set types (byte 14 of the set key).
+SET_TYPES = {
+    0x2F: "Preface",
+    0x30: "Identification",
+    0x36: "MaterialPackage",
+    0x37: "SourcePackage",
+    0x3B: "Track",
+    0x14: "TimecodeComponent",
+    0x27: "PictureDescriptor",
+    0x28: "PictureDescriptor",  # CDCI
+    0x29: "PictureDescriptor",  # RGBA
+    0x51: "PictureDescriptor",  # MPEG-2 video
+    0x42: "SoundDescriptor",
+    0x47: "SoundDescriptor",    # AES3
+    0x48: "SoundDescriptor",    # WAVE PCM
+    0x44: "MultipleDescriptor",
+}
+
+# Static local tags: tag -> (name, decoder name).
+LOCAL_TAGS = {
+    # Identification
+    0x3C01: ("CompanyName", "utf16"),
+    0x3C02: ("ProductName", "utf16"),
+    0x3C03: ("ProductVersion", "product_version"),
+    0x3C04: ("VersionString", "utf16"),
+    0x3C05: ("ProductUID", "uid"),
+    0x3C06: ("ModificationDate", "timestamp"),
+    0x3C07: ("ToolkitVersion", "product_version"),
+    0x3C08: ("Platform", "utf16"),
+    0x3C09: ("ThisGenerationUID", "uid"),
+    # Preface
+    0x3B02: ("LastModifiedDate", "timestamp"),
+    0x3B05: ("Version", "u16"),
+    0x3B09: ("OperationalPattern", "uid"),
+    # Packages and tracks
+    0x4402: ("PackageName", "utf16"),
+    0x4405: ("PackageCreationDate", "timestamp"),
+    0x4404: ("PackageModifiedDate", "timestamp"),
+    0x4801: ("TrackID", "u32"),
+    0x4802: ("TrackName", "utf16"),
+    0x4B01: ("EditRate", "rational"),
+    0x4B02: ("Origin", "i64"),
+    0x0202: ("Duration", "i64"),
+    # Timecode component
+    0x1501: ("StartTimecode", "i64"),
+    0x1502: ("RoundedTimecodeBase", "u16"),
+    0x1503: ("DropFrame", "bool"),
+    # File descriptor
+    0x3001: ("SampleRate", "rational"),
+    0x3002: ("ContainerDuration", "i64"),
+    0x3004: ("EssenceContainer", "uid"),
+    0x3005: ("Codec", "uid"),
+    0x3006: ("LinkedTrackID", "u32"),
+    # Picture descriptor
+    0x3201: ("PictureEssenceCoding", "uid"),
+    0x3202: ("StoredHeight", "u32"),
+    0x3203: ("StoredWidth", "u32"),
+    0x3204: ("SampledHeight", "u32"),
+    0x3205: ("SampledWidth", "u32"),
+    0x3208: ("DisplayHeight", "u32"),
+    0x3209: ("DisplayWidth", "u32"),
+    0x320C: ("FrameLayout", "u8"),
+    0x320E: ("AspectRatio", "rational"),
+    0x3210: ("TransferCharacteristic", "uid"),
+    0x3219: ("ColorPrimaries", "uid"),
+    0x321A: ("CodingEquations", "uid"),
+    0x3301: ("ComponentDepth", "u32"),
+    0x3302: ("HorizontalSubsampling", "u32"),
+    0x3308: ("VerticalSubsampling", "u32"),
+    0x3303: ("ColorSiting", "u8"),
+    0x3304: ("BlackRefLevel", "u32"),
+    0x3305: ("WhiteRefLevel", "u32"),
+    0x3306: ("ColorRange", "u32"),
+    0x3406: ("ComponentMaxRef", "u32"),
+    0x3407: ("ComponentMinRef", "u32"),
+    # Sound descriptor
+    0x3D01: ("QuantizationBits", "u32"),
+    0x3D03: ("AudioSamplingRate", "rational"),
+    0x3D06: ("SoundEssenceCoding", "uid"),
+    0x3D07: ("ChannelCount", "u32"),
+    0x3D09: ("AverageBytesPerSecond", "u32"),
+    0x3D0A: ("BlockAlign", "u16"),
+}
+
+# Properties that writers often store under dynamic tags, by property label
+# without its version byte.
+DYNAMIC_PROPERTIES = {
+    bytes.fromhex("060e2b3401010104010201010601" "00"): ("ColorPrimaries", "uid"),
+    bytes.fromhex("060e2b3401010104010201010301" "00"): ("CodingEquations", "uid"),
+    bytes.fromhex("060e2b3401010104010201010102" "00"): ("TransferCharacteristic", "uid"),
+}
+
+# Well-known SMPTE labels by the hex of their bytes 8.. (after the registry
+# version byte, which varies between writers); the longest prefix wins.
+UL_NAMES = {
+    "0d0102011000": "OPAtom",
+    "04010101010100": "ITU-R BT.470",
+    "04010101010200": "ITU-R BT.709",
+    "04010101010300": "SMPTE 240M",
+    "04010101010600": "Linear",
+    "04010101010a00": "SMPTE ST 2084 (PQ)",
+    "04010101010b00": "ITU-R BT.2100 HLG",
+    "04010101020100": "ITU-R BT.601",
+    "04010101020200": "ITU-R BT.709",
+    "04010101020600": "ITU-R BT.2020",
+    "04010101030100": "SMPTE 170M (ITU-R BT.601 525-line)",
+    "04010101030200": "ITU-R BT.470 System B/G (ITU-R BT.601 625-line)",
+    "04010101030300": "ITU-R BT.709",
+    "04010101030400": "ITU-R BT.2020",
+    "04010101030500": "SMPTE ST 428-1 (XYZ)",
+    "04010101030600": "P3-D65",
+    "0401020201": "MPEG-2 Video",
+    "040102020120": "MPEG-4 Visual",
+    # H.264/AVC picture coding labels use byte 13 values 0x30 to 0x3f.
+    **{f"0401020201{byte:02x}": "H.264/AVC" for byte in range(0x30, 0x40)},
+    "040102020301": "JPEG 2000",
+    "040102020302": "VC-3",
+    "040102020306": "Apple ProRes",
+    "0d0103010201": "D-10",
+    "0d0103010204": "MPEG-ES",
+    "0d010301020601": "Broadcast Wave",
+    "0d010301020603": "AES3",
+    "0d010301020c": "JPEG 2000",
+    "0d0103010210": "AVC",
+    "0d0103010211": "VC-3",
+    "0d010301021c": "Apple ProRes",
+}
+UL_PREFIX = bytes.fromhex("060e2b3404010101")[:7]
+
+
+def format_uid(value):
+    """UL/UID as dotted 32-bit hex groups, like art-cmd's JSON export."""
+    hex_value = value.hex()
+    return ".".join(hex_value[i:i + 8] for i in range(0, len(hex_value), 8))
+
+
+def _ul_name(value):
+    """Readable name of a SMPTE label when known, its dotted hex otherwise."""
+    if value[:7] == UL_PREFIX:
+        tail = value[8:].hex()
+        # Operational patterns: byte 12 is the item complexity, byte 13 the package complexity.
+        if tail.startswith("0d010201") and 1 <= value[12] <= 3 and 1 <= value[13] <= 3:
+            return f"OP{value[12]}{'abc'[value[13] - 1]}"
+        for length in range(len(tail), 3, -1):
+            if tail[:length] in UL_NAMES:
+                return UL_NAMES[tail[:length]]
+    return format_uid(value)
+
+
+def _decode(kind, value):
+    if kind == "utf16":
+        return value.decode("utf-16-be", errors="replace").rstrip("\x00")
+    if kind == "uid":
+        return _ul_name(value) if len(value) == 16 else format_uid(value)
+    if kind == "u8":
+        return value[0]
+    if kind == "bool":
+        return bool(value[0])
+    if kind == "u16":
+        return struct.unpack(">H", value[:2])[0]
+    if kind == "u32":
+        return struct.unpack(">I", value[:4])[0]
+    if kind == "i64":
+        return struct.unpack(">q", value[:8])[0]
+    if kind == "rational":
+        numerator, denominator = struct.unpack(">ii", value[:8])
+        return f"{numerator}/{denominator}" if denominator != 1 else str(numerator)
+    if kind == "timestamp":
+        year, month, day, hour, minute, second, quarter_ms = struct.unpack(">HBBBBBB", value[:8])
+        return f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:02d}.{quarter_ms * 4:03d}Z"
+    if kind == "product_version":
+        return ".".join(str(part) for part in struct.unpack(">5H", value[:10]))
+    return value.hex()
+
+
+def _read_ber_length(data, offset):
+    first = data[offset]
+    if first < 0x80:
+        return first, offset + 1
+    count = first & 0x7F
+    return int.from_bytes(data[offset + 1:offset + 1 + count], "big"), offset + 1 + count
+
+
+def _iter_klv(data, offset, end):
+    while offset + 17 <= end:
+        key = bytes(data[offset:offset + 16])
+        length, value_offset = _read_ber_length(data, offset + 16)
+        yield key, value_offset, length
+        offset = value_offset + length
+
+
+def _parse_local_set(data, offset, length):
+    values = {}
+    end = offset + length
+    while offset + 4 <= end:
+        tag, size = struct.unpack(">HH", data[offset:offset + 4])
+        values[tag] = bytes(data[offset + 4:offset + 4 + size])
+        offset += 4 + size
+    return values
+
+
+def _decode_set(local_values, dynamic_tags):
+    decoded = {}
+    for tag, value in local_values.items():
+        field = LOCAL_TAGS.get(tag) or dynamic_tags.get(tag)
+        if field and value:
+            name, kind = field
+            try:
+                decoded[name] = _decode(kind, value)
+            except (struct.error, IndexError):
+                continue
+    return decoded
+
+
+def read_partition_pack(data):
+    """Offset of the header partition pack and its fields, or None if not MXF."""
+    offset = data.find(PARTITION_PACK_PREFIX, 0, RUN_IN_MAX + 16)
+    if offset < 0:
+        return None
+    length, value_offset = _read_ber_length(data, offset + 16)
+    (major, minor, kag_size, this_partition, previous_partition, footer_partition,
+     header_byte_count, index_byte_count, index_sid, body_offset, body_sid) = struct.unpack(
+        ">HHIQQQQQIQI", data[value_offset:value_offset + 64])
+    return {
+        "run_in": offset,
+        "end": value_offset + length,
+        "MajorVersion": major,
+        "MinorVersion": minor,
+        "KAGSize": kag_size,
+        "HeaderByteCount": header_byte_count,
+        "FooterPartition": footer_partition,
+        "OperationalPattern": _ul_name(bytes(data[value_offset + 64:value_offset + 80])),
+    }
+
+
+def read_mxf_header(file_path):
+    """
+    Metadata of an MXF file from its header partition, as a flat dict (the same
+    shape as the other backends of MetadataExtractor). Returns None for non-MXF files.
+    """
+    with open_binary(file_path) as f:
+        head = f.read(RUN_IN_MAX + 256)
+        partition = read_partition_pack(head)
+        if partition is None:
+            return None
+        header_end = partition["end"] + partition["HeaderByteCount"]
+        file_size = f.seek(0, 2)
+        map_length = min(file_size, header_end + 4096)
+        with mmap.mmap(f.fileno(), map_length, access=mmap.ACCESS_READ) as data:
+            sets = _read_header_sets(data, partition["end"], min(header_end, map_length))
+        # Pages of the mapping are read on access: count the header metadata they hold
+        # past the head, which open_binary already counted.
+        record_bytes(file_path, max(0, min(header_end, map_length) - max(partition["end"], len(head))))
+
+    metadata = {
+        "MXFVersion": f"{partition['MajorVersion']}.{partition['MinorVersion']}",
+        "OperationalPattern": partition["OperationalPattern"],
+        "HeaderByteCount": partition["HeaderByteCount"],
+    }
+    identifications = [values for set_type, values in sets if set_type == "Identification"]
+    if identifications:
+        # The first identification is the application that created the file (the camera).
+        for name in ("CompanyName", "ProductName", "VersionString", "ProductVersion", "Platform", "ModificationDate"):
+            if name in identifications[0]:
+                metadata[name] = identifications[0][name]
+        metadata["IdentificationList"] = identifications
+
+    for set_type, values in sets:
+        if set_type == "Preface":
+            for name in ("LastModifiedDate", "OperationalPattern"):
+                if name in values:
+                    metadata[name] = values[name]
+        elif set_type == "MaterialPackage" and values.get("PackageName"):
+            metadata["MaterialPackageName"] = values["PackageName"]
+        elif set_type == "SourcePackage" and values.get("PackageName"):
+            metadata.setdefault("SourcePackageName", values["PackageName"])
+        elif set_type == "PictureDescriptor" and "StoredWidth" not in metadata:
+            metadata.update(values)
+        elif set_type == "SoundDescriptor":
+            metadata["AudioTrackCount"] = metadata.get("AudioTrackCount", 0) + 1
+            if metadata["AudioTrackCount"] == 1:
+                for name, value in values.items():
+                    if name in ("SampleRate", "ContainerDuration", "EssenceContainer", "LinkedTrackID", "Codec"):
+                        name = "Audio" + name
+                    metadata[name] = value
+        elif set_type == "TimecodeComponent" and "StartTimecode" not in metadata and "StartTimecode" in values:
+            rate = values.get("RoundedTimecodeBase", 0)
+            drop_frame = values.get("DropFrame", False)
+            metadata["StartTimecode"] = format_timecode(values["StartTimecode"], rate, drop_frame)
+            metadata["TimecodeRate"] = rate
+            metadata["DropFrame"] = drop_frame
+    return metadata
+
+
+def _parse_primer_pack(data, offset):
+    """Dynamic local tags (0x8000+) of the primer pack that map to a known property."""
+    count, item_length = struct.unpack(">II", data[offset:offset + 8])
+    dynamic_tags = {}
+    for index in range(count):
+        item = offset + 8 + index * item_length
+        tag = struct.unpack(">H", data[item:item + 2])[0]
+        ul = bytes(data[item + 2:item + 18])
+        # Ignore the registry version byte when matching the property label.
+        field = DYNAMIC_PROPERTIES.get(ul[:7] + ul[8:])
+        if tag >= 0x8000 and field:
+            dynamic_tags[tag] = field
+    return dynamic_tags
+
+
+def _read_header_sets(data, offset, end):
+    sets = []
+    dynamic_tags = {}
+    for key, value_offset, length in _iter_klv(data, offset, end):
+        if value_offset + length > len(data):
+            break
+        if key == PRIMER_PACK_KEY:
+            dynamic_tags = _parse_primer_pack(data, value_offset)
+        elif key.startswith(LOCAL_SET_PREFIX):
+            set_type = SET_TYPES.get(key[14]) if key[13] == 0x01 else None
+            if set_type:
+                sets.append((set_type, _decode_set(_parse_local_set(data, value_offset, length), dynamic_tags)))
+    return sets
@@ -0,0 +1,345 @@
+"""
+Headless part of OCF_metadata_distribution: finds camera files and exports
+their metadata with the vendor tools (ARRI art-cmd, REDline, SONY rawexporter)
+without importing any GUI toolkit, so it also runs on farm nodes.
+"""
+
+import os
+import json
+import time
+import shutil
+import signal
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import span
+
+# REDCINE-X PRO and SONY RAW Viewer folders, searched for their tools before PATH
+# (os.environ is left alone: this module is also imported by the extraction library).
+TOOL_DIRECTORIES = (
+    "/Applications/REDCINE-X PRO/REDCINE-X PRO.app/Contents/MacOS",
+    "/Applications/RAW Viewer.app/Contents/MacOS/rawexporter",
+)
+
+
+def find_tool(name):
+    """Path of a vendor tool in TOOL_DIRECTORIES or on PATH (the bare name when it is not found)."""
+    search_path = os.pathsep.join([*TOOL_DIRECTORIES, os.environ.get('PATH', '')])
+    return shutil.which(name, path=search_path) or name
+
+
+# Allowed file extensions mapping.
+allowed_extensions = {
+    'ARRI': ['.mxf', '.mov'],
+    'RED': ['.r3d'],
+    'SONY': ['.mxf']
+}
+
+# Tool paths for the different camera types.
+tool_paths = {
+    'ARRI': "/Users/stefan/WORK/DEV/metadata/art-cmd_0.3.0_macos_universal/bin/art-cmd",
+    'RED': find_tool("REDline"),
+    'SONY': find_tool("rawexporter"),
+}
+SPAN_NAMES = {'ARRI': "art-cmd", 'RED': "REDline", 'SONY': "rawexporter"}
+# Seconds a cancelled tool gets to exit after SIGTERM before it is killed.
+CANCEL_GRACE = 2.0
+
+
+class ExportCancelled(Exception):
+    """Raised by ToolRunner.run once the runner has been cancelled."""
+
+
+class ToolRunner:
+    """
+    subprocess.run for the vendor tools, keeping track of the running
+    processes so that cancel() (from any thread) terminates all of them.
+    On POSIX each tool runs in its own process group, so the helper processes
+    it starts are terminated with it.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = set()
+        self.cancelled = False
+
+    def run(self, command, check=False, timeout=None):
+        with self._lock:
+            if self.cancelled:
+                raise ExportCancelled()
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                       start_new_session=os.name == "posix")
+            self._processes.add(process)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except BaseException:
+            self._signal(process, kill=True)
+            process.communicate()
+            raise
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        if self.cancelled:
+            raise ExportCancelled()
+        result = subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+        if check:
+            result.check_returncode()
+        return result
+
+    @staticmethod
+    def _signal(process, kill=False):
+        if os.name != "posix":
+            process.kill() if kill else process.terminate()
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL if kill else signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def cancel(self):
+        """Refuse new processes and terminate the running ones (killed after CANCEL_GRACE seconds)."""
+        with self._lock:
+            self.cancelled = True
+            processes = list(self._processes)
+        for process in processes:
+            self._signal(process)
+
+        def reap():
+            deadline = time.monotonic() + CANCEL_GRACE
+            for process in processes:
+                try:
+                    process.wait(max(0.0, deadline - time.monotonic()))
+                except subprocess.TimeoutExpired:
+                    self._signal(process, kill=True)
+        if processes:
+            threading.Thread(target=reap, name="export-cancel", daemon=True).start()
+
+
+def find_camera_files(source_folder, camera_type):
+    """Yield the files of `source_folder` (recursively) with an extension of the camera type."""
+    allowed = [ext.lower() for ext in allowed_extensions.get(camera_type, [])]
+    for dirpath, _, filenames in os.walk(source_folder):
+        for filename in filenames:
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in allowed:
+                yield os.path.join(dirpath, filename)
+
+
+def parse_key_value_output(raw_output):
+    """Metadata dict of a "Key: Value" per line tool output (REDline, rawexporter)."""
+    metadata = {}
+    for line in raw_output.strip().splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            metadata[key.strip()] = value.strip()
+    return metadata
+
+
+def detect_camera_type(file_path):
+    """
+    Camera type of a camera file for the vendor tools ('ARRI', 'RED', 'SONY'),
+    from its extension and, for MXF, the company of its header. None otherwise.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in allowed_extensions['RED']:
+        return 'RED'
+    if ext != ".mxf":
+        return None
+    from mxf_reader import read_mxf_header
+    try:
+        header = read_mxf_header(file_path) or {}
+    except (OSError, ValueError):
+        return None
+    company = str(header.get("CompanyName", "")).upper()
+    if "ARRI" in company:
+        return 'ARRI'
+    if "SONY" in company:
+        return 'SONY'
+    return None
+
+
+def read_vendor_metadata(file_path, camera_type, timeout=None, runner=None):
+    """
+    Metadata of one camera file read with its vendor tool, without writing an
+    export: the art-cmd JSON for ARRI, the parsed "Key: Value" listing for RED
+    and SONY. Raises OSError when the tool is missing, subprocess.TimeoutExpired
+    past `timeout` and subprocess.CalledProcessError when the tool fails. With
+    a ToolRunner, runner.cancel() terminates the tool (ExportCancelled is raised).
+    """
+    run = runner.run if runner is not None else _run_tool
+    with span("subprocess", SPAN_NAMES[camera_type], file=file_path):
+        if camera_type == 'ARRI':
+            with tempfile.TemporaryDirectory() as temp_folder:
+                json_output_file = os.path.join(temp_folder, "export.json")
+                run([tool_paths['ARRI'], "export", file_path, "--output", json_output_file], check=True,
+                    timeout=timeout)
+                with open(json_output_file, "r") as f:
+                    return json.load(f)
+        if camera_type == 'RED':
+            command = [tool_paths['RED'], "--i", file_path, "--printMeta", "1"]
+        else:
+            command = [tool_paths['SONY'], "--metalist", "--input", file_path]
+        result = run(command, check=True, timeout=timeout)
+    return parse_key_value_output(result.stdout)
+
+
+def _run_tool(command, check=False, timeout=None):
+    return subprocess.run(command, capture_output=True, text=True, check=check, timeout=timeout)
+
+
+def export_file(file_path, camera_type, dest_folder, runner=None):
+    """
+    Export the metadata of one camera file into `dest_folder` with its vendor
+    tool. Returns True when the tool succeeded. With a ToolRunner, the tool can
+    be terminated by runner.cancel(), which raises ExportCancelled here.
+    """
+    run = runner.run if runner is not None else _run_tool
+    base, _ = os.path.splitext(os.path.basename(file_path))
+    raw_output_file = os.path.join(dest_folder, base + "_metadata_export.txt")
+    json_output_file = os.path.join(dest_folder, base + "_metadata_export.json")
+    if camera_type == 'ARRI':
+        command = [tool_paths['ARRI'], "export", file_path, "--output", json_output_file]
+        try:
+            with span("subprocess", "art-cmd", file=file_path):
+                run(command, check=True)
+            print(f"Processed {file_path} -> {json_output_file}")
+            return True
+        except ExportCancelled:
+            raise
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            return False
+    elif camera_type == 'RED':
+        command = [tool_paths['RED'], "--i", file_path, "--printMeta", "1"]
+        with span("subprocess", "REDline", file=file_path):
+            result = run(command)
+        if result.returncode != 0:
+            print(f"REDline error for {file_path}: {result.stderr}")
+        _write_outputs(file_path, result.stdout, raw_output_file, json_output_file)
+        return result.returncode == 0
+    elif camera_type == 'SONY':
+        command = [tool_paths['SONY'], "--metalist", "--input", file_path]
+        try:
+            with span("subprocess", "rawexporter", file=file_path):
+                result = run(command, check=True)
+            _write_outputs(file_path, result.stdout, raw_output_file, json_output_file)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"SONY rawexporter error for {file_path}: {e}")
+            return False
+    return False
+
+
+def _write_outputs(file_path, raw_output, raw_output_file, json_output_file):
+    try:
+        with span("write", "raw", file=raw_output_file), open(raw_output_file, "w") as f:
+            f.write(raw_output)
+        print(f"Wrote raw output for {file_path} -> {raw_output_file}")
+    except Exception as e:
+        print(f"Error writing raw output for {file_path}: {e}")
+    metadata = parse_key_value_output(raw_output)
+    try:
+        with span("write", "json", file=json_output_file), open(json_output_file, "w") as f:
+            json.dump(metadata, f, indent=4)
+        print(f"Wrote JSON output for {file_path} -> {json_output_file}")
+    except Exception as e:
+        print(f"Error writing JSON output for {file_path}: {e}")
+
+
+class ExportBatch:
+    """
+    Export of many camera files with up to `workers` vendor tool processes at
+    a time (default: CPU count). start() returns at once; `on_file` is called
+    from a worker thread with (file_path, status, seconds) for each file, the
+    status being "done", "failed" or "cancelled", and `on_finish` with the
+    batch after the last on_file call has returned. cancel() skips the files not
+    started yet and terminates the running tools.
+    """
+    def __init__(self, file_paths, camera_type, dest_folder, workers=None, on_file=None, on_finish=None):
+        self.file_paths = list(file_paths)
+        self.camera_type = camera_type
+        self.dest_folder = dest_folder
+        self.workers = workers or os.cpu_count() or 1
+        self.on_file = on_file
+        self.on_finish = on_finish
+        self.runner = ToolRunner()
+        self.counts = {"done": 0, "failed": 0, "cancelled": 0}
+        self.started = None
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._reported = 0
+        self._executor = None
+
+    def __len__(self):
+        return len(self.file_paths)
+
+    @property
+    def completed(self):
+        return sum(self.counts.values())
+
+    @property
+    def cancelled(self):
+        return self.runner.cancelled
+
+    def start(self):
+        self.started = time.monotonic()
+        if not self.file_paths:
+            self._finish()
+            return self
+        self._executor = ThreadPoolExecutor(max_workers=min(self.workers, len(self.file_paths)),
+                                            thread_name_prefix="ocf-export")
+        for file_path in self.file_paths:
+            self._executor.submit(self._export, file_path)
+        self._executor.shutdown(wait=False)
+        return self
+
+    def _export(self, file_path):
+        start = time.monotonic()
+        try:
+            if self.runner.cancelled:
+                status = "cancelled"
+            else:
+                status = "done" if export_file(file_path, self.camera_type, self.dest_folder, self.runner) else "failed"
+        except ExportCancelled:
+            status = "cancelled"
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            status = "failed"
+        with self._lock:
+            self.counts[status] += 1
+        if self.on_file:
+            self.on_file(file_path, status, time.monotonic() - start)
+        # The batch finishes once every on_file call has returned, not when the last file is counted.
+        with self._lock:
+            self._reported += 1
+            last = self._reported == len(self.file_paths)
+        if last:
+            self._finish()
+
+    def _finish(self):
+        self._finished.set()
+        if self.on_finish:
+            self.on_finish(self)
+
+    def cancel(self):
+        self.runner.cancel()
+
+    def wait(self, timeout=None):
+        """Block until every file is done (or `timeout` seconds). Returns whether the batch finished."""
+        return self._finished.wait(timeout)
+
+
+def export_folder(source_folder, camera_type, dest_folder, workers=1):
+    """
+    Export every camera file of `source_folder`, `workers` tools at a time.
+    Returns the number of files per status: {"done": ..., "failed": ..., "cancelled": ...}.
+    """
+    batch = ExportBatch(find_camera_files(source_folder, camera_type), camera_type, dest_folder, workers=workers)
+    batch.start()
+    try:
+        batch.wait()
+    except KeyboardInterrupt:
+        batch.cancel()
+        raise
+    return dict(batch.counts)
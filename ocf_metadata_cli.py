@@ -0,0 +1,230 @@
+"""
+`ocf-metadata` command line. Only argparse and json are imported at start-up:
+the extraction modules (and through them OpenImageIO and pyexiftool) are
+imported by the subcommands that need them, so `--version` and a `probe`
+restricted to the native readers start fast, and nothing imports a GUI toolkit.
+"""
+
+import os
+import sys
+import json
+import argparse
+import contextlib
+
+__version__ = "0.1.0"
+
+BACKENDS = ('OIIO', 'ExifTool', 'FFmpeg', 'Native', 'Vendor')
+TIERS = ("quick", "standard", "deep")
+
+
+def _parse_backend_timeouts(values):
+    timeouts = {}
+    for value in values or []:
+        tool, _, seconds = value.partition("=")
+        if tool not in BACKENDS or not seconds:
+            raise argparse.ArgumentTypeError(f"Expected TOOL=SECONDS with TOOL in {', '.join(BACKENDS)}: {value}")
+        timeouts[tool] = float(seconds)
+    return timeouts
+
+
+def probe(args):
+    from get_metadata import MetadataExtractor
+
+    results = {}
+    for file_path in args.files:
+        if os.path.isdir(file_path):
+            results[file_path] = {key: value.to_dict() if hasattr(value, "to_dict") else value
+                                  for key, value in MetadataExtractor.extract_sequences(
+                                      file_path, sample=args.sample, cache=args.cache or None, timeout=args.timeout,
+                                      backend_timeouts=_parse_backend_timeouts(args.backend_timeout), tier=args.tier)}
+            continue
+        extractor = MetadataExtractor(file_path, concurrent=not args.sequential, cache=args.cache or None,
+                                      timeout=args.timeout, tier=args.tier,
+                                      backend_timeouts=_parse_backend_timeouts(args.backend_timeout))
+        if args.keys:
+            results[file_path] = extractor.extract_selected_metadata(args.keys, projection=args.projection)
+        else:
+            metadata = extractor.lazy_metadata()
+            tools = [tool for tool in metadata if not args.backend or tool in args.backend]
+            metadata.resolve(tools, concurrent=not args.sequential)
+            results[file_path] = {tool: metadata[tool] for tool in tools}
+        results[file_path]["Tier"] = args.tier
+    output = results[args.files[0]] if len(args.files) == 1 else results
+    json.dump(output, sys.stdout, indent=None if args.compact else 4, default=str)
+    sys.stdout.write("\n")
+    return 0
+
+
+def scan(args):
+    from metadata_scan import scan as scan_tree
+
+    extensions = {ext.lower() if ext.startswith(".") else "." + ext.lower() for ext in args.ext} if args.ext else None
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        # Only records go to stdout: anything else printed during the scan goes to stderr.
+        with contextlib.redirect_stdout(sys.stderr):
+            count = scan_tree(args.root, out=out, workers=args.workers, ordered=args.ordered, keys=args.keys,
+                              projection=args.projection, flush_every=args.flush_every, extensions=extensions,
+                              include_hidden=args.hidden, sequences=args.sequences, sample=args.sample,
+                              cache=args.cache or None, timeout=args.timeout, tier=args.tier,
+                              backend_timeouts=_parse_backend_timeouts(args.backend_timeout))
+    finally:
+        if args.output:
+            out.close()
+    print(f"Scanned {count} file(s).", file=sys.stderr)
+    return 0
+
+
+def table(args):
+    from itertools import chain
+    from get_metadata import MetadataExtractor
+    from metadata_columns import MetadataTable
+    from metadata_record import MetadataRecord
+    from metadata_scan import iter_files
+    from vendor_metadata import EXPORT_SUFFIX, load_vendor_record
+
+    extensions = {ext.lower() if ext.startswith(".") else "." + ext.lower() for ext in args.ext} if args.ext else None
+    media, exports = [], []
+    for source in args.sources:
+        for file_path in iter_files(source):
+            if file_path.endswith(EXPORT_SUFFIX):
+                exports.append(file_path)
+            elif extensions is None or os.path.splitext(file_path)[1].lower() in extensions:
+                media.append(file_path)
+    extracted = (record for _, record in MetadataExtractor.extract_many(media, workers=args.workers, ordered=False,
+                                                                        records=True, cache=args.cache or None,
+                                                                        tier=args.tier)
+                 if isinstance(record, MetadataRecord))
+    vendor = (load_vendor_record(json_path, args.camera) for json_path in exports)
+    result = MetadataTable.from_records(chain(extracted, vendor))
+    path = result.save(args.output, compress=args.compress)
+    print(f"Wrote {len(result)} row(s) to {path}.", file=sys.stderr)
+    return 0
+
+
+def verify(args):
+    from sequence_check import verify_folder
+
+    results = {}
+    for folder in args.folders:
+        results.update(verify_folder(folder, workers=args.workers, rate=args.rate))
+    json.dump(results, sys.stdout, indent=None if args.compact else 4)
+    sys.stdout.write("\n")
+    inconsistent = [pattern for pattern, report in results.items() if not report["consistent"]]
+    print(f"Checked {len(results)} sequence(s), {len(inconsistent)} with issues.", file=sys.stderr)
+    return 1 if inconsistent else 0
+
+
+def export(args):
+    from ocf_export import export_folder
+
+    counts = export_folder(args.source, args.camera, args.dest, workers=args.workers)
+    print(f"Exported {counts['done']} file(s), {counts['failed']} failed, {counts['cancelled']} cancelled.")
+    return 1 if counts["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ocf-metadata", description="Read metadata from original camera files.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("--stats", action="store_true", help="Print timings, bytes read and cache hits to stderr.")
+    parser.add_argument("--trace", metavar="FILE", help="Write a JSON trace (chrome://tracing, Perfetto) of the run.")
+    parser.add_argument("--metrics", metavar="FILE", help="Write the run's metrics in the Prometheus text format.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    probe_parser = subparsers.add_parser("probe", help="Print the metadata of files as JSON.")
+    probe_parser.add_argument("files", nargs="+",
+                              help="Files, or folders of frames (image sequences are probed once, see --sample).")
+    probe_parser.add_argument("-k", "--keys", nargs="+", help="Only the matching keys (see key_selectors.py).")
+    probe_parser.add_argument("--projection", action="store_true",
+                              help="Push --keys down into the ExifTool and ffprobe command lines.")
+    probe_parser.add_argument("-b", "--backend", action="append", choices=BACKENDS,
+                              help="Only run this backend (repeatable).")
+    probe_parser.add_argument("--timeout", type=float, help="Time budget of each file, in seconds.")
+    probe_parser.add_argument("--backend-timeout", action="append", metavar="TOOL=SECONDS",
+                              help="Time budget of each call of a backend (repeatable).")
+    probe_parser.add_argument("--cache", action="store_true", help="Use the shared metadata cache.")
+    probe_parser.add_argument("--sequential", action="store_true", help="Run the backends one after the other.")
+    probe_parser.add_argument("--compact", action="store_true", help="Print the JSON on one line.")
+    probe_parser.add_argument("--sample", type=int, default=0, metavar="N",
+                              help="Frames probed per image sequence besides the first.")
+    probe_parser.add_argument("--tier", choices=TIERS, default="standard",
+                              help="Extraction depth: quick (headers, ExifTool -fast2), standard, or deep "
+                                   "(maker notes, full ffprobe, vendor tools).")
+    probe_parser.set_defaults(handler=probe)
+
+    scan_parser = subparsers.add_parser("scan", help="Walk a tree and write one JSON line per file (NDJSON).")
+    scan_parser.add_argument("root")
+    scan_parser.add_argument("-o", "--output", help="NDJSON file to write (default: stdout).")
+    scan_parser.add_argument("-k", "--keys", nargs="+", help="Only the matching keys (see key_selectors.py).")
+    scan_parser.add_argument("--projection", action="store_true",
+                             help="Push --keys down into the ExifTool and ffprobe command lines.")
+    scan_parser.add_argument("-e", "--ext", action="append", help="Only files with this extension (repeatable).")
+    scan_parser.add_argument("-j", "--workers", type=int, help="Files extracted in parallel (default: CPU count).")
+    scan_parser.add_argument("--ordered", action="store_true", help="Write the records in walk order.")
+    scan_parser.add_argument("--flush-every", type=int, default=1, metavar="N", help="Flush every N records.")
+    scan_parser.add_argument("--hidden", action="store_true", help="Include hidden files and directories.")
+    scan_parser.add_argument("--timeout", type=float, help="Time budget of each file, in seconds.")
+    scan_parser.add_argument("--backend-timeout", action="append", metavar="TOOL=SECONDS",
+                             help="Time budget of each call of a backend (repeatable).")
+    scan_parser.add_argument("--cache", action="store_true", help="Use the shared metadata cache.")
+    scan_parser.add_argument("--sequences", action="store_true",
+                             help="One record per image sequence: probe the first frame, stat the others.")
+    scan_parser.add_argument("--sample", type=int, default=0, metavar="N",
+                             help="Frames probed per image sequence besides the first (with --sequences).")
+    scan_parser.add_argument("--tier", choices=TIERS, default="standard",
+                             help="Extraction depth: quick for triage, standard, or deep.")
+    scan_parser.set_defaults(handler=scan)
+
+    table_parser = subparsers.add_parser("table", help="Build a columnar table (NumPy) of files and vendor exports.")
+    table_parser.add_argument("sources", nargs="+",
+                              help="Files or folders; *_metadata_export.json files are read as vendor exports.")
+    table_parser.add_argument("-o", "--output", required=True, help="Table directory (or .npz with --compress).")
+    table_parser.add_argument("--compress", action="store_true", help="Write one compressed .npz (not memory-mappable).")
+    table_parser.add_argument("-e", "--ext", action="append", help="Only media files with this extension (repeatable).")
+    table_parser.add_argument("-j", "--workers", type=int, help="Files extracted in parallel (default: CPU count).")
+    table_parser.add_argument("--camera", choices=("ARRI", "RED", "SONY"), help="Camera of key/value vendor exports.")
+    table_parser.add_argument("--cache", action="store_true", help="Use the shared metadata cache.")
+    table_parser.add_argument("--tier", choices=TIERS, default="standard",
+                              help="Extraction depth of the media files (recorded in the tier column).")
+    table_parser.set_defaults(handler=table)
+
+    verify_parser = subparsers.add_parser("verify", help="Check the frame headers and timecodes of image sequences.")
+    verify_parser.add_argument("folders", nargs="+", help="Folders of EXR or DPX frames.")
+    verify_parser.add_argument("-j", "--workers", type=int, help="Processes reading headers (default: CPU count).")
+    verify_parser.add_argument("--rate", type=float, help="Timecode rate (default: the frame rate of the headers, or 24).")
+    verify_parser.add_argument("--compact", action="store_true", help="Print the JSON on one line.")
+    verify_parser.set_defaults(handler=verify)
+
+    export_parser = subparsers.add_parser("export", help="Export camera metadata with the vendor tools.")
+    export_parser.add_argument("source")
+    export_parser.add_argument("dest")
+    export_parser.add_argument("--camera", required=True, choices=("ARRI", "RED", "SONY"))
+    export_parser.add_argument("-j", "--workers", type=int, default=1, help="Vendor tool processes run in parallel.")
+    export_parser.set_defaults(handler=export)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    instrumented = args.stats or args.trace or args.metrics
+    if instrumented:
+        from instrumentation import enable_instrumentation
+        stats = enable_instrumentation()
+    try:
+        return args.handler(args)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    finally:
+        if instrumented:
+            if args.trace:
+                stats.write_trace(args.trace)
+            if args.metrics:
+                with open(args.metrics, "w") as f:
+                    f.write(stats.to_prometheus())
+            if args.stats:
+                print(stats.describe(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
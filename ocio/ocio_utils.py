@@ -1,12 +1,21 @@
-import OpenImageIO as oiio
 import os
+from functools import lru_cache
 
-# Load OCIO configuration
-ocio_config = oiio.ColorConfig()
 
-# Get available color spaces
-available_colorspaces = ocio_config.getColorSpaceNames()
+@lru_cache(maxsize=None)
+def get_ocio_config():
+    """OCIO configuration (from $OCIO or OIIO's built-in one), loaded on first use."""
+    import OpenImageIO as oiio
+    return oiio.ColorConfig()
 
-os.system('cls' if os.name == 'nt' else 'clear')
-print("Available OCIO color spaces:", available_colorspaces)
 
+def get_available_colorspaces():
+    """Names of the color spaces of the OCIO configuration."""
+    return get_ocio_config().getColorSpaceNames()
+
+
+if __name__ == "__main__":
+    available_colorspaces = get_available_colorspaces()
+
+    os.system('cls' if os.name == 'nt' else 'clear')
+    print("Available OCIO color spaces:", available_colorspaces)
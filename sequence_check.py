@@ -0,0 +1,225 @@
+"""
+Header homogeneity and continuity checks of image sequences (EXR and DPX).
+
+The header of every frame is read (natively, no pixel data) on a process pool
+and the attributes that must not change within a shot (data and display
+window, compression, channel list, frame rate) are loaded into NumPy arrays,
+one row per frame. Frames differing from the sequence's most common value are
+reported as outliers, and the frame numbers and timecodes are checked for
+discontinuities with vectorized comparisons. NumPy is imported on first use
+(pip install ocf-metadata[sequences]).
+"""
+
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from exr_reader import read_exr_header
+from dpx_reader import HEADER_SIZE, UNDEFINED_U32, decode_header, detect_format, timecode_to_frames
+from sequences import find_sequences
+from timecode import decode_bcd_timecode
+from instrumentation import open_binary, span
+
+# Frames read per worker task; small sequences are read in-process.
+CHUNK_SIZE = 64
+MIN_PARALLEL_FRAMES = 256
+CHECKED_ATTRIBUTES = ("data_window", "display_window", "compression", "channels", "fps")
+DPX_TIMECODE_OFFSET = 1920
+
+
+def _exr_frame(file_path):
+    header = read_exr_header(file_path)
+    if not header or not header["parts"]:
+        return None
+    part = header["parts"][0]
+    channels = part.get("channels") or {}
+    fps = part.get("framesPerSecond")
+    return (
+        tuple(part.get("dataWindow") or (0, 0, -1, -1)),
+        tuple(part.get("displayWindow") or (0, 0, -1, -1)),
+        str(part.get("compression")),
+        # Multi-part files add their part count, so a frame losing a part is an outlier too.
+        ",".join(f"{name}:{channel['type']}" for name, channel in sorted(channels.items()))
+        + (f" ({len(header['parts'])} parts)" if len(header["parts"]) > 1 else ""),
+        (part.get("timeCode") or {}).get("timeAndFlags", UNDEFINED_U32),
+        fps[0] / fps[1] if fps and fps[1] else float("nan"),
+    )
+
+
+def _dpx_frame(file_path):
+    with open_binary(file_path) as f:
+        head = f.read(HEADER_SIZE)
+    metadata = decode_header(head)
+    if metadata is None:
+        return None
+    width, height = metadata.get("ImageWidth", 0), metadata.get("ImageHeight", 0)
+    x, y = metadata.get("XOffset", 0), metadata.get("YOffset", 0)
+    time_and_flags = UNDEFINED_U32
+    if metadata["Format"] == "DPX":
+        time_and_flags = struct.unpack_from(detect_format(head)[1] + "I", head, DPX_TIMECODE_OFFSET)[0]
+    return (
+        (x, y, x + width - 1, y + height - 1),
+        (0, 0, metadata.get("XOriginalSize", width) - 1, metadata.get("YOriginalSize", height) - 1),
+        f"packing {metadata.get('Packing')}, encoding {metadata.get('Encoding')}",
+        f"{metadata.get('DescriptorName', metadata.get('Descriptor'))} {metadata.get('BitDepth')}-bit",
+        time_and_flags,
+        metadata.get("TVFrameRate") or metadata.get("FilmFrameRate") or float("nan"),
+    )
+
+
+FRAME_READERS = {".exr": _exr_frame, ".sxr": _exr_frame, ".dpx": _dpx_frame, ".cin": _dpx_frame}
+
+
+def _read_frames(file_paths):
+    """Header rows of a chunk of frames (worker task); None for a frame that cannot be read."""
+    rows = []
+    for file_path in file_paths:
+        try:
+            rows.append(FRAME_READERS[os.path.splitext(file_path)[1].lower()](file_path))
+        except (OSError, ValueError, struct.error):
+            rows.append(None)
+    return rows
+
+
+def read_frame_headers(file_paths, workers=None):
+    """
+    Header rows (see _exr_frame) of every frame, in order, read on a process
+    pool of `workers` processes (default: CPU count) in chunks of CHUNK_SIZE.
+    """
+    file_paths = list(file_paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(file_paths) < MIN_PARALLEL_FRAMES:
+        return _read_frames(file_paths)
+    chunks = [file_paths[start:start + CHUNK_SIZE] for start in range(0, len(file_paths), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        return [row for rows in executor.map(_read_frames, chunks) for row in rows]
+
+
+def header_arrays(frames, rows):
+    """
+    NumPy arrays of the readable frames: frame numbers, windows as (n, 4)
+    int64, string attributes as int32 codes into `categories`, timecodes as
+    packed uint32 and frame rates as float64.
+    """
+    import numpy as np
+    readable = [(frame, row) for frame, row in zip(frames, rows) if row is not None]
+    categories = {"compression": [], "channels": []}
+    codes = {name: {} for name in categories}
+    arrays = {
+        "frame": np.array([frame for frame, _ in readable], dtype=np.int64),
+        "data_window": np.array([row[0] for _, row in readable], dtype=np.int64).reshape(-1, 4),
+        "display_window": np.array([row[1] for _, row in readable], dtype=np.int64).reshape(-1, 4),
+        "timecode": np.array([row[4] for _, row in readable], dtype=np.uint32),
+        "fps": np.array([row[5] for _, row in readable], dtype=np.float64),
+    }
+    for index, name in ((2, "compression"), (3, "channels")):
+        arrays[name] = np.array([codes[name].setdefault(row[index], len(codes[name])) for _, row in readable],
+                                dtype=np.int32)
+        categories[name] = list(codes[name])
+    return arrays, categories
+
+
+def _json_value(value):
+    return value.tolist() if hasattr(value, "tolist") else value
+
+
+def find_outliers(arrays, categories, attributes=CHECKED_ATTRIBUTES):
+    """
+    {attribute: (reference, outlier mask)}: the most common value of each
+    attribute over the frames, and the frames that differ from it. NaN frame
+    rates (not stored) are neither a reference nor outliers.
+    """
+    import numpy as np
+    results = {}
+    for name in attributes:
+        column = arrays[name]
+        if not len(column):
+            continue
+        if column.ndim == 2:
+            values, inverse, counts = np.unique(column, axis=0, return_inverse=True, return_counts=True)
+            reference = values[counts.argmax()]
+            mask = inverse.reshape(-1) != counts.argmax()
+        elif column.dtype.kind == "f":
+            present = ~np.isnan(column)
+            if not present.any():
+                continue
+            values, counts = np.unique(column[present], return_counts=True)
+            reference = values[counts.argmax()]
+            mask = present & (column != reference)
+        else:
+            values, counts = np.unique(column, return_counts=True)
+            reference = values[counts.argmax()]
+            mask = column != reference
+        if name in categories:
+            reference = categories[name][reference]
+        results[name] = (_json_value(reference), mask)
+    return results
+
+
+def timecode_breaks(arrays, rate):
+    """
+    Indices (into the arrays) of the frames whose timecode does not advance by
+    the frame number step from the previous frame, and of the frames without
+    a timecode. A gap in the frame numbers is not a timecode break when the
+    timecode skips by as many frames.
+    """
+    import numpy as np
+    timecodes = timecode_to_frames(arrays["timecode"], rate)
+    defined = timecodes >= 0
+    steps = np.diff(arrays["frame"])
+    breaks = np.flatnonzero((np.diff(timecodes) != steps) & defined[1:] & defined[:-1]) + 1
+    return breaks, np.flatnonzero(~defined)
+
+
+def verify_sequence(sequence, workers=None, rate=None):
+    """
+    Header homogeneity and continuity report of an ImageSequence (see
+    sequences.py). `rate` is the timecode rate; by default the most common
+    frame rate of the headers, or 24.
+    """
+    frames = sequence.frame_numbers
+    with span("sequence", "read_headers", pattern=sequence.pattern, frames=len(frames)):
+        rows = read_frame_headers([sequence.path(frame) for frame in frames], workers=workers)
+    arrays, categories = header_arrays(frames, rows)
+    outliers = find_outliers(arrays, categories)
+    frame_numbers = arrays["frame"]
+
+    report = {
+        "pattern": sequence.pattern,
+        "frame_range": [sequence.first, sequence.last],
+        "frame_count": len(frames),
+        "frames_checked": len(frame_numbers),
+        "unreadable_frames": [frame for frame, row in zip(frames, rows) if row is None],
+        "gaps": sequence.gaps(),
+        "reference": {name: reference for name, (reference, _) in outliers.items()},
+        "outliers": {},
+    }
+    for name, (_, mask) in outliers.items():
+        if mask.any():
+            column = arrays[name][mask]
+            if name in categories:
+                column = [categories[name][code] for code in column.tolist()]
+            report["outliers"][name] = [[frame, value] for frame, value in zip(frame_numbers[mask].tolist(),
+                                                                              _json_value(column))]
+
+    if rate is None:
+        rate = report["reference"].get("fps") or 24.0
+    breaks, missing = timecode_breaks(arrays, rate)
+    timecodes = arrays["timecode"].tolist()
+    report["timecode_rate"] = rate
+    report["has_timecode"] = len(missing) < len(frame_numbers)
+    # Only frames missing a timecode the others have are reported.
+    report["timecode_missing"] = frame_numbers[missing].tolist() if report["has_timecode"] else []
+    report["timecode_breaks"] = [
+        [int(frame_numbers[index]), decode_bcd_timecode(timecodes[index - 1]), decode_bcd_timecode(timecodes[index])]
+        for index in breaks.tolist()
+    ]
+    report["consistent"] = not (report["unreadable_frames"] or report["gaps"] or report["outliers"]
+                                or report["timecode_missing"] or report["timecode_breaks"])
+    return report
+
+
+def verify_folder(folder, workers=None, rate=None, min_frames=2):
+    """verify_sequence() of every EXR and DPX sequence directly in `folder`, as {pattern: report}."""
+    sequences, _ = find_sequences(folder, min_frames=min_frames, extensions=frozenset(FRAME_READERS))
+    return {sequence.pattern: verify_sequence(sequence, workers=workers, rate=rate) for sequence in sequences}
@@ -0,0 +1,185 @@
+"""
+Image sequence detection and sequence-aware extraction: frames are grouped by
+pattern (head + frame number + extension), only the first frame (plus an
+optional sample) goes through the backends, and the other frames are just
+stat'ed, so a 2,000-frame plate is described by one probe and 2,000 stat calls.
+"""
+
+import os
+import re
+
+from get_metadata import DEFAULT_TIER, MetadataExtractor
+
+# Extensions of single-frame image formats; numbered movie files are not sequences.
+SEQUENCE_EXTENSIONS = frozenset([".exr", ".sxr", ".dpx", ".cin", ".tif", ".tiff", ".png", ".jpg", ".jpeg", ".hdr",
+                                 ".tga", ".ari", ".dng", ".bmp", ".psd", ".jp2", ".j2c", ".heic", ".heif"])
+# The frame number is the last group of digits before the extension.
+FRAME_RE = re.compile(r"^(?P<head>.*?)(?P<frame>\d+)(?P<tail>\.[^.]+)$")
+
+
+class ImageSequence:
+    """Frames `directory`/`head` + frame number + `tail`, as {frame: file name}."""
+    def __init__(self, directory, head, tail, frames):
+        self.directory = directory
+        self.head = head
+        self.tail = tail
+        self.frames = frames
+        self.frame_numbers = sorted(frames)
+        self.padding, self.padding_consistent = self._padding()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __repr__(self):
+        return f"ImageSequence({self.pattern!r}, {self.first}-{self.last}, {len(self)} frames)"
+
+    @property
+    def first(self):
+        return self.frame_numbers[0]
+
+    @property
+    def last(self):
+        return self.frame_numbers[-1]
+
+    def _padding(self):
+        """
+        (digits of the zero-padded frame numbers or 1 when unpadded, consistency):
+        the padding is inconsistent when padded and shorter numbers are mixed
+        (e.g. 99 next to 0100) or several paddings are used.
+        """
+        digits = [name[len(self.head):len(name) - len(self.tail)] for name in self.frames.values()]
+        widths = {len(d) for d in digits}
+        padded_widths = {len(d) for d in digits if d.startswith("0") and len(d) > 1}
+        if not padded_widths:
+            # 1001-1100 is read as %04d, 1-250 (several widths, no leading zero) as %d.
+            return (widths.pop() if len(widths) == 1 else 1), True
+        padding = min(padded_widths)
+        return padding, len(padded_widths) == 1 and min(widths) >= padding
+
+    @property
+    def pattern(self):
+        """printf-style path of the frames, e.g. /plates/A001.%04d.exr."""
+        frame = f"%0{self.padding}d" if self.padding > 1 else "%d"
+        return os.path.join(self.directory, f"{self.head}{frame}{self.tail}")
+
+    def path(self, frame):
+        return os.path.join(self.directory, self.frames[frame])
+
+    def paths(self):
+        return [self.path(frame) for frame in self.frame_numbers]
+
+    def gaps(self):
+        """Missing frame ranges between first and last, as [start, end] pairs (inclusive)."""
+        gaps = []
+        for previous, current in zip(self.frame_numbers, self.frame_numbers[1:]):
+            if current - previous > 1:
+                gaps.append([previous + 1, current - 1])
+        return gaps
+
+
+def group_sequences(file_paths, min_frames=2, extensions=SEQUENCE_EXTENSIONS):
+    """
+    Split `file_paths` into image sequences and other files. Returns
+    (sequences, files); groups shorter than `min_frames` are returned as files.
+    """
+    groups = {}
+    files = []
+    for file_path in file_paths:
+        directory, name = os.path.split(file_path)
+        match = FRAME_RE.match(name)
+        if match is None or os.path.splitext(name)[1].lower() not in extensions:
+            files.append(file_path)
+            continue
+        key = (directory, match.group("head"), match.group("tail"))
+        frames = groups.setdefault(key, {})
+        frame = int(match.group("frame"))
+        if frame in frames:
+            # Same number with another padding (shot.1.exr and shot.0001.exr): not the same sequence.
+            files.append(file_path)
+            continue
+        frames[frame] = name
+    sequences = []
+    for (directory, head, tail), frames in groups.items():
+        if len(frames) >= min_frames:
+            sequences.append(ImageSequence(directory, head, tail, frames))
+        else:
+            files.extend(os.path.join(directory, name) for name in frames.values())
+    sequences.sort(key=lambda sequence: sequence.pattern)
+    return sequences, sorted(files)
+
+
+def find_sequences(folder, min_frames=2, extensions=SEQUENCE_EXTENSIONS):
+    """group_sequences() of the files directly in `folder`."""
+    with os.scandir(folder) as it:
+        file_paths = [entry.path for entry in it if entry.is_file() and not entry.name.startswith(".")]
+    return group_sequences(file_paths, min_frames=min_frames, extensions=extensions)
+
+
+def sample_frames(sequence, sample):
+    """Frames probed besides the first: `sample` evenly spaced frames (the last included), or a list of frames."""
+    if isinstance(sample, (list, tuple, set)):
+        return [frame for frame in sample if frame in sequence.frames and frame != sequence.first]
+    others = sequence.frame_numbers[1:]
+    if not sample or not others:
+        return []
+    count = min(sample, len(others))
+    step = len(others) / count
+    return sorted({others[min(len(others) - 1, int(round((index + 1) * step)) - 1)] for index in range(count)})
+
+
+def extract_sequence_metadata(sequence, sample=0, workers=None, **extractor_kwargs):
+    """
+    Report of an ImageSequence: full metadata of the first frame (and of the
+    `sample` frames, see sample_frames), and for every frame only its stat data
+    as [frame, size, mtime] rows, with the frame range, gaps and padding.
+    """
+    probed = [sequence.first] + sample_frames(sequence, sample)
+    results = {file_path: metadata.to_dict() if hasattr(metadata, "to_dict") else metadata
+               for file_path, metadata in MetadataExtractor.extract_many(
+                   [sequence.path(frame) for frame in probed], workers=workers, **extractor_kwargs)}
+    frames = []
+    empty = []
+    missing_files = []
+    total_bytes = 0
+    for frame in sequence.frame_numbers:
+        try:
+            st = os.stat(sequence.path(frame))
+        except OSError:
+            missing_files.append(frame)
+            continue
+        frames.append([frame, st.st_size, st.st_mtime])
+        total_bytes += st.st_size
+        if st.st_size == 0:
+            empty.append(frame)
+    gaps = sequence.gaps()
+    report = {
+        "pattern": sequence.pattern,
+        "directory": sequence.directory,
+        "frame_range": [sequence.first, sequence.last],
+        "frame_count": len(sequence),
+        "missing_count": sum(end - start + 1 for start, end in gaps),
+        "gaps": gaps,
+        "padding": sequence.padding,
+        "padding_consistent": sequence.padding_consistent,
+        "tier": extractor_kwargs.get("tier", DEFAULT_TIER),
+        "total_bytes": total_bytes,
+        "empty_frames": empty,
+        "metadata": results[sequence.path(sequence.first)],
+        "samples": {frame: results[sequence.path(frame)] for frame in probed[1:]},
+        "frames": frames,
+    }
+    if missing_files:
+        report["unreadable_frames"] = missing_files
+    return report
+
+
+def extract_folder(folder, sample=0, min_frames=2, workers=None, **extractor_kwargs):
+    """
+    Yield (key, result) for the files directly in `folder`: (pattern, report of
+    extract_sequence_metadata) per image sequence, then (path, metadata) for
+    each other file.
+    """
+    sequences, files = find_sequences(folder, min_frames=min_frames)
+    for sequence in sequences:
+        yield sequence.pattern, extract_sequence_metadata(sequence, sample=sample, workers=workers, **extractor_kwargs)
+    yield from MetadataExtractor.extract_many(files, workers=workers, **extractor_kwargs)
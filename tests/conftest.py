@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Format registry and metadata caches of the tests go to a scratch directory.
+os.environ["OCF_METADATA_CACHE_DIR"] = tempfile.mkdtemp(prefix="ocf_metadata_tests_")
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "source_images",
+                       "image_formats_samples")
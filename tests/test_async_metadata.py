@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+import asyncio
+
+import pytest
+
+import ocf_export
+from conftest import SAMPLES
+from async_metadata import AsyncExifToolPool, AsyncMetadataExtractor
+
+MXF = os.path.join(SAMPLES, "sample_640x360.mxf")
+
+# Minimal `exiftool -stay_open` stand-in: logs its pid, answers each -executeN with
+# the SourceFile, and hangs on files whose name contains "hang".
+FAKE_EXIFTOOL = """#!{python}
+import os, sys, json, time
+with open({log!r}, "a") as log:
+    log.write(f"{{os.getpid()}}\\n")
+args = []
+for line in sys.stdin:
+    line = line.rstrip("\\n")
+    if line == "False":
+        break
+    if line.startswith("-execute"):
+        if "hang" in args[-1]:
+            time.sleep(30)
+        print(json.dumps([{{"SourceFile": args[-1]}}]))
+        print("{{ready" + line[8:] + "}}", flush=True)
+        args = []
+    elif line != "-stay_open":
+        args.append(line)
+"""
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a shell script as the vendor tool")
+def test_vendor_tool_is_killed_on_timeout(monkeypatch, tmp_path):
+    pid_file = tmp_path / "pid"
+    tool = tmp_path / "REDline"
+    tool.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 30\n")
+    tool.chmod(0o755)
+    monkeypatch.setitem(ocf_export.tool_paths, 'RED', str(tool))
+    monkeypatch.setattr(ocf_export, "detect_camera_type", lambda file_path: 'RED')
+
+    async def extract():
+        async with AsyncMetadataExtractor(tier="deep", backend_timeouts={'Vendor': 0.5}) as extractor:
+            return await extractor.extract_metadata(MXF, tools=['Vendor'])
+
+    metadata = asyncio.run(extract())
+    assert metadata["Vendor"] == {"timed_out": True}
+    pid = int(pid_file.read_text())
+    deadline = time.monotonic() + ocf_export.CANCEL_GRACE + 1
+    while _process_exists(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _process_exists(pid)
+
+
+@pytest.fixture
+def fake_exiftool(monkeypatch, tmp_path):
+    """Path of the log of the pids of the fake exiftool sessions started."""
+    log = tmp_path / "sessions.log"
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tool = bin_dir / "exiftool"
+    tool.write_text(FAKE_EXIFTOOL.format(python=sys.executable, log=str(log)))
+    tool.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+    return log
+
+
+def _sessions(log):
+    return log.read_text().split() if log.exists() else []
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a script as the exiftool binary")
+def test_exiftool_pool_reuses_at_most_size_sessions(fake_exiftool):
+    async def run():
+        pool = AsyncExifToolPool(2)
+        try:
+            first = await asyncio.gather(*(pool.execute_json(f"/clips/{index}.mov") for index in range(8)))
+            second = await asyncio.gather(*(pool.execute_json(f"/clips/{index}.mxf") for index in range(4)))
+        finally:
+            await pool.close()
+        return first + second, pool
+
+    results, pool = asyncio.run(run())
+    assert [result[0]["SourceFile"] for result in results[:8]] == [f"/clips/{index}.mov" for index in range(8)]
+    assert [result[0]["SourceFile"] for result in results[8:]] == [f"/clips/{index}.mxf" for index in range(4)]
+    assert len(_sessions(fake_exiftool)) == 2
+    assert pool._count == 0 and pool._idle == []
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a script as the exiftool binary")
+def test_exiftool_pool_kills_cancelled_sessions(fake_exiftool):
+    async def run():
+        pool = AsyncExifToolPool(1)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(pool.execute_json("/clips/hang.mov"), 0.5)
+            # The single slot is free again, for a new session.
+            return await asyncio.wait_for(pool.execute_json("/clips/next.mov"), 10)
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == [{"SourceFile": "/clips/next.mov"}]
+    hung, replacement = (int(pid) for pid in _sessions(fake_exiftool))
+    deadline = time.monotonic() + 5
+    while _process_exists(hung) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _process_exists(hung) and hung != replacement
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from conftest import SAMPLES
+from deadlines import Deadline, call_with_timeout, is_timed_out, salvage_json, timed_out_result
+from get_metadata import MetadataExtractor
+
+TRUNCATED_FFPROBE = ('{"streams": [{"codec_name": "h264", "width": 640, "tags": {"title": "a } in ] text"}}, '
+                     '{"codec_name": "aac", "sample')
+
+
+def test_salvage_json():
+    assert salvage_json(TRUNCATED_FFPROBE) == {
+        "streams": [{"codec_name": "h264", "width": 640, "tags": {"title": "a } in ] text"}}]}
+    assert salvage_json(TRUNCATED_FFPROBE.encode("utf-8"))["streams"][0]["width"] == 640
+    assert salvage_json('{"format": {"duration": "1.0"}}') == {"format": {"duration": "1.0"}}
+    assert salvage_json('{"streams": [{"codec_na') == {}
+    assert salvage_json('[{"SourceFile": "a.mov"}, {"Sou') == {}
+    assert salvage_json("") == {}
+
+
+def test_timed_out_result():
+    assert timed_out_result({"streams": []}) == {"streams": [], "timed_out": True}
+    assert is_timed_out(timed_out_result("no dict"))
+    assert not is_timed_out({"streams": []})
+
+
+def test_deadline_remaining():
+    deadline = Deadline(timeout=10, backend_timeouts={'FFmpeg': 2})
+    assert deadline.remaining('FFmpeg') == 2
+    assert 9 < deadline.remaining('OIIO') <= 10
+    assert Deadline().remaining('FFmpeg') is None
+    assert Deadline(timeout=0).remaining() == 0.0
+
+
+def test_call_with_timeout():
+    assert call_with_timeout(threading.get_ident, None) == threading.get_ident()
+    assert call_with_timeout(lambda: 42, 5) == 42
+    release = threading.Event()
+    started = time.monotonic()
+    with pytest.raises(FutureTimeoutError):
+        call_with_timeout(lambda: release.wait(10), 0.2)
+    assert time.monotonic() - started < 5
+    release.set()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a script as the ffprobe binary")
+def test_ffprobe_timeout_keeps_partial_output(monkeypatch, tmp_path):
+    tool = tmp_path / "ffprobe"
+    tool.write_text(f"#!{sys.executable}\nimport sys, time\n"
+                    f"sys.stdout.write({TRUNCATED_FFPROBE!r})\nsys.stdout.flush()\ntime.sleep(30)\n")
+    tool.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setattr(MetadataExtractor, "supports", lambda self, tool: True)
+
+    extractor = MetadataExtractor(os.path.join(SAMPLES, "sample_640x360.mov"), backend_timeouts={'FFmpeg': 1})
+    started = time.monotonic()
+    metadata = extractor.extract_ffmpeg_metadata()
+    assert time.monotonic() - started < 10
+    assert metadata["timed_out"] is True
+    assert metadata["streams"][0]["codec_name"] == "h264"
@@ -0,0 +1,60 @@
+import sys
+import types
+
+import format_registry
+from format_registry import FormatRegistry, discover_exiftool_formats
+
+
+class MissingBinaryExifTool:
+    def __enter__(self):
+        raise FileNotFoundError(2, "No such file or directory", "exiftool")
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def test_exiftool_discovery_without_binary(monkeypatch):
+    monkeypatch.setitem(sys.modules, "exiftool", types.SimpleNamespace(ExifTool=MissingBinaryExifTool))
+    assert discover_exiftool_formats() == []
+
+
+def test_missing_tools_are_cached_as_unavailable(monkeypatch, tmp_path):
+    calls = []
+
+    def discover():
+        calls.append(1)
+        return []
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setattr(FormatRegistry, "TOOLS", {"ffmpeg": discover})
+    monkeypatch.setenv("PATH", str(bin_dir))
+    cache_path = str(tmp_path / "format_registry.json")
+
+    registry = FormatRegistry(cache_path)
+    assert registry.formats["ffmpeg"] == frozenset()
+    assert registry.tool_versions["ffmpeg"]["version"] == ""
+    FormatRegistry(cache_path)
+    assert len(calls) == 1
+
+    # A new binary on the search path invalidates the entry.
+    (bin_dir / "ffmpeg").write_text("#!/bin/sh\n")
+    (bin_dir / "ffmpeg").chmod(0o755)
+    FormatRegistry(cache_path)
+    assert len(calls) == 2
+
+
+def test_formats_are_cached_by_version(monkeypatch, tmp_path):
+    calls = []
+
+    def discover():
+        calls.append(1)
+        return ["mov", "mxf"]
+
+    monkeypatch.setattr(FormatRegistry, "TOOLS", {"ffmpeg": discover})
+    monkeypatch.setattr(format_registry, "_run_version_command", lambda command: "ffmpeg version 6.1")
+    cache_path = str(tmp_path / "format_registry.json")
+
+    assert FormatRegistry(cache_path).supports("ffmpeg", "MXF")
+    assert FormatRegistry(cache_path).formats_list["ffmpeg"] == ["mov", "mxf"]
+    assert len(calls) == 1
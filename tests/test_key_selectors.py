@@ -0,0 +1,52 @@
+import os
+
+from conftest import SAMPLES
+from key_selectors import compile_selector, plan_backends
+from mov_reader import read_mov_metadata
+
+EXIFTOOL = {"QuickTime:ImageWidth": 640, "QuickTime:ImageHeight": 360, "QuickTime:CreateDate": "2018:01:01",
+            "QuickTime:ModifyDate": "2018:01:02", "File:FileSize": 1024}
+FFPROBE = {"streams": [{"index": 0, "codec_name": "h264", "width": 640},
+                       {"index": 1, "codec_name": "aac", "sample_rate": "48000"}],
+           "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "13.347"}}
+
+
+def test_matcher_kinds():
+    kinds = {key: compile_selector([key]).matchers[0].kind
+             for key in ("Image Width", "=ImageWidth", "*Width*", "re:Date$", "streams.0.codec_name")}
+    assert kinds == {"Image Width": "substring", "=ImageWidth": "exact", "*Width*": "glob", "re:Date$": "regex",
+                     "streams.0.codec_name": "path"}
+
+    def select(key, data=EXIFTOOL, tool='ExifTool'):
+        return compile_selector([key]).select_section(data, tool)
+
+    assert select("image width") == {"QuickTime:ImageWidth": 640}
+    assert select("=ImageWidth") == {}  # Exact keys include the group.
+    assert select("=QuickTime:Image Width") == {"QuickTime:ImageWidth": 640}
+    assert select("*image*") == {"QuickTime:ImageWidth": 640, "QuickTime:ImageHeight": 360}
+    assert select("re:^QuickTime:.*Date$") == {"QuickTime:CreateDate": "2018:01:01",
+                                               "QuickTime:ModifyDate": "2018:01:02"}
+    assert select("streams.*.codec_name", FFPROBE, 'FFmpeg') == {"streams.0.codec_name": "h264",
+                                                                 "streams.1.codec_name": "aac"}
+    assert select("streams.-1.sample_rate", FFPROBE, 'FFmpeg') == {"streams.1.sample_rate": "48000"}
+    # ffprobe fields are also found by name in the streams and format.
+    assert select("duration", FFPROBE, 'FFmpeg') == {"duration": "13.347"}
+
+
+def test_backend_planning():
+    assert plan_backends(["codec_name"]) == {'FFmpeg'}
+    assert plan_backends(["streams.0.width"]) == {'FFmpeg'}
+    assert plan_backends(["Image Width"]) == {'OIIO', 'ExifTool', 'Native', 'Vendor'}
+    assert 'FFmpeg' in plan_backends(["Frame_Count"])
+    assert compile_selector(["codec_name", "duration"]).ffprobe_entries() == "format=duration:stream=codec_name,duration"
+    assert compile_selector(["re:Date"]).ffprobe_entries() is None
+    assert compile_selector(["Image Width", "=QuickTime:CreateDate"]).exiftool_tags() == ["-*imagewidth*",
+                                                                                         "-quicktime:createdate"]
+    assert compile_selector(["re:Date"]).exiftool_tags() is None
+
+
+def test_answered_by_native_section():
+    native = read_mov_metadata(os.path.join(SAMPLES, "sample_640x360.mov"))
+    assert compile_selector(["Image Width", "=FrameCount", "*Rate"]).answered_by(native)
+    assert not compile_selector(["Image Width", "Lens Model"]).answered_by(native)
+    assert compile_selector(["Image Width"]) is compile_selector(("Image Width",))
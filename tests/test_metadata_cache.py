@@ -0,0 +1,51 @@
+import itertools
+import json
+
+import metadata_cache
+from metadata_cache import MetadataCache
+
+
+def _value(index):
+    # Every payload serializes to the same size.
+    return {"ImageWidth": 1000 + index}
+
+
+def test_lru_eviction_and_hit_accounting(monkeypatch, tmp_path):
+    clock = itertools.count(1)
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: float(next(clock)))
+    size = len(json.dumps(_value(0)))
+    cache = MetadataCache(str(tmp_path / "cache.sqlite"), max_bytes=3 * size)
+
+    for key in "abc":
+        cache.put(key, _value(ord(key)))
+    assert cache.get("a") == _value(ord("a"))  # "b" is now the least recently used entry.
+    assert cache.get("z") is None
+    cache.put("d", _value(ord("d")))
+
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (4, 2, 1)
+    assert stats["hit_ratio"] == 4 / 6
+    assert (stats["entries"], stats["bytes"]) == (3, 3 * size)
+
+    # Replacing an entry does not count its old size; oversized values are not stored.
+    cache.put("a", _value(ord("a")))
+    cache.put("huge", {"payload": "x" * 4 * size})
+    assert cache.stats()["bytes"] == 3 * size and cache.get("huge") is None
+    cache.close()
+
+    # The byte count survives a reopen.
+    assert MetadataCache(str(tmp_path / "cache.sqlite"), max_bytes=3 * size).stats()["bytes"] == 3 * size
+
+
+def test_key_changes_with_file_and_tools(tmp_path):
+    path = tmp_path / "clip.mov"
+    path.write_bytes(b"moov")
+    key = MetadataCache.make_key(str(path), {"exiftool": "12.76"})
+    assert key == MetadataCache.make_key(str(path), {"exiftool": "12.76"})
+    assert key != MetadataCache.make_key(str(path), {"exiftool": "13.0"})
+    assert key != MetadataCache.make_key(str(path), {"exiftool": "12.76"}, variant="deep")
+    path.write_bytes(b"moov moov")
+    assert key != MetadataCache.make_key(str(path), {"exiftool": "12.76"})
+    assert MetadataCache.make_key(str(tmp_path / "missing.mov"), {}) is None
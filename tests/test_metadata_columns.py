@@ -0,0 +1,54 @@
+import pytest
+
+from metadata_record import MetadataRecord
+
+np = pytest.importorskip("numpy")
+from metadata_columns import MetadataTable  # noqa: E402
+
+RECORDS = [
+    MetadataRecord("A001C001.mxf", container="mxf", width=4448, height=3096, fps=23.976, exposure_index=800,
+                   lens="Signature Prime 35", camera_model="ALEXA 35"),
+    MetadataRecord("A001C002.mxf", container="mxf", width=4448, height=3096, fps=23.976, exposure_index=1600,
+                   lens="Signature Prime 50", camera_model="ALEXA 35"),
+    MetadataRecord("B001C001.mov", container="mov", width=1920, height=1080, fps=25.0, exposure_index=1600,
+                   lens="Signature Prime 35"),
+    MetadataRecord("plate.1001.exr", container="exr", width=640, height=426),
+]
+
+
+def test_columns_and_queries():
+    table = MetadataTable.from_records(RECORDS)
+    assert len(table) == 4
+    assert table.columns["width"].dtype == np.int64 and table.columns["fps"].dtype == np.float64
+    assert table.columns["lens"].dtype == np.int32
+    assert table.categories["lens"] == ["Signature Prime 35", "Signature Prime 50"]
+    assert table.values("camera_model").tolist() == ["ALEXA 35", "ALEXA 35", None, None]
+
+    assert table.where(exposure_index=1600, lens="Signature Prime 35").tolist() == [2]
+    assert table.where(container=["mxf", "exr"]).tolist() == [0, 1, 3]
+    assert table.where(lens="Unknown lens").tolist() == []
+    # Missing integers (-1) are left out of ranges, missing floats (NaN) out of comparisons.
+    assert table.where(exposure_index=slice(None, 1000)).tolist() == [0]
+    assert table.where(fps=slice(24, None)).tolist() == [2]
+    assert table.count("container") == {"mxf": 2, "mov": 1, "exr": 1}
+    assert table.count("exposure_index") == {800: 1, 1600: 2}
+    assert table.count("lens", mask=table.mask(container="mxf")) == {"Signature Prime 35": 1, "Signature Prime 50": 1}
+    assert list(table.records([3])) == [RECORDS[3]]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_save_and_load(tmp_path, compress):
+    table = MetadataTable.from_records(RECORDS)
+    path = table.save(str(tmp_path / "catalog"), compress=compress)
+    assert path.endswith(".npz") == compress
+    loaded = MetadataTable.load(path)
+    if not compress:
+        assert isinstance(loaded.columns["width"], np.memmap)
+    assert list(loaded.records()) == RECORDS
+    assert loaded.where(lens="Signature Prime 50").tolist() == [1]
+
+
+def test_concat_reencodes_strings():
+    table = MetadataTable.concat([MetadataTable.from_records(RECORDS[2:]), MetadataTable.from_records(RECORDS[:2])])
+    assert table.values("path").tolist() == [record.path for record in RECORDS[2:] + RECORDS[:2]]
+    assert table.where(lens="Signature Prime 35").tolist() == [0, 2]
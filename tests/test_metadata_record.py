@@ -0,0 +1,53 @@
+import os
+
+from conftest import SAMPLES
+from metadata_record import MetadataRecord
+from mov_reader import read_mov_metadata
+from mxf_reader import read_mxf_header
+
+MOV = os.path.join(SAMPLES, "sample_640x360.mov")
+MXF = os.path.join(SAMPLES, "sample_640x360.mxf")
+FIELDS = ("width", "height", "fps", "codec", "frame_count", "timecode")
+
+# What ffprobe reports for the samples (video stream and format tags).
+FFPROBE = {
+    MOV: {"streams": [{"codec_type": "video", "codec_name": "h264", "width": 640, "height": 360,
+                       "r_frame_rate": "30000/1001", "nb_frames": "400"}],
+          "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "13.347000"}},
+    MXF: {"streams": [{"codec_type": "video", "codec_name": "mpeg2video", "width": 640, "height": 360,
+                       "r_frame_rate": "30000/1001"}],
+          "format": {"format_name": "mxf", "tags": {"timecode": "00:00:00:00"}}},
+}
+
+
+def _fields(path, metadata):
+    record = MetadataRecord.from_metadata(path, metadata).to_dict()
+    return {name: record[name] for name in FIELDS}
+
+
+def test_native_and_ffprobe_records_agree():
+    for path, native in ((MOV, read_mov_metadata(MOV)), (MXF, read_mxf_header(MXF))):
+        from_native = _fields(path, {'Native': native})
+        assert from_native == _fields(path, {'FFmpeg': FFPROBE[path]})
+        assert from_native["fps"] == 29.97
+    assert _fields(MOV, {'Native': read_mov_metadata(MOV)})["codec"] == "h264"
+    assert _fields(MXF, {'Native': read_mxf_header(MXF)})["codec"] == "mpeg2video"
+
+
+def test_colour_labels_use_ffprobe_names():
+    native = {"ColorPrimaries": "ITU-R BT.709", "TransferCharacteristic": "ITU-R BT.709",
+              "CodingEquations": "ITU-R BT.709"}
+    ffprobe = {"streams": [{"codec_type": "video", "color_primaries": "bt709", "color_transfer": "bt709",
+                            "color_space": "bt709"}]}
+    quicktime = {"Tracks": [], "ColorPrimaries": 1, "TransferCharacteristics": 1, "MatrixCoefficients": 1}
+    records = [MetadataRecord.from_metadata("clip", {tool: section})
+               for tool, section in (('Native', native), ('FFmpeg', ffprobe), ('Native', quicktime))]
+    for record in records:
+        assert (record.color_primaries, record.transfer, record.color_space) == ("bt709", "bt709", "bt709")
+
+
+def test_image_compression_is_not_a_codec():
+    exr = {"compression": "NONE", "dataWindow": [0, 0, 639, 425]}
+    record = MetadataRecord.from_metadata("frame.exr", {'Native': exr, 'OIIO': {"compression": "none"}})
+    assert record.codec is None
+    assert (record.width, record.height) == (640, 426)
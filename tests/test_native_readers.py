@@ -0,0 +1,131 @@
+import os
+import struct
+
+import pytest
+
+from conftest import SAMPLES
+from dpx_reader import (CINEON_FIELDS, DPX_FIELDS, check_sequence, decode_header, read_dpx_metadata,
+                        read_sequence_headers, timecode_to_frames)
+from exr_reader import read_exr_metadata
+from mov_reader import read_mov_metadata
+from mxf_reader import read_mxf_header
+from timecode import format_timecode
+
+
+def test_mxf_header():
+    metadata = read_mxf_header(os.path.join(SAMPLES, "sample_640x360.mxf"))
+    assert metadata["OperationalPattern"] == "OP1a"
+    assert (metadata["StoredWidth"], metadata["StoredHeight"]) == (640, 368)
+    assert (metadata["DisplayWidth"], metadata["DisplayHeight"]) == (640, 360)
+    assert metadata["SampleRate"] == "30000/1001"
+    assert metadata["StartTimecode"] == "00:00:00:00"
+    assert metadata["PictureEssenceCoding"] == "MPEG-2 Video"
+
+
+def test_mxf_reader_rejects_other_files():
+    assert read_mxf_header(os.path.join(SAMPLES, "sample_640x360.mov")) is None
+
+
+def test_exr_header():
+    metadata = read_exr_metadata(os.path.join(SAMPLES, "sample_640×426_exr.exr"))
+    assert metadata["PartCount"] == 1
+    assert tuple(metadata["dataWindow"]) == (0, 0, 639, 425)
+    assert tuple(metadata["displayWindow"]) == (0, 0, 639, 425)
+    assert sorted(metadata["channels"]) == ["B", "G", "R"]
+    assert {channel["type"] for channel in metadata["channels"].values()} == {"HALF"}
+    assert metadata["compression"] == "NONE"
+
+
+def test_mov_metadata():
+    metadata = read_mov_metadata(os.path.join(SAMPLES, "sample_640x360.mov"))
+    assert metadata["MajorBrand"] == "qt"
+    assert metadata["VideoCodec"] == "avc1"
+    assert (metadata["ImageWidth"], metadata["ImageHeight"]) == (640, 360)
+    assert metadata["FrameCount"] == 400
+    assert metadata["FrameRate"] == 29.97
+    track = metadata["Tracks"][0]
+    assert (track["HandlerType"], track["MediaTimescale"], track["SampleDuration"]) == ("Video", 30000, 1001)
+
+
+def test_mp4_metadata():
+    metadata = read_mov_metadata(os.path.join(SAMPLES, "sample_640x360.mp4"))
+    assert (metadata["ImageWidth"], metadata["ImageHeight"]) == (640, 360)
+    assert metadata["FrameRate"] == 29.97
+
+
+def _header(magic, fields, byte_order=">", **values):
+    """Synthetic 2048-byte DPX/Cineon header, every field left undefined but `values`."""
+    head = bytearray(b"\xff" * 2048)
+    head[:4] = magic
+    formats = {name: (offset, fmt) for name, offset, fmt in fields}
+    for name, value in values.items():
+        offset, fmt = formats[name]
+        if isinstance(value, str):
+            value = value.encode("latin-1")
+        struct.pack_into(byte_order + fmt, head, offset, value)
+    return bytes(head)
+
+
+def _bcd(timecode):
+    """DPX TV header timecode of "HH:MM:SS:FF" (";" before the frames for drop-frame)."""
+    digits = [int(part) for part in timecode.replace(";", ":").split(":")]
+    packed = 0
+    for value in digits:
+        packed = (packed << 8) | ((value // 10) << 4) | (value % 10)
+    return packed | (0x40 if ";" in timecode else 0)
+
+
+def _dpx(byte_order=">", **values):
+    return _header(b"SDPX" if byte_order == ">" else b"XPDS", DPX_FIELDS, byte_order, **values)
+
+
+@pytest.mark.parametrize("byte_order", [">", "<"])
+def test_dpx_header(byte_order):
+    metadata = decode_header(_dpx(byte_order, ImageWidth=2048, ImageHeight=1556, Descriptor=50, Transfer=1,
+                                  Colorimetric=1, BitDepth=10, InputDevice="ARRISCAN",
+                                  TimeCode=_bcd("01:00:00:00"), TVFrameRate=24.0))
+    assert metadata["Format"] == "DPX"
+    assert metadata["ByteOrder"] == ("big-endian" if byte_order == ">" else "little-endian")
+    assert (metadata["ImageWidth"], metadata["ImageHeight"], metadata["BitDepth"]) == (2048, 1556, 10)
+    assert (metadata["DescriptorName"], metadata["TransferName"]) == ("RGB", "Printing density")
+    assert metadata["InputDevice"] == "ARRISCAN"
+    assert metadata["TimeCode"] == "01:00:00:00"
+    assert metadata["TVFrameRate"] == 24.0
+    # Undefined fields (all bits set) are left out.
+    assert "FilmFrameRate" not in metadata and "Creator" not in metadata
+
+
+def test_cineon_header(tmp_path):
+    path = tmp_path / "frame.0001.cin"
+    path.write_bytes(_header(b"\x80\x2a\x5f\xd7", CINEON_FIELDS, ImageWidth=4096, ImageHeight=3112, BitDepth=10))
+    metadata = read_dpx_metadata(str(path))
+    assert metadata["Format"] == "Cineon"
+    assert (metadata["ImageWidth"], metadata["ImageHeight"], metadata["BitDepth"]) == (4096, 3112, 10)
+    assert decode_header(b"\x00" * 2048) is None
+
+
+def test_drop_frame_timecode_round_trip():
+    np = pytest.importorskip("numpy")
+    frames = np.array([0, 1, 1799, 1800, 17981, 17982, 17983, 107891, 107892, 2589407])
+    timecodes = [format_timecode(int(frame), 30, drop_frame=True) for frame in frames]
+    assert timecodes[3:5] == ["00:01:00;02", "00:09:59;29"]
+    assert timecodes[5] == "00:10:00;00"
+    assert timecode_to_frames([_bcd(timecode) for timecode in timecodes], 29.97).tolist() == frames.tolist()
+    assert timecode_to_frames([0xFFFFFFFF], 24).tolist() == [-1]
+
+
+def test_sequence_continuity(tmp_path):
+    pytest.importorskip("numpy")
+    paths = []
+    for index, timecode in enumerate(["01:00:00:00", "01:00:00:01", "01:00:00:03"]):
+        path = tmp_path / f"frame.{index:04d}.dpx"
+        byte_order = "<" if index == 1 else ">"
+        path.write_bytes(_dpx(byte_order, ImageWidth=1920, TimeCode=_bcd(timecode), TVFrameRate=24.0,
+                              FramePosition=index))
+        paths.append(str(path))
+    headers = read_sequence_headers(paths)
+    assert headers["ImageWidth"].tolist() == [1920] * 3
+    report = check_sequence(headers)
+    assert report["timecode_rate"] == 24.0
+    assert report["timecode_breaks"] == [2]
+    assert report["frame_position_breaks"] == []
@@ -0,0 +1,79 @@
+import time
+import threading
+
+import ocf_export
+from ocf_export import ExportBatch, ExportCancelled
+
+
+def fake_export_file(file_path, camera_type, dest_folder, runner=None):
+    time.sleep(0.001 * (hash(file_path) % 5))
+    if runner.cancelled:
+        raise ExportCancelled()
+    return not file_path.endswith("bad.r3d")
+
+
+def test_finish_comes_after_every_file_callback(monkeypatch):
+    monkeypatch.setattr(ocf_export, "export_file", fake_export_file)
+    file_paths = [f"/clips/A{index:03d}.r3d" for index in range(40)] + ["/clips/bad.r3d"]
+    reported = []
+    finished = []
+    lock = threading.Lock()
+
+    def on_file(file_path, status, seconds):
+        # A slow status callback must still be seen before the batch finishes.
+        time.sleep(0.01 if file_path.endswith("0.r3d") else 0)
+        with lock:
+            reported.append((file_path, status))
+
+    def on_finish(batch):
+        with lock:
+            finished.append(len(reported))
+
+    batch = ExportBatch(file_paths, 'RED', "/tmp", workers=8, on_file=on_file, on_finish=on_finish)
+    assert batch.start().wait(10)
+    assert finished == [len(file_paths)]
+    assert sorted(reported) == sorted((path, "failed" if path.endswith("bad.r3d") else "done")
+                                      for path in file_paths)
+    assert batch.counts == {"done": 40, "failed": 1, "cancelled": 0}
+
+
+def test_cancel_skips_the_remaining_files(monkeypatch):
+    started = threading.Event()
+
+    def slow_export_file(file_path, camera_type, dest_folder, runner=None):
+        started.set()
+        while not runner.cancelled:
+            time.sleep(0.005)
+        raise ExportCancelled()
+
+    monkeypatch.setattr(ocf_export, "export_file", slow_export_file)
+    statuses = []
+    batch = ExportBatch([f"/clips/A{index:03d}.r3d" for index in range(10)], 'RED', "/tmp", workers=2,
+                        on_file=lambda file_path, status, seconds: statuses.append(status))
+    batch.start()
+    assert started.wait(5)
+    batch.cancel()
+    assert batch.wait(5)
+    assert batch.cancelled
+    assert batch.counts == {"done": 0, "failed": 0, "cancelled": 10}
+    assert statuses == ["cancelled"] * 10
+
+
+def test_empty_batch_finishes():
+    finished = []
+    batch = ExportBatch([], 'RED', "/tmp", on_finish=finished.append).start()
+    assert batch.wait(1)
+    assert finished == [batch]
+
+
+def test_export_command_reports_each_status(monkeypatch, tmp_path, capsys):
+    from ocf_metadata_cli import main
+
+    monkeypatch.setattr(ocf_export, "export_file", fake_export_file)
+    for name in ("A001.r3d", "A002.r3d", "bad.r3d", "notes.txt"):
+        (tmp_path / name).write_text("")
+    assert main(["export", str(tmp_path), str(tmp_path), "--camera", "RED", "-j", "2"]) == 1
+    assert capsys.readouterr().out == "Exported 2 file(s), 1 failed, 0 cancelled.\n"
+
+    (tmp_path / "bad.r3d").unlink()
+    assert ocf_export.export_folder(str(tmp_path), 'RED', str(tmp_path)) == {"done": 2, "failed": 0, "cancelled": 0}
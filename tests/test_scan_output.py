@@ -0,0 +1,19 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = os.path.join(ROOT, "source_images")
+
+
+def test_scan_stdout_is_ndjson(tmp_path):
+    # A fresh cache directory, so format discovery (and its messages about missing tools) runs.
+    env = dict(os.environ, OCF_METADATA_CACHE_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "ocf_metadata_cli.py"), "scan", SAMPLES, "-j", "2"],
+                            capture_output=True, text=True, env=env, cwd=ROOT, check=True)
+    lines = result.stdout.splitlines()
+    assert lines
+    for line in lines:
+        record = json.loads(line)
+        assert "path" in record
@@ -0,0 +1,61 @@
+import os
+import shutil
+import struct
+
+import pytest
+
+from conftest import SAMPLES
+from dpx_reader import DPX_FIELDS
+
+pytest.importorskip("numpy")
+from sequence_check import verify_folder  # noqa: E402
+
+SHOT = os.path.join(os.path.dirname(SAMPLES), "sample_exr_640×426")
+UFO_FRAME = os.path.join(os.path.dirname(SAMPLES), "UFO_0090_lgt_v35_char_BTY", "UFO_0090_lgt_v35_char_BTY.0040.exr")
+OFFSETS = {name: (offset, fmt) for name, offset, fmt in DPX_FIELDS}
+
+
+def _dpx(path, timecode, bit_depth=10):
+    head = bytearray(b"\xff" * 2048)
+    head[:4] = b"SDPX"
+    for name, value in (("ImageWidth", 2048), ("ImageHeight", 1556), ("BitDepth", bit_depth), ("Descriptor", 50),
+                        ("TimeCode", timecode), ("TVFrameRate", 24.0)):
+        offset, fmt = OFFSETS[name]
+        struct.pack_into(">" + fmt, head, offset, value)
+    path.write_bytes(bytes(head))
+
+
+def test_sample_shot_is_consistent():
+    reports = verify_folder(SHOT, workers=1)
+    assert list(reports) == [os.path.join(SHOT, "sample_exr_640×426.%04d.exr")]
+    report = reports[os.path.join(SHOT, "sample_exr_640×426.%04d.exr")]
+    assert report["consistent"]
+    assert (report["frame_count"], report["frames_checked"]) == (3, 3)
+    assert report["reference"]["data_window"] == [0, 0, 639, 425]
+    assert report["reference"]["channels"] == "B:HALF,G:HALF,R:HALF"
+    assert not report["has_timecode"] and report["timecode_missing"] == []
+
+
+def test_exr_outliers_gaps_and_unreadable_frames(tmp_path):
+    for frame in (1001, 1002, 1003):
+        shutil.copy(os.path.join(SHOT, f"sample_exr_640×426.{frame}.exr"), tmp_path / f"plate.{frame}.exr")
+    shutil.copy(UFO_FRAME, tmp_path / "plate.1005.exr")
+    (tmp_path / "plate.1006.exr").write_bytes(b"v/1\x01" + b"\x00" * 12)
+    report = verify_folder(str(tmp_path), workers=1)[str(tmp_path / "plate.%04d.exr")]
+    assert not report["consistent"]
+    assert report["gaps"] == [[1004, 1004]]
+    assert report["unreadable_frames"] == [1006]
+    assert report["outliers"]["data_window"] == [[1005, [0, 0, 4095, 2730]]]
+    assert report["outliers"]["compression"] == [[1005, "ZIPS"]]
+    assert report["outliers"]["channels"] == [[1005, "A:HALF,B:HALF,G:HALF,R:HALF"]]
+
+
+def test_dpx_timecode_breaks(tmp_path):
+    # 01:00:00:00, :01, :03 (a break), and a frame with another bit depth.
+    for index, (timecode, bit_depth) in enumerate([(0x01000000, 10), (0x01000001, 10), (0x01000003, 10),
+                                                   (0x01000004, 12)]):
+        _dpx(tmp_path / f"scan.{index:04d}.dpx", timecode, bit_depth)
+    report = verify_folder(str(tmp_path), workers=1)[str(tmp_path / "scan.%04d.dpx")]
+    assert report["timecode_rate"] == 24.0
+    assert report["timecode_breaks"] == [[2, "01:00:00:01", "01:00:00:03"]]
+    assert report["outliers"] == {"channels": [[3, "RGB 12-bit"]]}
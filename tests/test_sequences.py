@@ -0,0 +1,51 @@
+import os
+
+from conftest import SAMPLES
+from sequences import extract_sequence_metadata, find_sequences, group_sequences, sample_frames
+
+SHOT = os.path.join(os.path.dirname(SAMPLES), "sample_exr_640×426")
+
+
+def test_group_sequences():
+    paths = ([f"/plates/A001.{frame:04d}.exr" for frame in (1001, 1002, 1003, 1005, 1010)]
+             + ["/plates/A001.01001.exr", "/plates/B001_v2.0101.dpx", "/plates/clip_0001.mov", "/plates/notes.txt",
+                "/renders/beauty.99.exr", "/renders/beauty.100.exr", "/renders/beauty.101.exr"])
+    sequences, files = group_sequences(paths)
+    assert [sequence.pattern for sequence in sequences] == ["/plates/A001.%04d.exr", "/renders/beauty.%d.exr"]
+    plate, render = sequences
+    assert (plate.first, plate.last, len(plate)) == (1001, 1010, 5)
+    assert plate.gaps() == [[1004, 1004], [1006, 1009]]
+    assert plate.padding_consistent
+    assert plate.path(1005) == "/plates/A001.1005.exr"
+    assert render.frame_numbers == [99, 100, 101] and render.padding_consistent
+    # Single frames, movies and other files, and a frame number repeated with another padding.
+    assert files == ["/plates/A001.01001.exr", "/plates/B001_v2.0101.dpx", "/plates/clip_0001.mov", "/plates/notes.txt"]
+
+
+def test_inconsistent_padding():
+    sequences, _ = group_sequences([f"/plates/A001.{frame}.exr" for frame in ("0098", "0099", "100", "0101")])
+    assert sequences[0].padding == 4 and not sequences[0].padding_consistent
+    # Unpadded numbers of several widths.
+    sequences, _ = group_sequences([f"/plates/A001.{frame}.exr" for frame in (1, 10, 250)])
+    assert sequences[0].pattern == "/plates/A001.%d.exr" and sequences[0].padding_consistent
+
+
+def test_sample_frames():
+    sequence = group_sequences([f"/plates/A001.{frame}.exr" for frame in range(1001, 1101)])[0][0]
+    assert sample_frames(sequence, 0) == []
+    assert sample_frames(sequence, 4) == [1026, 1051, 1075, 1100]
+    assert sample_frames(sequence, [1001, 1050, 2000]) == [1050]
+
+
+def test_sample_shot_folder():
+    sequences, files = find_sequences(SHOT)
+    assert [os.path.basename(sequence.pattern) for sequence in sequences] == ["sample_exr_640×426.%04d.exr"]
+    assert sequences[0].frame_numbers == [1001, 1002, 1003]
+    assert {os.path.basename(path) for path in files} == {
+        "Sample_Shot_review.mov", "sample_exr_640×426.1001_copy.exr", "sample_exr_640×426.1001_copy_metadata.exr"}
+
+    report = extract_sequence_metadata(sequences[0], sample=1, workers=1, tier="quick")
+    assert (report["frame_range"], report["frame_count"], report["gaps"]) == ([1001, 1003], 3, [])
+    assert report["total_bytes"] == sum(os.path.getsize(path) for path in sequences[0].paths())
+    assert list(report["samples"]) == [1003]
+    assert tuple(report["metadata"]["Native"]["dataWindow"]) == (0, 0, 639, 425)
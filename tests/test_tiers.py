@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from conftest import SAMPLES
+from get_metadata import TIER_BACKENDS, MetadataExtractor
+from key_selectors import compile_selector
+
+MXF = os.path.join(SAMPLES, "sample_640x360.mxf")
+
+RED_LISTING = {"Frame Width": "6144", "Record FPS": "23.976", "Camera PIN": "121-BD5-4A2"}
+ARRI_EXPORT = {
+    "clipBasedMetadataSets": [
+        {"metadataSetName": "Clip Info", "metadataSetPayload": {"reelName": "A001", "cameraSerialNumber": "35-1234"}},
+        {"metadataSetName": "Image Size", "metadataSetPayload": {"storedSize": {"width": 4608, "height": 3164}}},
+    ],
+}
+
+
+def test_tier_backends():
+    assert TIER_BACKENDS["quick"] == ('ExifTool', 'Native')
+    assert 'Vendor' not in TIER_BACKENDS["standard"]
+    assert set(TIER_BACKENDS["deep"]) == set(TIER_BACKENDS["standard"]) | {'Vendor'}
+    with pytest.raises(ValueError):
+        MetadataExtractor(MXF, tier="fast")
+
+
+def test_vendor_keys_are_planned_and_matched():
+    selector = compile_selector(["Camera PIN", "=reelName", "codec_name"])
+    assert 'Vendor' in selector.backends
+    assert selector.select_section(RED_LISTING, 'Vendor') == {"Camera PIN": "121-BD5-4A2"}
+    assert selector.select_section(ARRI_EXPORT, 'Vendor') == {"reelName": "A001"}
+    # Snake_case ffprobe fields are not looked up in the vendor output.
+    assert 'Vendor' not in compile_selector(["codec_name"]).backends
+
+
+def test_deep_selection_returns_vendor_keys(monkeypatch):
+    monkeypatch.setattr(MetadataExtractor, "extract_vendor_metadata", lambda self: dict(RED_LISTING))
+    extractor = MetadataExtractor(MXF, tier="deep")
+    selected = extractor.extract_selected_metadata(["Record FPS", "StoredWidth"])
+    assert selected["Vendor"] == {"Record FPS": "23.976"}
+    assert selected["Native"] == {"StoredWidth": 640}
+    assert 'Vendor' not in MetadataExtractor(MXF).extract_selected_metadata(["Record FPS"])
+
+
+def test_quick_tier_reads_mxf_natively(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("ExifTool ran although the native reader parsed the header")
+
+    monkeypatch.setattr(MetadataExtractor, "extract_exiftool_metadata", fail)
+    metadata = MetadataExtractor(MXF, tier="quick").extract_metadata().to_dict()
+    assert metadata["Tier"] == "quick"
+    assert metadata["Native"]["StoredWidth"] == 640
+    assert metadata["ExifTool"] == "Read by the native MXF reader (see Native)."
@@ -0,0 +1,28 @@
+"""SMPTE timecode helpers shared by the native header readers."""
+
+
+def format_timecode(frames, rate, drop_frame=False):
+    """SMPTE timecode string from a frame count at an integer (rounded) rate."""
+    if not rate:
+        return None
+    if drop_frame and rate in (30, 60):
+        drop = 2 * (rate // 30)
+        frames_per_10min = rate * 600 - drop * 9
+        tens, remainder = divmod(frames, frames_per_10min)
+        frames += drop * 9 * tens + (drop * ((remainder - drop) // (rate * 60 - drop)) if remainder > drop else 0)
+    ff = frames % rate
+    seconds = frames // rate
+    separator = ";" if drop_frame else ":"
+    return f"{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}{separator}{ff:02d}"
+
+
+def decode_bcd_timecode(time_and_flags):
+    """SMPTE 12M timecode packed in BCD (EXR 'timecode' attributes, DPX TV header)."""
+    def bcd(value):
+        return (value >> 4) * 10 + (value & 0x0F)
+    frames = bcd(time_and_flags & 0x3F)
+    seconds = bcd((time_and_flags >> 8) & 0x7F)
+    minutes = bcd((time_and_flags >> 16) & 0x7F)
+    hours = bcd((time_and_flags >> 24) & 0x3F)
+    drop_frame = bool(time_and_flags & 0x40)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{';' if drop_frame else ':'}{frames:02d}"
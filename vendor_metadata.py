@@ -0,0 +1,135 @@
+"""
+MetadataRecords from the vendor tool exports written by ocf_export
+(*_metadata_export.json): ARRI art-cmd JSON, and the "Key: Value" listings of
+REDline --printMeta and SONY rawexporter --metalist converted to flat JSON.
+"""
+
+import os
+import json
+from fractions import Fraction
+
+from metadata_record import FIELDS, FIELD_TYPES, MetadataRecord
+
+EXPORT_SUFFIX = "_metadata_export.json"
+
+# Normalized field -> labels used by the REDline and rawexporter listings
+# (matched case-insensitively, the first present wins).
+KEY_VALUE_LABELS = {
+    "width": ("Frame Width", "Image Width", "Width"),
+    "height": ("Frame Height", "Image Height", "Height"),
+    "fps": ("Record FPS", "FPS", "Frame Rate", "Capture FPS", "Capture Fps", "Project FPS"),
+    "frame_count": ("Total Frames", "Frame Count", "Duration Frames"),
+    "bit_depth": ("Bit Depth",),
+    "codec": ("Compression", "Codec", "Video Codec"),
+    "color_primaries": ("Color Space", "Gamut", "Color Gamut"),
+    "transfer": ("Gamma Space", "Gamma", "Transfer Curve"),
+    "timecode": ("Abs TC", "Timecode", "Start Timecode", "Edge TC"),
+    "reel": ("Reel ID", "Reel Name", "Reel"),
+    "camera_make": ("Camera Manufacturer", "Manufacturer", "Make"),
+    "camera_model": ("Camera Model", "Camera", "Model Name"),
+    "camera_serial": ("Camera PIN", "Camera Serial Number", "Serial Number"),
+    "lens": ("Lens", "Lens Name", "Lens Model"),
+    "focal_length": ("Focal Length", "Lens Focal Length"),
+    "exposure_index": ("ISO", "Exposure Index", "EI"),
+    "white_balance": ("Kelvin", "Color Temperature", "White Balance"),
+    "shutter_angle": ("Shutter (deg)", "Shutter Angle"),
+}
+CAMERA_MAKES = {"RED": "RED", "SONY": "Sony", "ARRI": "ARRI"}
+
+
+def _convert(name, value):
+    return FIELDS[name][0](value)
+
+
+def _source_path(json_path, fallback=None):
+    base = os.path.basename(json_path)
+    if base.endswith(EXPORT_SUFFIX):
+        return os.path.join(os.path.dirname(json_path), base[:-len(EXPORT_SUFFIX)])
+    return fallback or json_path
+
+
+def record_from_arri_json(data, path=None):
+    """
+    MetadataRecord of an ARRI art-cmd export (clip-based sets, plus the first
+    frame's dynamic data). `path` is used when the export does not name its clip.
+    """
+    sets = {}
+    for metadata_set in data.get("clipBasedMetadataSets", []) + data.get("descriptiveMetadataSets", []):
+        sets.setdefault(metadata_set.get("metadataSetName"), metadata_set.get("metadataSetPayload") or {})
+    frames = (data.get("frameBasedMetadata") or {}).get("frames") or [{}]
+    frame = frames[0].get("frameBasedMetadataSets") or {}
+
+    image_size = sets.get("Image Size", {})
+    stored = image_size.get("storedSize") or image_size.get("displayRect") or {}
+    sensor_state = frame.get("Sensor State", {})
+    clip_info = sets.get("Clip Info", {})
+    encoding = sets.get("Color", {}).get("sceneColorEncoding", {})
+    identification = (sets.get("MXF Generic Data", {}).get("nativeIdentificationList") or [{}])[0]
+    lens_state = frame.get("Lens State", {})
+    fps = _convert("fps", sensor_state.get("sensorSampleRate") or sets.get("Project Rate", {}).get("timebase"))
+    shutter_angle = None
+    if fps and sensor_state.get("exposureTime"):
+        try:
+            shutter_angle = round(float(Fraction(sensor_state["exposureTime"])) * fps * 360, 3)
+        except (ValueError, ZeroDivisionError):
+            pass
+    focal_length = lens_state.get("lensFocalLength")
+    fields = {
+        "width": _convert("width", stored.get("width")),
+        "height": _convert("height", stored.get("height")),
+        "fps": fps,
+        "frame_count": _convert("frame_count", clip_info.get("clipDuration")),
+        "codec": _convert("codec", clip_info.get("videoCodec")),
+        "color_primaries": _convert("color_primaries", encoding.get("sceneColorEncodingPrimaries")),
+        "transfer": _convert("transfer", encoding.get("sceneColorEncodingTransferCurve")),
+        "reel": _convert("reel", sets.get("Slate Info", {}).get("reelName")),
+        "camera_make": _convert("camera_make", identification.get("companyName") or "ARRI"),
+        "camera_model": _convert("camera_model", sets.get("Camera Device", {}).get("cameraModel")),
+        "camera_serial": _convert("camera_serial", sets.get("Camera Device", {}).get("cameraSerialNumber")),
+        "lens": _convert("lens", sets.get("Lens Device", {}).get("lensModel")),
+        # Lens data is in 1/1000 mm.
+        "focal_length": focal_length / 1000 if isinstance(focal_length, (int, float)) else None,
+        "exposure_index": _convert("exposure_index", sensor_state.get("exposureIndex")),
+        "white_balance": _convert("white_balance", frame.get("White Balance", {}).get("colorTemperature")),
+        "shutter_angle": shutter_angle,
+    }
+    path = (data.get("arriJsonHeader") or {}).get("mxfFileName") or path
+    return MetadataRecord(path, container="mxf", **fields)
+
+
+def record_from_key_value(metadata, camera_type=None, path=None):
+    """MetadataRecord of a flat REDline / rawexporter listing ({"Label": "value"})."""
+    labels = {key.strip().lower(): value for key, value in metadata.items()}
+    fields = {}
+    for name, candidates in KEY_VALUE_LABELS.items():
+        for label in candidates:
+            value = labels.get(label.lower())
+            if value not in (None, ""):
+                # "24.000 fps", "800 ISO", "35 mm": keep the leading number of numeric fields.
+                if FIELD_TYPES[name] is not str and isinstance(value, str):
+                    value = value.split()[0]
+                fields[name] = _convert(name, value)
+                if fields[name] is not None:
+                    break
+    if fields.get("camera_make") is None and camera_type in CAMERA_MAKES:
+        fields["camera_make"] = _convert("camera_make", CAMERA_MAKES[camera_type])
+    container = {"RED": "r3d", "SONY": "mxf"}.get(camera_type)
+    return MetadataRecord(path or metadata.get("filepath") or metadata.get("File Name"), container=container, **fields)
+
+
+def load_vendor_record(json_path, camera_type=None):
+    """MetadataRecord of one vendor export JSON; ARRI files are recognized by their header."""
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    if "arriJsonHeader" in data or "clipBasedMetadataSets" in data:
+        return record_from_arri_json(data, path=_source_path(json_path))
+    return record_from_key_value(data, camera_type, path=_source_path(json_path, data.get("filepath")))
+
+
+def iter_vendor_exports(folder):
+    """Paths of the *_metadata_export.json files under `folder`."""
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(EXPORT_SUFFIX):
+                yield os.path.join(dirpath, filename)
@@ -1,5 +1,5 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, Response, jsonify, render_template, request, redirect, url_for, flash
 
 # Prepend REDCINE-X PRO directory to PATH so REDline is found.
 os.environ['PATH'] = "/Applications/REDCINE-X PRO/REDCINE-X PRO.app/Contents/MacOS:" + os.environ.get('PATH', '')
@@ -80,5 +80,16 @@ def generate():
 
     return render_template('generate_results.html', generated_files=generated_files)
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus scrape endpoint (empty unless OCF_METADATA_INSTRUMENT=1).
+    from instrumentation import get_stats
+    return Response(get_stats().to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/trace', methods=['GET'])
+def trace():
+    from instrumentation import get_stats
+    return jsonify(get_stats().to_trace())
+
 if __name__ == '__main__':
     app.run(debug=True)
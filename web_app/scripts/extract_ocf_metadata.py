@@ -2,6 +2,8 @@ import os
 import subprocess
 import json
 
+from instrumentation import span, record_bytes
+
 class ExtractOCFMetadata:
     def __init__(self, filepath=None, camera_brand=None):
         self.filepath = filepath
@@ -25,14 +27,16 @@ class ExtractOCFMetadata:
         tmp_json = os.path.join(file_dir, base_name + "_metadata_export.json")
         cmd = [art_cmd_bin, "export", self.filepath, "--output", tmp_json]
         try:
-            completed = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            with span("subprocess", "art-cmd", file=self.filepath):
+                completed = subprocess.run(cmd, capture_output=True, text=True, check=True)
             if completed.stderr:
                 print("art-cmd stderr:", completed.stderr)
             if not os.path.isfile(tmp_json):
                 print(f"art-cmd reported success, but no file was created at {tmp_json}")
                 return {}
-            with open(tmp_json, 'r') as f:
+            with span("read", "json", file=tmp_json), open(tmp_json, 'r') as f:
                 metadata = json.load(f)
+            record_bytes(tmp_json, os.path.getsize(tmp_json))
             return metadata
         except subprocess.CalledProcessError as e:
             print(f"Error running art-cmd for ARRI: {e}")
@@ -54,13 +58,15 @@ class ExtractOCFMetadata:
         cmd = f'REDline --i "{self.filepath}" --printMeta 1 > "{out_file}"'
         try:
             # Run command with shell=True to allow redirection
-            completed = subprocess.run(cmd, shell=True, capture_output=True, text=True, check=True)
+            with span("subprocess", "REDline", file=self.filepath):
+                completed = subprocess.run(cmd, shell=True, capture_output=True, text=True, check=True)
             if not os.path.isfile(out_file):
                 print(f"REDline reported success, but no file was created at {out_file}")
                 return {}
             # Read the text file
-            with open(out_file, "r") as f:
+            with span("read", "raw", file=out_file), open(out_file, "r") as f:
                 lines = f.readlines()
+            record_bytes(out_file, os.path.getsize(out_file))
             metadata = {}
             for line in lines:
                 if ':' in line:
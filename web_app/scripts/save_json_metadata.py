@@ -1,5 +1,7 @@
 import os
 import json
+from instrumentation import span
+
 from .extract_ocf_metadata import ExtractOCFMetadata
 
 class SaveJsonMetadata(ExtractOCFMetadata):
@@ -24,7 +26,7 @@ class SaveJsonMetadata(ExtractOCFMetadata):
         
         json_file_path = os.path.join(dest_folder, base_name + ".json")
         try:
-            with open(json_file_path, 'w') as f:
+            with span("write", "json", file=json_file_path), open(json_file_path, 'w') as f:
                 json.dump(metadata, f, indent=4)
             return json_file_path
         except Exception as e: